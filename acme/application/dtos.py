@@ -1,4 +1,8 @@
 from dataclasses import dataclass
+from datetime import date, datetime
+from decimal import Decimal
+from acme.domain.events import DomainEvent
+from acme.domain.order import Order
 
 @dataclass
 class CreateProductDTO:
@@ -10,4 +14,81 @@ class CreateProductDTO:
 @dataclass
 class OrderLineDTO:
     product_id: int
-    quantity: int
\ No newline at end of file
+    quantity: int
+
+@dataclass
+class OrderSummaryDTO:
+    id: int
+    items_count: int
+    total: Decimal  # sum of line totals, computed by the repository
+
+@dataclass
+class BatchOrderResultDTO:
+    index: int  # position in the submitted batch
+    order: Order | None = None  # set when placed
+    error: str | None = None  # set when not placed
+
+@dataclass
+class ExportFilterDTO:
+    created_from: datetime | None = None
+    created_to: datetime | None = None  # exclusive
+    min_id: int | None = None
+    max_id: int | None = None  # inclusive
+
+@dataclass
+class ProductSearchDTO:
+    sku_prefix: str | None = None
+    name_contains: str | None = None  # case-insensitive
+    min_price: Decimal | None = None
+    max_price: Decimal | None = None  # inclusive
+    in_stock: bool | None = None  # True: stock > 0, False: stock == 0
+
+@dataclass
+class CatalogVersionDTO:
+    count: int
+    version: int  # moves with every committed product write, whatever its timestamp
+    last_modified: datetime | None  # newest product change; None for an empty catalog
+
+@dataclass
+class ProductVersionDTO:
+    version: int  # moves with every committed write to the product
+    last_modified: datetime
+
+@dataclass
+class DailySalesDTO:
+    day: date
+    orders: int
+    units: int
+    revenue: Decimal
+
+@dataclass
+class ProductSalesDTO:
+    product_id: int
+    sku: str  # from the order lines
+    units: int
+    revenue: Decimal
+
+@dataclass
+class OutboxMessageDTO:
+    id: int
+    event: DomainEvent
+    created_at: datetime  # when the write that raised it was made
+    attempts: int  # deliveries started, this one included
+
+@dataclass
+class OutboxStatsDTO:
+    pending: int
+    oldest_pending: datetime | None  # None when the outbox is drained
+
+@dataclass
+class RelayReportDTO:
+    claimed: int = 0
+    delivered: int = 0
+    failed: int = 0
+    max_lag_seconds: float = 0.0  # oldest delivered event: commit to handled
+
+@dataclass
+class IdempotencyRecordDTO:
+    key: str
+    request_hash: str
+    response: dict | None  # None while the first request is still in flight
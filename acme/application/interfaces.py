@@ -1,6 +1,12 @@
-from typing import Protocol, runtime_checkable
+from datetime import date
+from typing import Iterator, Protocol, runtime_checkable
 from acme.domain.product import Product
 from acme.domain.order import Order
+from acme.domain.events import DomainEvent
+from acme.application.dtos import (
+    OrderSummaryDTO, ExportFilterDTO, IdempotencyRecordDTO, CatalogVersionDTO, ProductSearchDTO, ProductVersionDTO,
+    OutboxMessageDTO, OutboxStatsDTO, DailySalesDTO, ProductSalesDTO,
+)
 
 @runtime_checkable
 class ProductRepository(Protocol):
@@ -8,18 +14,88 @@ class ProductRepository(Protocol):
     def update(self, p: Product) -> None: ...
     def get_by_id(self, id: int) -> Product | None: ...
     def get_by_sku(self, sku: str) -> Product | None: ...
+    def get_many(self, ids: list[int]) -> dict[int, Product]: ...
+    def lock_many(self, ids: list[int]) -> dict[int, Product]: ...  # fresh reads, locked until the unit of work ends
+    def reserve_stock(self, quantities: dict[int, int]) -> bool: ...
+    def upsert_many(self, products: list[Product]) -> list[int]: ...  # ids of rows that already existed
+    def stream(self, f: ExportFilterDTO) -> Iterator[Product]: ...
+    def search(self, criteria: ProductSearchDTO, after_id: int | None, limit: int, before_id: int | None = None) -> list[Product]: ...
+    # sparse reads: only `id` and `fields` (Product attribute names) are loaded, as plain dicts
+    def search_fields(self, criteria: ProductSearchDTO, fields: tuple[str, ...], after_id: int | None, limit: int, before_id: int | None = None) -> list[dict]: ...
+    def catalog_version(self) -> CatalogVersionDTO: ...
+    def product_version(self, id: int) -> ProductVersionDTO | None: ...  # None if the product doesn't exist
+    def list_page(self, after_id: int | None, limit: int, before_id: int | None = None) -> list[Product]: ...
     def list(self) -> list[Product]: ...
 
 @runtime_checkable
 class OrderRepository(Protocol):
     def add(self, o: Order) -> Order: ...
+    def add_many(self, orders: list[Order]) -> list[Order]: ...
     def get_by_id(self, id: int) -> Order | None: ...
+    def get_summary(self, id: int) -> OrderSummaryDTO | None: ...  # header only, lines not loaded
+    def stream(self, f: ExportFilterDTO) -> Iterator[Order]: ...
+    def list_page(self, after_id: int | None, limit: int, before_id: int | None = None) -> list[Order]: ...
+    def list_summaries(self, after_id: int | None, limit: int, before_id: int | None = None) -> list[OrderSummaryDTO]: ...
     def list(self) -> list[Order]: ...
 
+@runtime_checkable
+class IdempotencyRepository(Protocol):
+    def get(self, key: str) -> IdempotencyRecordDTO | None: ...
+    def claim(self, key: str, request_hash: str) -> bool: ...  # False if the key is taken
+    def complete(self, key: str, response: dict) -> None: ...
+
+@runtime_checkable
+class OutboxRepository(Protocol):
+    def add(self, events: list[DomainEvent]) -> None: ...  # written with the unit of work
+    # relay side: each call is its own short transaction
+    def claim(self, limit: int, lease_seconds: float) -> list[OutboxMessageDTO]: ...  # hidden from others for the lease
+    def mark_delivered(self, ids: list[int]) -> None: ...
+    def mark_failed(self, id: int, error: str, retry_in_seconds: float) -> None: ...
+    def stats(self) -> OutboxStatsDTO: ...
+
+@runtime_checkable
+class SalesReportRepository(Protocol):
+    # read the rollups only; both ranges are inclusive
+    def daily(self, first: date, last: date) -> list[DailySalesDTO]: ...  # days with sales, in order
+    def top_products(self, first: date, last: date, by: str, limit: int) -> list[ProductSalesDTO]: ...  # by: "units" | "revenue"
+    def high_water_mark(self) -> int: ...  # last order id the rollups include
+
 @runtime_checkable
 class UnitOfWork(Protocol):
     products: ProductRepository
     orders: OrderRepository
+    idempotency: IdempotencyRepository
+    outbox: OutboxRepository
+    reports: SalesReportRepository
     def __enter__(self) -> "UnitOfWork": ...
     def __exit__(self, exc_type, exc, tb) -> None: ...
     def commit(self) -> None: ...
+
+# ----- async ports (ASGI request path) -----
+@runtime_checkable
+class AsyncProductRepository(Protocol):
+    async def get_by_id(self, id: int) -> Product | None: ...
+    async def get_by_sku(self, sku: str) -> Product | None: ...
+    async def get_many(self, ids: list[int]) -> dict[int, Product]: ...
+    async def lock_many(self, ids: list[int]) -> dict[int, Product]: ...  # as ProductRepository.lock_many
+    async def reserve_stock(self, quantities: dict[int, int]) -> bool: ...
+    async def list_page(self, after_id: int | None, limit: int, before_id: int | None = None) -> list[Product]: ...
+
+@runtime_checkable
+class AsyncOrderRepository(Protocol):
+    async def add(self, o: Order) -> Order: ...
+    async def get_by_id(self, id: int) -> Order | None: ...
+    async def list_summaries(self, after_id: int | None, limit: int, before_id: int | None = None) -> list[OrderSummaryDTO]: ...
+
+@runtime_checkable
+class AsyncOutboxRepository(Protocol):
+    async def add(self, events: list[DomainEvent]) -> None: ...
+
+@runtime_checkable
+class AsyncUnitOfWork(Protocol):
+    products: AsyncProductRepository
+    orders: AsyncOrderRepository
+    outbox: AsyncOutboxRepository
+    async def __aenter__(self) -> "AsyncUnitOfWork": ...
+    async def __aexit__(self, exc_type, exc, tb) -> None: ...
+    async def commit(self) -> None: ...
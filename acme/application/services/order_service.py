@@ -1,6 +1,32 @@
-from acme.application.interfaces import UnitOfWork
+from typing import Callable, Iterator
+from acme.application.interfaces import UnitOfWork, AsyncUnitOfWork
+from acme.application.dtos import OrderSummaryDTO, ExportFilterDTO, BatchOrderResultDTO
 from acme.domain.order import Order
-from acme.domain.errors import ValidationError
+from acme.domain.events import OrderPlaced
+from acme.domain.product import Product
+from acme.domain.errors import DomainError, ValidationError, OutOfStock, IdempotencyConflict
+
+def build_order(products: dict[int, Product], lines) -> tuple[Order, dict[int, int]]:
+    """Check stock on the loaded products and snapshot them into an Order.
+
+    Returns the order and the total quantity wanted per product id.
+    """
+    order = Order()
+    demand: dict[int, int] = {}
+    for line in lines:
+        product = products.get(line.product_id)
+        if not product:
+            raise ValidationError(f"Product {line.product_id} not found.")
+        product.reserve(line.quantity)
+        demand[line.product_id] = demand.get(line.product_id, 0) + line.quantity
+        order.add_item(
+            product_id=product.id or 0,
+            sku=product.sku,
+            name=product.name,
+            unit_price=product.price,
+            quantity=line.quantity,
+        )
+    return order, demand
 
 class OrderService:
     def __init__(self, uow: UnitOfWork):
@@ -9,30 +35,142 @@ class OrderService:
     def place_order(self, lines) -> Order:
         if not lines:
             raise ValidationError("Order needs at least one item.")
-        order = Order()
         with self.uow as u:
-            for line in lines:
-                product = u.products.get_by_id(line.product_id)
-                if not product:
-                    raise ValidationError(f"Product {line.product_id} not found.")
-                product.reserve(line.quantity)
-                u.products.update(product)
-                order.add_item(
-                    product_id=product.id or 0,
-                    sku=product.sku,
-                    name=product.name,
-                    unit_price=product.price,
-                    quantity=line.quantity,
-                )
-            order = u.orders.add(order)
+            order = self._place(u, lines)
             u.commit()
             return order
 
+    def place_order_once(self, key: str, request_hash: str, lines, render: Callable[[Order], dict]) -> tuple[dict, bool]:
+        """Place the order at most once per `key`; returns (response, replayed).
+
+        The key is claimed and the rendered response stored in the order's own
+        transaction, so a retry replays it without touching products.
+        """
+        if not lines:
+            raise ValidationError("Order needs at least one item.")
+        record = self.uow.idempotency.get(key)
+        if record is None:
+            with self.uow as u:
+                if u.idempotency.claim(key, request_hash):
+                    response = render(self._place(u, lines))
+                    u.idempotency.complete(key, response)
+                    u.commit()
+                    return response, False
+            # lost the race: the other request has committed by now, or is still running
+            record = self.uow.idempotency.get(key)
+        if record is None or record.response is None:
+            raise IdempotencyConflict("A request with this Idempotency-Key is in progress.")
+        if record.request_hash != request_hash:
+            raise IdempotencyConflict("Idempotency-Key was already used with a different request.")
+        return record.response, True
+
+    def place_orders(self, batch: list, all_or_nothing: bool = True) -> list[BatchOrderResultDTO]:
+        """Place many orders (each a list of lines) in one unit of work.
+
+        Products are read and locked once for the whole batch and stock is
+        allocated to the orders in batch order. Then stock is decremented
+        with one guarded UPDATE and all orders are inserted in bulk.
+        `all_or_nothing` rejects the whole batch if any order fails;
+        otherwise the orders that fit are placed and the rest reported.
+        """
+        results: list[BatchOrderResultDTO] = []
+        placed: list[BatchOrderResultDTO] = []
+        demand: dict[int, int] = {}
+        with self.uow as u:
+            products = u.products.lock_many(sorted({line.product_id for lines in batch for line in lines}))
+            for index, lines in enumerate(batch):
+                result = BatchOrderResultDTO(index=index)
+                results.append(result)
+                if not lines:
+                    result.error = "Order needs at least one item."
+                    continue
+                # build_order reserves on the shared products; undo a failed order's partial reservations
+                before = {line.product_id: products[line.product_id].stock for line in lines if line.product_id in products}
+                try:
+                    result.order, wanted = build_order(products, lines)
+                except DomainError as e:
+                    for pid, stock in before.items():
+                        products[pid].stock = stock
+                    result.error = str(e)
+                    continue
+                for pid, q in wanted.items():
+                    demand[pid] = demand.get(pid, 0) + q
+                placed.append(result)
+
+            if all_or_nothing and len(placed) < len(results):
+                for r in placed:
+                    r.order, r.error = None, "Not placed: another order in the batch failed."
+                return results  # nothing written; leaving without commit rolls back
+            if placed:
+                # the products are locked, so this can only fail if the locks weren't honoured
+                if not u.products.reserve_stock(demand):
+                    raise OutOfStock("Not enough stock for one or more products.")
+                orders = u.orders.add_many([r.order for r in placed])
+                u.outbox.add([OrderPlaced.of(o) for o in orders])
+                for r, order in zip(placed, orders):
+                    r.order = order
+            u.commit()
+        return results
+
+    def _place(self, u: UnitOfWork, lines) -> Order:
+        # price and stock come from the database, never a (per-process) cache
+        order, demand = build_order(u.products.lock_many(sorted({line.product_id for line in lines})), lines)
+        # guarded decrement: fails if a concurrent order took the stock first
+        if not u.products.reserve_stock(demand):
+            raise OutOfStock("Not enough stock for one or more products.")
+        order = u.orders.add(order)
+        u.outbox.add([OrderPlaced.of(order)])
+        return order
+
     def get_order(self, order_id: int) -> Order:
         order = self.uow.orders.get_by_id(order_id)
         if not order:
             raise ValidationError("Order not found.")
         return order
 
+    def get_order_summary(self, order_id: int) -> OrderSummaryDTO:
+        summary = self.uow.orders.get_summary(order_id)
+        if not summary:
+            raise ValidationError("Order not found.")
+        return summary
+
     def list_orders(self) -> list[Order]:
-        return self.uow.orders.list()
\ No newline at end of file
+        return self.uow.orders.list()
+
+    def list_orders_page(self, after_id: int | None, limit: int, before_id: int | None = None) -> list[Order]:
+        return self.uow.orders.list_page(after_id, limit, before_id)
+
+    def list_summaries(self, after_id: int | None, limit: int, before_id: int | None = None) -> list[OrderSummaryDTO]:
+        return self.uow.orders.list_summaries(after_id, limit, before_id)
+
+    def export_orders(self, f: ExportFilterDTO) -> Iterator[Order]:
+        return self.uow.orders.stream(f)
+
+class AsyncOrderService:
+    """OrderService over an AsyncUnitOfWork, for the ASGI request path."""
+
+    def __init__(self, uow: AsyncUnitOfWork):
+        self.uow = uow
+
+    async def place_order(self, lines) -> Order:
+        if not lines:
+            raise ValidationError("Order needs at least one item.")
+        async with self.uow as u:
+            # as OrderService._place: rows read and locked in the order's transaction
+            products = await u.products.lock_many(sorted({line.product_id for line in lines}))
+            order, demand = build_order(products, lines)
+            if not await u.products.reserve_stock(demand):
+                raise OutOfStock("Not enough stock for one or more products.")
+            order = await u.orders.add(order)
+            await u.outbox.add([OrderPlaced.of(order)])
+            await u.commit()
+            return order
+
+    async def get_order(self, order_id: int) -> Order:
+        order = await self.uow.orders.get_by_id(order_id)
+        if not order:
+            raise ValidationError("Order not found.")
+        return order
+
+    async def list_summaries(self, after_id: int | None, limit: int, before_id: int | None = None) -> list[OrderSummaryDTO]:
+        return await self.uow.orders.list_summaries(after_id, limit, before_id)
@@ -0,0 +1,60 @@
+from datetime import datetime, timezone
+from typing import Callable
+from acme.application.interfaces import UnitOfWork
+from acme.application.dtos import OutboxStatsDTO, RelayReportDTO
+from acme.domain.events import DomainEvent
+
+Handler = Callable[[DomainEvent], None]
+
+class OutboxRelay:
+    """Delivers outbox events to their handlers, at least once.
+
+    A batch is claimed (leased) in one short transaction and handled outside
+    any transaction. Events whose handlers all returned are marked delivered
+    with one write. If a handler raises, the event goes back to the outbox
+    with exponential backoff and is later redelivered to every handler, so
+    handlers must be idempotent. So must be a crash before the mark: the
+    lease expires and the batch is handed out again.
+    """
+
+    def __init__(
+        self,
+        uow: UnitOfWork,
+        handlers: dict[str, list[Handler]],  # event name -> handlers, in call order
+        batch_size: int = 100,
+        lease_seconds: float = 60.0,
+        max_backoff_seconds: float = 300.0,
+        clock: Callable[[], datetime] = lambda: datetime.now(timezone.utc),
+    ):
+        self.uow = uow
+        self.handlers = handlers
+        self.batch_size = batch_size
+        self.lease_seconds = lease_seconds
+        self.max_backoff_seconds = max_backoff_seconds
+        self.clock = clock
+
+    def relay_batch(self) -> RelayReportDTO:
+        messages = self.uow.outbox.claim(self.batch_size, self.lease_seconds)
+        report = RelayReportDTO(claimed=len(messages))
+        delivered = []
+        for m in messages:
+            try:
+                for handler in self.handlers.get(type(m.event).__name__, ()):
+                    handler(m.event)
+            except Exception as e:  # any handler failure: retry the event later
+                report.failed += 1
+                self.uow.outbox.mark_failed(m.id, f"{type(e).__name__}: {e}", self.backoff(m.attempts))
+                continue
+            delivered.append(m)
+        if delivered:
+            self.uow.outbox.mark_delivered([m.id for m in delivered])
+            now = self.clock()
+            report.delivered = len(delivered)
+            report.max_lag_seconds = max((now - m.created_at).total_seconds() for m in delivered)
+        return report
+
+    def backoff(self, attempts: int) -> float:
+        return min(2.0 ** max(attempts - 1, 0), self.max_backoff_seconds)
+
+    def stats(self) -> OutboxStatsDTO:
+        return self.uow.outbox.stats()
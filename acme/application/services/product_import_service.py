@@ -0,0 +1,115 @@
+import csv
+import json
+from dataclasses import dataclass, field
+from decimal import Decimal, InvalidOperation
+from typing import Iterable, Iterator
+from acme.domain.product import Product
+from acme.domain.events import ProductChanged
+from acme.application.interfaces import UnitOfWork
+from acme.domain.errors import DomainError, ValidationError
+
+# ----- readers: (row number, record) pairs, one line at a time -----
+def read_csv(lines: Iterable[str]) -> Iterator[tuple[int, dict | None]]:
+    return enumerate(csv.DictReader(lines), start=1)
+
+def read_ndjson(lines: Iterable[str]) -> Iterator[tuple[int, dict | None]]:
+    n = 0
+    for line in lines:
+        if not line.strip():
+            continue
+        n += 1
+        try:
+            yield n, json.loads(line)
+        except ValueError:
+            yield n, None
+
+READERS = {"csv": read_csv, "ndjson": read_ndjson}
+
+@dataclass
+class ImportReport:
+    created: int = 0
+    updated: int = 0
+    failed: int = 0
+    errors: list[dict] = field(default_factory=list)  # capped at max_errors
+
+# the product columns' limits: a row past them is a row error, not a failed chunk
+SKU_MAX_LENGTH = 50
+NAME_MAX_LENGTH = 200
+STOCK_MAX = 2 ** 31 - 1
+
+def product_from_row(row) -> Product:
+    if not isinstance(row, dict):
+        raise ValidationError("Malformed row.")
+    try:
+        price = Decimal(str(row.get("price", "")).strip())
+    except InvalidOperation:
+        raise ValidationError("Invalid price.")
+    if not price.is_finite() or price != price.quantize(Decimal("0.01")) or abs(price) >= Decimal("1e8"):
+        raise ValidationError("Invalid price.")
+    try:
+        stock = int(str(row.get("stock", "")).strip())
+    except ValueError:
+        raise ValidationError("Invalid stock.")
+    if stock > STOCK_MAX:
+        raise ValidationError(f"Stock must be at most {STOCK_MAX}.")
+    p = Product(
+        id=None,
+        sku=str(row.get("sku") or "").strip(),
+        name=str(row.get("name") or "").strip(),
+        price=price,
+        stock=stock,
+    )
+    p.validate()
+    if len(p.sku) > SKU_MAX_LENGTH or len(p.name) > NAME_MAX_LENGTH:
+        raise ValidationError(f"SKU and name are limited to {SKU_MAX_LENGTH} and {NAME_MAX_LENGTH} characters.")
+    return p
+
+class ProductImportService:
+    """Upserts products by sku from a stream of rows, one chunk per transaction."""
+
+    def __init__(self, uow: UnitOfWork, chunk_size: int = 1000, max_errors: int = 1000):
+        self.uow = uow
+        self.chunk_size = chunk_size
+        self.max_errors = max_errors
+
+    def run(self, rows: Iterable[tuple[int, dict | None]]) -> ImportReport:
+        report = ImportReport()
+        chunk: dict[str, tuple[int, Product]] = {}  # sku -> (row number, product)
+        n = 0
+        try:
+            for n, row in rows:
+                try:
+                    p = product_from_row(row)
+                except DomainError as e:
+                    self._fail(report, n, row.get("sku") if isinstance(row, dict) else None, str(e))
+                    continue
+                chunk[p.sku] = (n, p)  # a repeated sku within a chunk: last row wins
+                if len(chunk) >= self.chunk_size:
+                    self._flush(chunk, report)
+                    chunk = {}
+        except csv.Error as e:
+            # the reader can't find the next record reliably after a broken
+            # one: keep the rows read so far and report where it stopped
+            self._fail(report, n + 1, None, f"Unreadable CSV, import stopped here: {e}")
+        if chunk:
+            self._flush(chunk, report)
+        return report
+
+    def _fail(self, report: ImportReport, n: int, sku, error: str) -> None:
+        report.failed += 1
+        if len(report.errors) < self.max_errors:
+            report.errors.append({"row": n, "sku": sku, "error": error})
+
+    def _flush(self, chunk: dict[str, tuple[int, Product]], report: ImportReport) -> None:
+        products = [p for _, p in chunk.values()]
+        try:
+            with self.uow as u:
+                existing = u.products.upsert_many(products)
+                u.outbox.add([ProductChanged.of(p) for p in products])
+                u.commit()
+        except Exception as e:  # the store rejected the chunk: it rolled back, later chunks still run
+            for n, p in sorted(chunk.values(), key=lambda r: r[0]):
+                self._fail(report, n, p.sku, f"Not saved, its chunk was rejected ({type(e).__name__}).")
+            return
+        report.updated += len(existing)
+        report.created += len(chunk) - len(existing)
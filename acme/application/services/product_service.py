@@ -1,6 +1,9 @@
 from decimal import Decimal
+from typing import Iterator
 from acme.domain.product import Product
-from acme.application.interfaces import UnitOfWork
+from acme.domain.events import ProductChanged
+from acme.application.interfaces import UnitOfWork, AsyncUnitOfWork
+from acme.application.dtos import ExportFilterDTO, CatalogVersionDTO, ProductSearchDTO, ProductVersionDTO
 from acme.domain.errors import ValidationError
 
 class ProductService:
@@ -20,9 +23,35 @@ class ProductService:
             if u.products.get_by_sku(p.sku):
                 raise ValidationError("SKU already exists.")
             p = u.products.add(p)
+            u.outbox.add([ProductChanged.of(p)])
             u.commit()
             return p
 
+    def export(self, f: ExportFilterDTO) -> Iterator[Product]:
+        return self.uow.products.stream(f)
+
+    def catalog_version(self) -> CatalogVersionDTO:
+        return self.uow.products.catalog_version()
+
+    def product_version(self, id: int) -> ProductVersionDTO | None:
+        return self.uow.products.product_version(id)
+
+    def list_page(self, after_id: int | None, limit: int, before_id: int | None = None) -> list[Product]:
+        return self.uow.products.list_page(after_id, limit, before_id)
+
+    @staticmethod
+    def _check_search(criteria: ProductSearchDTO) -> None:
+        if criteria.min_price is not None and criteria.max_price is not None and criteria.min_price > criteria.max_price:
+            raise ValidationError("min_price must not exceed max_price.")
+
+    def search(self, criteria: ProductSearchDTO, after_id: int | None, limit: int, before_id: int | None = None) -> list[Product]:
+        self._check_search(criteria)
+        return self.uow.products.search(criteria, after_id, limit, before_id)
+
+    def search_fields(self, criteria: ProductSearchDTO, fields: tuple[str, ...], after_id: int | None, limit: int, before_id: int | None = None) -> list[dict]:
+        self._check_search(criteria)
+        return self.uow.products.search_fields(criteria, fields, after_id, limit, before_id)
+
     def list(self) -> list[Product]:
         return self.uow.products.list()
 
@@ -40,5 +69,18 @@ class ProductService:
             existing.stock = int(dto.stock)
             existing.validate()
             u.products.update(existing)
+            u.outbox.add([ProductChanged.of(existing)])
             u.commit()
-            return existing
\ No newline at end of file
+            return existing
+
+class AsyncProductService:
+    """Read side of ProductService over an AsyncUnitOfWork."""
+
+    def __init__(self, uow: AsyncUnitOfWork):
+        self.uow = uow
+
+    async def get(self, id: int) -> Product | None:
+        return await self.uow.products.get_by_id(id)
+
+    async def list_page(self, after_id: int | None, limit: int, before_id: int | None = None) -> list[Product]:
+        return await self.uow.products.list_page(after_id, limit, before_id)
@@ -0,0 +1,36 @@
+from datetime import date, timedelta
+from decimal import Decimal
+from acme.application.interfaces import UnitOfWork
+from acme.application.dtos import DailySalesDTO, ProductSalesDTO
+from acme.domain.errors import ValidationError
+
+REPORT_SORTS = ("revenue", "units")
+
+class ReportService:
+    """Sales reports, read from the rollups; cost grows with the date range, not the order history."""
+
+    def __init__(self, uow: UnitOfWork, max_days: int = 366):
+        self.uow = uow
+        self.max_days = max_days
+
+    def _check_range(self, first: date, last: date) -> None:
+        if first > last:
+            raise ValidationError("date_from must not be after date_to.")
+        if (last - first).days + 1 > self.max_days:
+            raise ValidationError(f"Date range is limited to {self.max_days} days.")
+
+    def daily_sales(self, first: date, last: date) -> list[DailySalesDTO]:
+        """One row per day in the range, zeros included."""
+        self._check_range(first, last)
+        found = {d.day: d for d in self.uow.reports.daily(first, last)}
+        days = (first + timedelta(days=n) for n in range((last - first).days + 1))
+        return [found.get(d) or DailySalesDTO(day=d, orders=0, units=0, revenue=Decimal("0.00")) for d in days]
+
+    def top_products(self, first: date, last: date, by: str = "revenue", limit: int = 20) -> list[ProductSalesDTO]:
+        self._check_range(first, last)
+        if by not in REPORT_SORTS:
+            raise ValidationError(f"Sort must be one of: {', '.join(REPORT_SORTS)}.")
+        return self.uow.reports.top_products(first, last, by, limit)
+
+    def high_water_mark(self) -> int:
+        return self.uow.reports.high_water_mark()
@@ -1,3 +1,4 @@
 class DomainError(Exception): ...
 class ValidationError(DomainError): ...
-class OutOfStock(DomainError): ...
\ No newline at end of file
+class OutOfStock(DomainError): ...
+class IdempotencyConflict(DomainError): ...
@@ -0,0 +1,38 @@
+from dataclasses import dataclass
+from datetime import datetime
+from decimal import Decimal
+from .order import Order
+from .product import Product
+
+# Facts about committed writes. Services record them in the unit of work's
+# outbox, in the same transaction as the write; consumers get them later.
+
+@dataclass(frozen=True, slots=True)
+class OrderPlaced:
+    order_id: int
+    placed_at: datetime
+    total: Decimal
+    lines: tuple[tuple[int, int, Decimal], ...]  # (product_id, quantity, line_total)
+
+    @classmethod
+    def of(cls, order: Order) -> "OrderPlaced":
+        return cls(
+            order_id=order.id,
+            placed_at=order.created_at,
+            total=order.total,
+            lines=tuple((i.product_id, i.quantity, i.line_total) for i in order.items),
+        )
+
+@dataclass(frozen=True, slots=True)
+class ProductChanged:
+    product_id: int | None  # None when the store doesn't report ids (bulk upserts)
+    sku: str
+
+    @classmethod
+    def of(cls, product: Product) -> "ProductChanged":
+        return cls(product_id=product.id, sku=product.sku)
+
+DomainEvent = OrderPlaced | ProductChanged
+
+# event name (as stored and as used in OUTBOX_HANDLERS) -> class
+EVENT_TYPES = {cls.__name__: cls for cls in (OrderPlaced, ProductChanged)}
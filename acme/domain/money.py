@@ -0,0 +1,29 @@
+from dataclasses import dataclass
+from decimal import Decimal
+
+CENT = Decimal("0.01")
+
+@dataclass(frozen=True, slots=True)
+class Money:
+    """Amount in integer cents, for arithmetic on hot paths.
+
+    Convert at the edges: `from_decimal` rounds to cents exactly like
+    `Decimal.quantize(Decimal("0.01"))`, `to_decimal` gives a 2-place Decimal.
+    """
+    cents: int = 0
+
+    @classmethod
+    def from_decimal(cls, amount: Decimal) -> "Money":
+        return cls(int(amount.quantize(CENT).scaleb(2)))
+
+    def to_decimal(self) -> Decimal:
+        return Decimal(self.cents).scaleb(-2)
+
+    def __add__(self, other: "Money") -> "Money":
+        return Money(self.cents + other.cents)
+
+    def __sub__(self, other: "Money") -> "Money":
+        return Money(self.cents - other.cents)
+
+    def __mul__(self, qty: int) -> "Money":
+        return Money(self.cents * qty)
@@ -1,30 +1,48 @@
 from dataclasses import dataclass, field
+from datetime import datetime
 from decimal import Decimal
 from .errors import ValidationError
+from .money import Money
 
-@dataclass
+@dataclass(slots=True)
 class OrderItem:
     product_id: int
     sku: str
     name: str
     unit_price: Decimal
     quantity: int
+    # rounded once, when the line is created
+    line_money: Money = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        self.line_money = Money.from_decimal(self.unit_price * self.quantity)
 
     @property
     def line_total(self) -> Decimal:
-        return (self.unit_price * self.quantity).quantize(Decimal("0.01"))
+        return self.line_money.to_decimal()
 
-@dataclass
+@dataclass(slots=True)
 class Order:
     id: int | None = None
     items: list[OrderItem] = field(default_factory=list)
+    created_at: datetime | None = None
+    # running total, kept up to date by add_item; don't append to `items` directly
+    total_money: Money = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        self.total_money = Money(sum(i.line_money.cents for i in self.items))
 
     def add_item(self, *, product_id: int, sku: str, name: str, unit_price: Decimal, quantity: int):
         if quantity <= 0:
             raise ValidationError("Quantity must be >= 1.")
-        self.items.append(OrderItem(product_id, sku, name, unit_price, quantity))
+        item = OrderItem(product_id, sku, name, unit_price, quantity)
+        self.items.append(item)
+        self.total_money += item.line_money
+
+    @property
+    def items_count(self) -> int:
+        return len(self.items)
 
     @property
     def total(self) -> Decimal:
-        total = sum((i.line_total for i in self.items), Decimal("0"))
-        return total.quantize(Decimal("0.01"))
\ No newline at end of file
+        return self.total_money.to_decimal()
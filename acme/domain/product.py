@@ -2,7 +2,7 @@ from dataclasses import dataclass
 from decimal import Decimal
 from .errors import ValidationError, OutOfStock
 
-@dataclass
+@dataclass(slots=True)
 class Product:
     id: int | None
     sku: str
@@ -0,0 +1,54 @@
+"""Archive tier: old orders move out of the order tables into archive tables.
+
+`archive_before` walks the orders in id order, one chunk (and one
+transaction) at a time. It copies each order and its lines to
+`ArchivedOrderModel` / `ArchivedOrderItemModel`, keeping the order id, and
+deletes them from `OrderModel` / `OrderItemModel`. It stops at the first
+order placed at or after the cutoff, so what moves is always a prefix of the
+orders by id: every archived id is lower than every order id still in the
+hot tables. The repositories rely on that to read the archive only for
+pages that reach below the first hot id (see `tiered_page`).
+
+Each chunk holds the sales rollup lock (see sales_rollups.py), so a
+rollup chunk never sees an order half-way between the two tiers.
+"""
+from datetime import datetime
+from itertools import takewhile
+from typing import Iterator
+from django.db import connections, transaction
+from .models import OrderModel, OrderItemModel, ArchivedOrderModel, ArchivedOrderItemModel
+from .order_totals import item_totals
+from .sales_rollups import locked_state
+
+def archive_before(cutoff: datetime, chunk_size: int = 1000) -> Iterator[int]:
+    """Move orders placed before `cutoff`; yields the number of orders moved per chunk."""
+    while True:
+        with transaction.atomic():
+            locked_state()
+            qs = OrderModel.objects.order_by("id").values("id", "created_at", "total", "items_count")
+            if connections[qs.db].features.has_select_for_update:
+                qs = qs.select_for_update()
+            rows = list(qs[:chunk_size])
+            old = list(takewhile(lambda r: r["created_at"] < cutoff, rows))
+            if not old:
+                return
+            ids = [r["id"] for r in old]
+            # rows placed before the denormalized columns, not yet backfilled
+            totals = item_totals([r["id"] for r in old if r["total"] is None or r["items_count"] is None])
+            ArchivedOrderModel.objects.bulk_create([
+                ArchivedOrderModel(
+                    id=r["id"], created_at=r["created_at"],
+                    items_count=totals[r["id"]][0] if r["id"] in totals else r["items_count"],
+                    total=totals[r["id"]][1] if r["id"] in totals else r["total"],
+                ) for r in old
+            ])
+            ArchivedOrderItemModel.objects.bulk_create([
+                ArchivedOrderItemModel(
+                    order_id=i.order_id, product_id=i.product_id, sku=i.sku, name=i.name,
+                    unit_price=i.unit_price, quantity=i.quantity,
+                ) for i in OrderItemModel.objects.filter(order_id__in=ids).order_by("id")
+            ])
+            OrderModel.objects.filter(id__in=ids).delete()  # the lines go with them (CASCADE)
+        yield len(ids)
+        if len(old) < len(rows):
+            return  # reached an order placed after the cutoff
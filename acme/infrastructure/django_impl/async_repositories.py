@@ -0,0 +1,138 @@
+from decimal import Decimal
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import connections
+from django.utils import timezone
+from django.db.models import Case, F, IntegerField, Value, When
+from acme.application.interfaces import AsyncProductRepository, AsyncOrderRepository, AsyncOutboxRepository, AsyncUnitOfWork
+from acme.application.dtos import OrderSummaryDTO
+from acme.domain.product import Product
+from acme.domain.order import Order
+from acme.domain.events import DomainEvent
+from .models import ProductModel, OrderModel, OrderItemModel, ArchivedOrderModel, OutboxEventModel
+from .cache import invalidate_products
+from .outbox import encode
+from .repositories import DjangoUnitOfWork, DjangoOrderRepository, lock_query, product_to_domain, order_to_domain, row_id
+
+async def akeyset_page(qs, after_id: int | None, limit: int, before_id: int | None = None) -> list:
+    if before_id is not None:
+        return [m async for m in qs.filter(id__lt=before_id).order_by("-id")[:limit]][::-1]
+    if after_id is not None:
+        qs = qs.filter(id__gt=after_id)
+    return [m async for m in qs.order_by("id")[:limit]]
+
+async def atiered_page(hot, archived, after_id: int | None, limit: int, before_id: int | None = None) -> list:
+    # same reads as repositories.tiered_page
+    rows = await akeyset_page(hot, after_id, limit, before_id)
+    if before_id is not None:
+        if len(rows) == limit:
+            return rows
+        return await akeyset_page(archived, None, limit - len(rows), row_id(rows[0]) if rows else before_id) + rows
+    if rows:
+        if after_id is not None and row_id(rows[0]) == after_id + 1:
+            return rows
+        archived = archived.filter(id__lt=row_id(rows[0]))
+    return (await akeyset_page(archived, after_id, limit) + rows)[:limit]
+
+# ----- repositories (Django async ORM) -----
+class DjangoAsyncProductRepository(AsyncProductRepository):
+    async def get_by_id(self, id: int) -> Product | None:
+        m = await ProductModel.objects.filter(id=id).afirst()
+        return product_to_domain(m) if m else None
+
+    async def get_by_sku(self, sku: str) -> Product | None:
+        m = await ProductModel.objects.filter(sku=sku).afirst()
+        return product_to_domain(m) if m else None
+
+    async def get_many(self, ids: list[int]) -> dict[int, Product]:
+        return {m.id: product_to_domain(m) async for m in ProductModel.objects.filter(id__in=set(ids))}
+
+    async def lock_many(self, ids: list[int]) -> dict[int, Product]:
+        # same reads as DjangoProductRepository.lock_many
+        qs = ProductModel.objects.filter(id__in=set(ids)).order_by("id")
+        if connections[qs.db].features.has_select_for_update:
+            qs = qs.select_for_update()
+        return {m.id: product_to_domain(m) async for m in qs}
+
+    async def reserve_stock(self, quantities: dict[int, int]) -> bool:
+        # same guarded single UPDATE as DjangoProductRepository.reserve_stock
+        if not quantities:
+            return True
+        locks = lock_query(list(quantities))
+        if connections[locks.db].features.has_select_for_update:
+            async for _ in locks:
+                pass
+        qty = Case(
+            *[When(id=pid, then=Value(q)) for pid, q in quantities.items()],
+            output_field=IntegerField(),
+        )
+        updated = await ProductModel.objects.filter(id__in=quantities.keys(), stock__gte=qty).aupdate(
+            stock=F("stock") - qty, updated_at=timezone.now(), version=F("version") + 1
+        )
+        if settings.PRODUCT_CACHE_ALIAS:
+            # keep the sync path's product cache honest
+            await sync_to_async(invalidate_products)(settings.PRODUCT_CACHE_ALIAS, list(quantities))
+        return updated == len(quantities)
+
+    async def list_page(self, after_id: int | None, limit: int, before_id: int | None = None) -> list[Product]:
+        return [product_to_domain(m) for m in await akeyset_page(ProductModel.objects.all(), after_id, limit, before_id)]
+
+class DjangoAsyncOrderRepository(AsyncOrderRepository):
+    async def add(self, o: Order) -> Order:
+        om = await OrderModel.objects.acreate(total=o.total, items_count=o.items_count)
+        await OrderItemModel.objects.abulk_create([
+            OrderItemModel(
+                order_id=om.id, product_id=i.product_id, sku=i.sku, name=i.name,
+                unit_price=i.unit_price, quantity=i.quantity
+            ) for i in o.items
+        ])
+        o.id = om.id
+        o.created_at = om.created_at
+        return o
+
+    async def get_by_id(self, id: int) -> Order | None:
+        om = (
+            await OrderModel.objects.filter(id=id).prefetch_related("items").afirst()
+            or await ArchivedOrderModel.objects.filter(id=id).prefetch_related("items").afirst()
+        )
+        return order_to_domain(om) if om else None
+
+    async def list_summaries(self, after_id: int | None, limit: int, before_id: int | None = None) -> list[OrderSummaryDTO]:
+        page = await atiered_page(
+            DjangoOrderRepository.summaries_query(), DjangoOrderRepository.archived_summaries_query(),
+            after_id, limit, before_id,
+        )
+        return [
+            OrderSummaryDTO(id=r["id"], items_count=r["lines"], total=r["items_total"].quantize(Decimal("0.01")))
+            for r in page
+        ]
+
+class DjangoAsyncOutboxRepository(AsyncOutboxRepository):
+    async def add(self, events: list[DomainEvent]) -> None:
+        await OutboxEventModel.objects.abulk_create([encode(e) for e in events])
+
+# ----- Unit of Work -----
+class DjangoAsyncUnitOfWork(AsyncUnitOfWork):
+    """Async facade over DjangoUnitOfWork's transaction.
+
+    Django has no async transaction API. The atomic block is entered and left
+    with thread-sensitive `sync_to_async`, which is also where the ORM's `a*`
+    methods run. So they all use the same thread and connection, inside the
+    transaction.
+    """
+
+    def __init__(self):
+        self.products = DjangoAsyncProductRepository()
+        self.orders = DjangoAsyncOrderRepository()
+        self.outbox = DjangoAsyncOutboxRepository()
+        self._uow = DjangoUnitOfWork()
+
+    async def __aenter__(self):
+        await sync_to_async(self._uow.__enter__)()
+        return self
+
+    async def commit(self) -> None:
+        self._uow.commit()
+
+    async def __aexit__(self, exc_type, exc, tb):
+        return await sync_to_async(self._uow.__exit__)(exc_type, exc, tb)
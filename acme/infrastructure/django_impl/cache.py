@@ -0,0 +1,172 @@
+import threading
+from typing import Iterator
+from django.core.cache import caches
+from django.db import transaction
+from acme.application.interfaces import ProductRepository
+from acme.domain.product import Product
+from acme.application.dtos import ExportFilterDTO, CatalogVersionDTO, ProductSearchDTO, ProductVersionDTO
+from .routing import pinned_to_primary
+
+# ----- counters -----
+class CacheStats:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def record(self, hits: int = 0, misses: int = 0) -> None:
+        with self._lock:
+            self.hits += hits
+            self.misses += misses
+
+    def reset(self) -> None:
+        with self._lock:
+            self.hits = self.misses = 0
+
+    @property
+    def hit_ratio(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+# process-wide: repositories are built per request, the counters must outlive them
+product_cache_stats = CacheStats()
+
+def product_key(id: int) -> str:
+    return f"product:id:{id}"
+
+def invalidate_products(alias: str, ids) -> None:
+    """Drop cached products once the current transaction commits (now, in autocommit)."""
+    keys = [product_key(i) for i in ids]
+    transaction.on_commit(lambda: caches[alias].delete_many(keys))
+
+# ----- read-through decorator -----
+class CachedProductRepository(ProductRepository):
+    """Serves id/sku lookups from a Django cache alias in front of another repository.
+
+    TTL and LRU culling come from the alias' TIMEOUT and MAX_ENTRIES. Writes
+    invalidate through `transaction.on_commit`, so a rolled back unit of work
+    leaves the cache alone; ids written in this unit of work skip the cache.
+    """
+
+    def __init__(self, inner: ProductRepository, alias: str = "products", stats: CacheStats = product_cache_stats):
+        self.inner = inner
+        self.cache = caches[alias]
+        self.stats = stats
+        self._dirty: set[int] = set()
+
+    _id_key = staticmethod(product_key)
+
+    @staticmethod
+    def _sku_key(sku: str) -> str:
+        return f"product:sku:{sku}"
+
+    def _remember(self, products: list[Product]) -> None:
+        entries = {}
+        for p in products:
+            if p.id not in self._dirty:
+                entries[self._id_key(p.id)] = p
+                entries[self._sku_key(p.sku)] = p.id
+        if entries:
+            self.cache.set_many(entries)
+
+    def _invalidate(self, ids) -> None:
+        ids = set(ids)
+        self._dirty.update(ids)
+        keys = [self._id_key(i) for i in ids]
+
+        def on_commit():
+            # sku entries only point at ids and are re-checked on read
+            self.cache.delete_many(keys)
+            self._dirty.difference_update(ids)
+
+        transaction.on_commit(on_commit)
+
+    # writes
+    def add(self, p: Product) -> Product:
+        p = self.inner.add(p)
+        self._invalidate([p.id])
+        return p
+
+    def update(self, p: Product) -> None:
+        self.inner.update(p)
+        self._invalidate([p.id])
+
+    def lock_many(self, ids: list[int]) -> dict[int, Product]:
+        # locked reads must come from the database; they are about to be written
+        products = self.inner.lock_many(ids)
+        self._dirty.update(products)
+        return products
+
+    def reserve_stock(self, quantities: dict[int, int]) -> bool:
+        ok = self.inner.reserve_stock(quantities)
+        self._invalidate(quantities.keys())
+        return ok
+
+    def upsert_many(self, products: list[Product]) -> list[int]:
+        existing = self.inner.upsert_many(products)
+        self._invalidate(existing)
+        return existing
+
+    # reads; misses are loaded from the primary: filling the cache from a
+    # lagging replica would keep a stale product there after its invalidation
+    def get_by_id(self, id: int) -> Product | None:
+        if id not in self._dirty:
+            p = self.cache.get(self._id_key(id))
+            if p is not None:
+                self.stats.record(hits=1)
+                return p
+        self.stats.record(misses=1)
+        with pinned_to_primary():
+            p = self.inner.get_by_id(id)
+        if p:
+            self._remember([p])
+        return p
+
+    def get_by_sku(self, sku: str) -> Product | None:
+        id = self.cache.get(self._sku_key(sku))
+        if id is not None and id not in self._dirty:
+            p = self.cache.get(self._id_key(id))
+            if p is not None and p.sku == sku:
+                self.stats.record(hits=1)
+                return p
+        self.stats.record(misses=1)
+        with pinned_to_primary():
+            p = self.inner.get_by_sku(sku)
+        if p:
+            self._remember([p])
+        return p
+
+    def get_many(self, ids: list[int]) -> dict[int, Product]:
+        wanted = set(ids)
+        cached = self.cache.get_many([self._id_key(i) for i in wanted - self._dirty])
+        products = {p.id: p for p in cached.values()}
+        missing = [i for i in wanted if i not in products]
+        self.stats.record(hits=len(products), misses=len(missing))
+        if missing:
+            with pinned_to_primary():
+                loaded = self.inner.get_many(missing)
+            self._remember(list(loaded.values()))
+            products.update(loaded)
+        return products
+
+    def stream(self, f: ExportFilterDTO) -> Iterator[Product]:
+        return self.inner.stream(f)
+
+    def search(self, criteria: ProductSearchDTO, after_id: int | None, limit: int, before_id: int | None = None) -> list[Product]:
+        return self.inner.search(criteria, after_id, limit, before_id)
+
+    def search_fields(self, criteria: ProductSearchDTO, fields: tuple[str, ...], after_id: int | None, limit: int, before_id: int | None = None) -> list[dict]:
+        return self.inner.search_fields(criteria, fields, after_id, limit, before_id)
+
+    # the version reads must see the database, never the cache
+    def catalog_version(self) -> CatalogVersionDTO:
+        return self.inner.catalog_version()
+
+    def product_version(self, id: int) -> ProductVersionDTO | None:
+        return self.inner.product_version(id)
+
+    def list_page(self, after_id: int | None, limit: int, before_id: int | None = None) -> list[Product]:
+        return self.inner.list_page(after_id, limit, before_id)
+
+    def list(self) -> list[Product]:
+        return self.inner.list()
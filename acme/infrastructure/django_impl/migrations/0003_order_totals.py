@@ -0,0 +1,27 @@
+# Generated by Django 5.1.2 on 2026-10-17 02:39
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('infrastructure', '0002_idempotencykeymodel'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='ordermodel',
+            name='items_count',
+            field=models.IntegerField(null=True),
+        ),
+        migrations.AddField(
+            model_name='ordermodel',
+            name='total',
+            field=models.DecimalField(decimal_places=2, max_digits=12, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='ordermodel',
+            index=models.Index(fields=['total', 'id'], name='order_total_id_idx'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.1.2 on 2026-10-17 02:42
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('infrastructure', '0003_order_totals'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='productmodel',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, db_index=True),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.1.2 on 2026-10-17 02:44
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('infrastructure', '0004_product_updated_at_index'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='productmodel',
+            index=models.Index(fields=['price', 'id'], name='product_price_id_idx'),
+        ),
+    ]
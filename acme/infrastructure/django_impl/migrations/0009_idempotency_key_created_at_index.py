@@ -0,0 +1,18 @@
+# Generated by Django 5.1.2 on 2026-10-17 03:28
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('infrastructure', '0008_order_archive'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='idempotencykeymodel',
+            name='created_at',
+            field=models.DateTimeField(auto_now_add=True, db_index=True),
+        ),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 5.1.2 on 2026-10-17 03:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('infrastructure', '0009_idempotency_key_created_at_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='productmodel',
+            name='version',
+            field=models.BigIntegerField(default=1),
+        ),
+        migrations.AlterField(
+            model_name='productmodel',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddIndex(
+            model_name='productmodel',
+            index=models.Index(fields=['updated_at', 'version'], name='product_updated_version_idx'),
+        ),
+    ]
@@ -1,3 +1,4 @@
+from django.utils import timezone
 from django.db import models
 
 class ProductModel(models.Model):
@@ -6,10 +7,26 @@ class ProductModel(models.Model):
     price = models.DecimalField(max_digits=10, decimal_places=2)
     stock = models.IntegerField(default=0)
     created_at = models.DateTimeField(auto_now_add=True)
-    updated_at = models.DateTimeField(auto_now=True)
+    updated_at = models.DateTimeField(auto_now=True)  # Last-Modified, see catalog_version()
+    version = models.BigIntegerField(default=1)  # +1 on every write; the catalog ETag sums them
+
+    class Meta:
+        # product search (search_filter); sku prefixes use the unique sku index
+        indexes = [
+            models.Index(fields=["price", "id"], name="product_price_id_idx"),
+            # covers catalog_version()'s aggregate
+            models.Index(fields=["updated_at", "version"], name="product_updated_version_idx"),
+        ]
 
 class OrderModel(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
+    # denormalized from the items when the order is placed; NULL on rows
+    # older than these columns until `manage.py backfill_order_totals` runs
+    total = models.DecimalField(max_digits=12, decimal_places=2, null=True)
+    items_count = models.IntegerField(null=True)
+
+    class Meta:
+        indexes = [models.Index(fields=["total", "id"], name="order_total_id_idx")]
 
 class OrderItemModel(models.Model):
     order = models.ForeignKey(OrderModel, related_name="items", on_delete=models.CASCADE)
@@ -17,4 +34,62 @@ class OrderItemModel(models.Model):
     sku = models.CharField(max_length=50)
     name = models.CharField(max_length=200)
     unit_price = models.DecimalField(max_digits=10, decimal_places=2)
-    quantity = models.IntegerField()
\ No newline at end of file
+    quantity = models.IntegerField()
+
+class IdempotencyKeyModel(models.Model):
+    key = models.CharField(max_length=255, unique=True)
+    request_hash = models.CharField(max_length=64)
+    response_body = models.TextField(blank=True)  # JSON, empty until the order commits
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)  # purge_idempotency_keys
+
+class OutboxEventModel(models.Model):
+    # domain events, written in the transaction of the change they describe (see outbox.py)
+    topic = models.CharField(max_length=100)  # event class name
+    payload = models.TextField()  # JSON
+    created_at = models.DateTimeField(auto_now_add=True)
+    available_at = models.DateTimeField(default=timezone.now)  # lease / retry backoff
+    attempts = models.IntegerField(default=0)
+    last_error = models.TextField(blank=True)
+    delivered_at = models.DateTimeField(null=True)
+
+    class Meta:
+        # only undelivered rows are indexed, so claiming stays cheap as history grows
+        indexes = [models.Index(fields=["id"], condition=models.Q(delivered_at__isnull=True), name="outbox_pending_idx")]
+
+# ----- sales rollups (see sales_rollups.py), maintained by `manage.py rollup_sales` -----
+class DailySalesModel(models.Model):
+    day = models.DateField(unique=True)
+    orders = models.IntegerField(default=0)
+    units = models.IntegerField(default=0)
+    revenue = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+
+class ProductDailySalesModel(models.Model):
+    day = models.DateField()
+    product_id = models.BigIntegerField()  # no FK: rollups outlive catalog changes
+    sku = models.CharField(max_length=50)  # from the order lines
+    units = models.IntegerField(default=0)
+    revenue = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+
+    class Meta:
+        constraints = [models.UniqueConstraint(fields=["day", "product_id"], name="product_daily_sales_uniq")]
+
+class RollupStateModel(models.Model):
+    name = models.CharField(max_length=50, unique=True)
+    high_water_mark = models.BigIntegerField(default=0)  # last order id folded in (hot or archived)
+    updated_at = models.DateTimeField(auto_now=True)
+
+# ----- archive tier (see archive.py), filled by `manage.py archive_orders` -----
+class ArchivedOrderModel(models.Model):
+    id = models.BigIntegerField(primary_key=True)  # the id the order had in OrderModel
+    created_at = models.DateTimeField()
+    # always filled: archive_orders computes them for rows not yet backfilled
+    total = models.DecimalField(max_digits=12, decimal_places=2)
+    items_count = models.IntegerField()
+
+class ArchivedOrderItemModel(models.Model):
+    order = models.ForeignKey(ArchivedOrderModel, related_name="items", on_delete=models.CASCADE)
+    product = models.ForeignKey(ProductModel, on_delete=models.PROTECT)
+    sku = models.CharField(max_length=50)
+    name = models.CharField(max_length=200)
+    unit_price = models.DecimalField(max_digits=10, decimal_places=2)
+    quantity = models.IntegerField()
@@ -0,0 +1,54 @@
+"""Maintenance of the denormalized `OrderModel.total` / `items_count` columns.
+
+`DjangoOrderRepository.add` writes them for new orders; these helpers fill
+them in for older rows and check them against the order lines. Both walk
+orders in id order, one chunk (and one transaction) at a time.
+"""
+from decimal import Decimal
+from typing import Iterator
+from django.db import transaction
+from django.db.models import Count, DecimalField, F, Sum
+from .models import OrderModel, OrderItemModel
+
+def item_totals(order_ids: list[int]) -> dict[int, tuple[int, Decimal]]:
+    """(items_count, total) per order, aggregated from its lines; orders without lines are (0, 0.00)."""
+    money = DecimalField(max_digits=12, decimal_places=2)
+    rows = (
+        OrderItemModel.objects.filter(order_id__in=order_ids).order_by().values("order_id")
+        .annotate(n=Count("id"), s=Sum(F("unit_price") * F("quantity"), output_field=money))
+    )
+    out = {i: (0, Decimal("0.00")) for i in order_ids}
+    for r in rows:
+        out[r["order_id"]] = (r["n"], r["s"].quantize(Decimal("0.01")))
+    return out
+
+def _id_chunks(qs, chunk_size: int) -> Iterator[list[int]]:
+    last = 0
+    while True:
+        ids = list(qs.filter(id__gt=last).order_by("id").values_list("id", flat=True)[:chunk_size])
+        if not ids:
+            return
+        yield ids
+        last = ids[-1]
+
+def backfill(chunk_size: int = 1000, only_missing: bool = True) -> Iterator[int]:
+    """Write the columns chunk by chunk; yields the number of rows written per chunk."""
+    qs = OrderModel.objects.all()
+    if only_missing:
+        qs = qs.filter(total__isnull=True)
+    for ids in _id_chunks(qs, chunk_size):
+        with transaction.atomic():
+            totals = item_totals(ids)
+            OrderModel.objects.bulk_update(
+                [OrderModel(id=i, items_count=n, total=t) for i, (n, t) in totals.items()],
+                ["items_count", "total"],
+            )
+        yield len(ids)
+
+def mismatches(chunk_size: int = 1000) -> Iterator[tuple[int, tuple, tuple]]:
+    """Yield (order_id, stored, expected) for every order whose columns disagree with its lines."""
+    for ids in _id_chunks(OrderModel.objects.all(), chunk_size):
+        stored = {r[0]: (r[1], r[2]) for r in OrderModel.objects.filter(id__in=ids).values_list("id", "items_count", "total")}
+        for order_id, expected in item_totals(ids).items():
+            if stored[order_id] != expected:
+                yield order_id, stored[order_id], expected
@@ -0,0 +1,85 @@
+"""Transactional outbox: domain events stored next to the writes that raised them.
+
+`DjangoOutboxRepository.add` runs inside the unit of work's transaction, so
+an event exists if and only if its change committed. `manage.py
+outbox_worker` drains the table through `OutboxRelay`; the lease on claimed
+rows lets several workers run side by side (on PostgreSQL they also skip
+each other's locked rows).
+"""
+import json
+import logging
+from dataclasses import asdict
+from datetime import timedelta
+from decimal import Decimal
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connections, transaction
+from django.db.models import Count, F, Min
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from acme.application.interfaces import OutboxRepository
+from acme.application.dtos import OutboxMessageDTO, OutboxStatsDTO
+from acme.domain.events import DomainEvent, OrderPlaced, ProductChanged
+from .models import OutboxEventModel
+
+logger = logging.getLogger("acme.events")
+
+# ----- codec -----
+def encode(e: DomainEvent) -> OutboxEventModel:
+    return OutboxEventModel(topic=type(e).__name__, payload=json.dumps(asdict(e), cls=DjangoJSONEncoder))
+
+DECODERS = {
+    "OrderPlaced": lambda d: OrderPlaced(
+        order_id=d["order_id"], placed_at=parse_datetime(d["placed_at"]), total=Decimal(d["total"]),
+        lines=tuple((pid, q, Decimal(t)) for pid, q, t in d["lines"]),
+    ),
+    "ProductChanged": lambda d: ProductChanged(**d),
+}
+
+def decode(topic: str, payload: str) -> DomainEvent:
+    return DECODERS[topic](json.loads(payload))
+
+# ----- repository -----
+class DjangoOutboxRepository(OutboxRepository):
+    def add(self, events: list[DomainEvent]) -> None:
+        OutboxEventModel.objects.bulk_create([encode(e) for e in events])
+
+    @staticmethod
+    def pending(now):
+        return OutboxEventModel.objects.filter(delivered_at__isnull=True, available_at__lte=now)
+
+    def claim(self, limit: int, lease_seconds: float) -> list[OutboxMessageDTO]:
+        now = timezone.now()
+        with transaction.atomic():
+            qs = self.pending(now).order_by("id")
+            if connections[qs.db].features.has_select_for_update_skip_locked:
+                qs = qs.select_for_update(skip_locked=True)
+            rows = list(qs.values_list("id", "topic", "payload", "created_at", "attempts")[:limit])
+            if rows:
+                OutboxEventModel.objects.filter(id__in=[r[0] for r in rows]).update(
+                    available_at=now + timedelta(seconds=lease_seconds), attempts=F("attempts") + 1
+                )
+        return [
+            OutboxMessageDTO(id=id, event=decode(topic, payload), created_at=created_at, attempts=attempts + 1)
+            for id, topic, payload, created_at, attempts in rows
+        ]
+
+    def mark_delivered(self, ids: list[int]) -> None:
+        OutboxEventModel.objects.filter(id__in=ids).update(delivered_at=timezone.now(), last_error="")
+
+    def mark_failed(self, id: int, error: str, retry_in_seconds: float) -> None:
+        OutboxEventModel.objects.filter(id=id).update(
+            available_at=timezone.now() + timedelta(seconds=retry_in_seconds), last_error=error[:2000]
+        )
+
+    def stats(self) -> OutboxStatsDTO:
+        agg = OutboxEventModel.objects.filter(delivered_at__isnull=True).aggregate(n=Count("id"), oldest=Min("created_at"))
+        return OutboxStatsDTO(pending=agg["n"], oldest_pending=agg["oldest"])
+
+def purge_delivered(older_than: timedelta) -> int:
+    """Delete events delivered more than `older_than` ago; returns the number deleted."""
+    deleted, _ = OutboxEventModel.objects.filter(delivered_at__lt=timezone.now() - older_than).delete()
+    return deleted
+
+# ----- handlers (OUTBOX_HANDLERS) -----
+def log_event(e: DomainEvent) -> None:
+    logger.info("event %s %s", type(e).__name__, asdict(e))
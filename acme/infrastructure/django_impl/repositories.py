@@ -1,22 +1,140 @@
+import json
+from datetime import timedelta
 from decimal import Decimal
-from django.db import transaction
-from acme.application.interfaces import ProductRepository, OrderRepository, UnitOfWork
+from typing import Iterator
+from django.conf import settings
+from django.db import IntegrityError, connections, transaction
+from django.utils import timezone
+from django.db.models import Case, Count, DecimalField, ExpressionWrapper, F, IntegerField, Max, OuterRef, Subquery, Sum, Value, When
+from django.db.models.functions import Coalesce, Concat
+from acme.application.interfaces import ProductRepository, OrderRepository, IdempotencyRepository, UnitOfWork
+from acme.application.dtos import OrderSummaryDTO, ExportFilterDTO, IdempotencyRecordDTO, CatalogVersionDTO, ProductSearchDTO, ProductVersionDTO
 from acme.domain.product import Product
 from acme.domain.order import Order, OrderItem
-from .models import ProductModel, OrderModel, OrderItemModel
+from .models import ProductModel, OrderModel, OrderItemModel, ArchivedOrderModel, IdempotencyKeyModel
+from .cache import CachedProductRepository
+from .outbox import DjangoOutboxRepository
+from .sales_rollups import DjangoSalesReportRepository
 
 # ----- mappers -----
 def product_to_domain(m: ProductModel) -> Product:
     return Product(id=m.id, sku=m.sku, name=m.name, price=Decimal(m.price), stock=m.stock)
 
-def order_to_domain(om: OrderModel) -> Order:
+def order_to_domain(om: OrderModel | ArchivedOrderModel) -> Order:
     items = [
         OrderItem(
             product_id=i.product_id, sku=i.sku, name=i.name,
             unit_price=Decimal(i.unit_price), quantity=i.quantity
         ) for i in om.items.all()
     ]
-    return Order(id=om.id, items=items)
+    return Order(id=om.id, items=items, created_at=om.created_at)
+
+def keyset_page(qs, after_id: int | None, limit: int, before_id: int | None = None) -> list:
+    # id-ordered range scan; rows before `before_id` are read backwards and flipped
+    if before_id is not None:
+        return list(qs.filter(id__lt=before_id).order_by("-id")[:limit])[::-1]
+    if after_id is not None:
+        qs = qs.filter(id__gt=after_id)
+    return list(qs.order_by("id")[:limit])
+
+def row_id(row) -> int:
+    # domain objects and DTOs, or the dicts of a sparse (projected) read
+    return row["id"] if isinstance(row, dict) else row.id
+
+def tiered_page(hot, archived, after_id: int | None, limit: int, before_id: int | None = None) -> list:
+    """keyset_page over the order tables, then the archive tables if the page reaches below them.
+
+    Every archived id is lower than every hot id (see archive.py), so the
+    archive is read only for the part of the range below the first hot row:
+    pages of recent orders never touch it.
+    """
+    rows = keyset_page(hot, after_id, limit, before_id)
+    if before_id is not None:
+        if len(rows) == limit:
+            return rows
+        return keyset_page(archived, None, limit - len(rows), row_id(rows[0]) if rows else before_id) + rows
+    if rows:
+        if after_id is not None and row_id(rows[0]) == after_id + 1:
+            return rows  # no id between the cursor and the first hot row
+        archived = archived.filter(id__lt=row_id(rows[0]))
+    return (keyset_page(archived, after_id, limit) + rows)[:limit]
+
+def lock_query(ids):
+    # Row locks for the products an order touches, taken in id order so two
+    # orders sharing products queue up instead of deadlocking. Only evaluated
+    # where the backend has SELECT ... FOR UPDATE (PostgreSQL); SQLite
+    # serializes writers with its database lock anyway.
+    return ProductModel.objects.select_for_update().filter(id__in=ids).order_by("id").values_list("id", flat=True)
+
+# SQLite keeps no range statistics, so it reads any range it has an index
+# for through that index, even one matching most of the table. There a range
+# filter is probed first: with at most this many matches it is read through
+# its index and the matches sorted by id; a wider one is applied to an
+# expression over the column instead, which leaves it to the id-ordered scan
+# that stops as soon as a page is full. Probing costs one index-only COUNT.
+# Other backends keep statistics and pick the plan themselves.
+SEARCH_INDEX_MAX_ROWS = 2000
+
+def _narrow(qs, **range_filter) -> bool:
+    return qs.filter(**range_filter).values("id")[:SEARCH_INDEX_MAX_ROWS].count() < SEARCH_INDEX_MAX_ROWS
+
+def _range_filter(qs, field: str, unindexed, **bounds):
+    """Filter `field` by `bounds` ({lookup: value}), through its index unless SQLite would read too much of it."""
+    indexed = {f"{field}__{op}": v for op, v in bounds.items()}
+    if connections[qs.db].vendor != "sqlite" or _narrow(qs.model.objects.all(), **indexed):
+        return qs.filter(**indexed)
+    return qs.alias(**{f"scan_{field}": unindexed}).filter(**{f"scan_{field}__{op}": v for op, v in bounds.items()})
+
+def _prefix_upper_bound(prefix: str) -> str | None:
+    """The least string above every string that starts with `prefix`; None if there is none."""
+    while prefix:
+        code = ord(prefix[-1]) + 1
+        if 0xD800 <= code <= 0xDFFF:
+            code = 0xE000  # surrogates can't be stored
+        if code <= 0x10FFFF:
+            return prefix[:-1] + chr(code)
+        prefix = prefix[:-1]  # U+10FFFF has no successor: carry into the previous character
+    return None
+
+def search_filter(qs, c: ProductSearchDTO):
+    if c.sku_prefix:
+        # the half-open range is the prefix match: case-sensitive on every backend
+        # (SQLite's LIKE is not) and servable by the unique sku index
+        bounds = {"gte": c.sku_prefix}
+        upper = _prefix_upper_bound(c.sku_prefix)
+        if upper is not None:
+            bounds["lt"] = upper
+        # `sku || ''` compares the same but keeps SQLite off the sku index
+        qs = _range_filter(qs, "sku", Concat(F("sku"), Value("")), **bounds)
+    if c.name_contains:
+        qs = qs.filter(name__icontains=c.name_contains)
+    price = {}
+    if c.min_price is not None:
+        price["gte"] = c.min_price
+    if c.max_price is not None:
+        price["lte"] = c.max_price
+    if price:
+        # `price + 0` keeps SQLite off the price index
+        unindexed = ExpressionWrapper(F("price") + 0, output_field=DecimalField(max_digits=10, decimal_places=2))
+        qs = _range_filter(qs, "price", unindexed, **price)
+    if c.in_stock is True:
+        qs = qs.filter(stock__gt=0)
+    elif c.in_stock is False:
+        qs = qs.filter(stock=0)
+    return qs
+
+EXPORT_CHUNK_SIZE = 2000
+
+def export_filter(qs, f: ExportFilterDTO):
+    if f.created_from is not None:
+        qs = qs.filter(created_at__gte=f.created_from)
+    if f.created_to is not None:
+        qs = qs.filter(created_at__lt=f.created_to)
+    if f.min_id is not None:
+        qs = qs.filter(id__gte=f.min_id)
+    if f.max_id is not None:
+        qs = qs.filter(id__lte=f.max_id)
+    return qs.order_by("id")
 
 # ----- repositories -----
 class DjangoProductRepository(ProductRepository):
@@ -25,8 +143,9 @@ class DjangoProductRepository(ProductRepository):
         return product_to_domain(m)
 
     def update(self, p: Product) -> None:
+        # QuerySet.update skips auto_now; version and updated_at drive the catalog validators
         ProductModel.objects.filter(id=p.id).update(
-            sku=p.sku, name=p.name, price=p.price, stock=p.stock
+            sku=p.sku, name=p.name, price=p.price, stock=p.stock, updated_at=timezone.now(), version=F("version") + 1
         )
 
     def get_by_id(self, id: int) -> Product | None:
@@ -37,37 +156,218 @@ class DjangoProductRepository(ProductRepository):
         m = ProductModel.objects.filter(sku=sku).first()
         return product_to_domain(m) if m else None
 
+    def get_many(self, ids: list[int]) -> dict[int, Product]:
+        return {m.id: product_to_domain(m) for m in ProductModel.objects.filter(id__in=set(ids))}
+
+    def lock_many(self, ids: list[int]) -> dict[int, Product]:
+        # FOR UPDATE in id order where supported; SQLite's BEGIN IMMEDIATE
+        # already holds the database write lock for the whole transaction
+        qs = ProductModel.objects.filter(id__in=set(ids)).order_by("id")
+        if connections[qs.db].features.has_select_for_update:
+            qs = qs.select_for_update()
+        return {m.id: product_to_domain(m) for m in qs}
+
+    def reserve_stock(self, quantities: dict[int, int]) -> bool:
+        # single UPDATE ... SET stock = stock - q WHERE stock >= q for all products;
+        # a short row count means some product ran out and the caller must roll back
+        if not quantities:
+            return True
+        locks = lock_query(list(quantities))
+        if connections[locks.db].features.has_select_for_update:
+            list(locks)
+        qty = Case(
+            *[When(id=pid, then=Value(q)) for pid, q in quantities.items()],
+            output_field=IntegerField(),
+        )
+        updated = ProductModel.objects.filter(id__in=quantities.keys(), stock__gte=qty).update(
+            stock=F("stock") - qty, updated_at=timezone.now(), version=F("version") + 1
+        )
+        return updated == len(quantities)
+
+    def upsert_many(self, products: list[Product]) -> list[int]:
+        # one existence query, then INSERT ... ON CONFLICT (sku) DO UPDATE for the whole batch
+        existing = list(ProductModel.objects.filter(sku__in=[p.sku for p in products]).values_list("id", flat=True))
+        models = ProductModel.objects.bulk_create(
+            [ProductModel(sku=p.sku, name=p.name, price=p.price, stock=p.stock) for p in products],
+            update_conflicts=True,
+            unique_fields=["sku"],
+            update_fields=["name", "price", "stock", "updated_at"],
+        )
+        if existing:
+            # ON CONFLICT can only copy the inserted values; bump the updated rows' versions here
+            ProductModel.objects.filter(id__in=existing).update(version=F("version") + 1)
+        for p, m in zip(products, models):
+            p.id = m.id  # None where the backend can't return ids from an upsert
+        return existing
+
+    def stream(self, f: ExportFilterDTO) -> Iterator[Product]:
+        for m in export_filter(ProductModel.objects.all(), f).iterator(chunk_size=EXPORT_CHUNK_SIZE):
+            yield product_to_domain(m)
+
+    def search(self, criteria: ProductSearchDTO, after_id: int | None, limit: int, before_id: int | None = None) -> list[Product]:
+        qs = search_filter(ProductModel.objects.all(), criteria)
+        return [product_to_domain(m) for m in keyset_page(qs, after_id, limit, before_id)]
+
+    def search_fields(self, criteria: ProductSearchDTO, fields: tuple[str, ...], after_id: int | None, limit: int, before_id: int | None = None) -> list[dict]:
+        # SELECT only these columns, no model instances or Products
+        qs = search_filter(ProductModel.objects.all(), criteria).values(*dict.fromkeys(("id", *fields)))
+        return keyset_page(qs, after_id, limit, before_id)
+
+    def catalog_version(self) -> CatalogVersionDTO:
+        # one aggregate over the (updated_at, version) index. The version sum, not
+        # MAX(updated_at), is what moves on every commit: with concurrent writers
+        # (PostgreSQL) a transaction can commit after one with a later timestamp
+        v = ProductModel.objects.aggregate(count=Count("id"), version=Sum("version"), last_modified=Max("updated_at"))
+        return CatalogVersionDTO(count=v["count"], version=v["version"] or 0, last_modified=v["last_modified"])
+
+    def product_version(self, id: int) -> ProductVersionDTO | None:
+        v = ProductModel.objects.filter(id=id).values("version", "updated_at").first()
+        return ProductVersionDTO(version=v["version"], last_modified=v["updated_at"]) if v else None
+
+    def list_page(self, after_id: int | None, limit: int, before_id: int | None = None) -> list[Product]:
+        return [product_to_domain(m) for m in keyset_page(ProductModel.objects.all(), after_id, limit, before_id)]
+
     def list(self) -> list[Product]:
         return [product_to_domain(m) for m in ProductModel.objects.all().order_by("id")]
 
 class DjangoOrderRepository(OrderRepository):
     def add(self, o: Order) -> Order:
-        om = OrderModel.objects.create()
-        bulk = []
-        for i in o.items:
-            pm = ProductModel.objects.get(id=i.product_id)
-            bulk.append(OrderItemModel(
-                order=om, product=pm, sku=i.sku, name=i.name,
+        om = OrderModel.objects.create(total=o.total, items_count=o.items_count)
+        OrderItemModel.objects.bulk_create([
+            OrderItemModel(
+                order_id=om.id, product_id=i.product_id, sku=i.sku, name=i.name,
+                unit_price=i.unit_price, quantity=i.quantity
+            ) for i in o.items
+        ])
+        # items are already in memory; no need to reload them
+        o.id = om.id
+        o.created_at = om.created_at
+        return o
+
+    def add_many(self, orders: list[Order]) -> list[Order]:
+        # two bulk INSERTs (batched by the backend's parameter limit) for any number of orders
+        models = OrderModel.objects.bulk_create([OrderModel(total=o.total, items_count=o.items_count) for o in orders])
+        OrderItemModel.objects.bulk_create([
+            OrderItemModel(
+                order_id=om.id, product_id=i.product_id, sku=i.sku, name=i.name,
                 unit_price=i.unit_price, quantity=i.quantity
-            ))
-        OrderItemModel.objects.bulk_create(bulk)
-        # reload with items to avoid incomplete return
-        om = OrderModel.objects.prefetch_related("items").get(id=om.id)
-        return order_to_domain(om)
+            ) for o, om in zip(orders, models) for i in o.items
+        ])
+        for o, om in zip(orders, models):
+            o.id = om.id
+            o.created_at = om.created_at
+        return orders
 
     def get_by_id(self, id: int) -> Order | None:
-        om = OrderModel.objects.filter(id=id).prefetch_related("items").first()
+        om = (
+            OrderModel.objects.filter(id=id).prefetch_related("items").first()
+            or ArchivedOrderModel.objects.filter(id=id).prefetch_related("items").first()
+        )
         return order_to_domain(om) if om else None
 
+    def get_summary(self, id: int) -> OrderSummaryDTO | None:
+        # the plain columns first: compiling summaries_query() costs more than
+        # the query itself; it is only needed for rows not yet backfilled
+        r = (
+            OrderModel.objects.filter(id=id).values("id", "total", "items_count").first()
+            or ArchivedOrderModel.objects.filter(id=id).values("id", "total", "items_count").first()
+        )
+        if r is None:
+            return None
+        if r["total"] is None or r["items_count"] is None:
+            return self._summary(self.summaries_query().get(id=id))
+        return OrderSummaryDTO(id=r["id"], items_count=r["items_count"], total=r["total"].quantize(Decimal("0.01")))
+
+    def stream(self, f: ExportFilterDTO) -> Iterator[Order]:
+        # items are prefetched per chunk, not for the whole result; archived
+        # orders have the lower ids, so they come first
+        for model in (ArchivedOrderModel, OrderModel):
+            q = export_filter(model.objects.prefetch_related("items"), f)
+            for om in q.iterator(chunk_size=EXPORT_CHUNK_SIZE):
+                yield order_to_domain(om)
+
+    def list_page(self, after_id: int | None, limit: int, before_id: int | None = None) -> list[Order]:
+        page = tiered_page(
+            OrderModel.objects.prefetch_related("items"), ArchivedOrderModel.objects.prefetch_related("items"),
+            after_id, limit, before_id,
+        )
+        return [order_to_domain(om) for om in page]
+
+    @staticmethod
+    def summaries_query():
+        # single-table read of the columns written by add(); rows placed before
+        # they existed (NULL until backfilled) fall back to aggregating their items
+        per_order = OrderItemModel.objects.filter(order_id=OuterRef("id")).order_by().values("order_id")
+        money = DecimalField(max_digits=12, decimal_places=2)
+        return OrderModel.objects.annotate(
+            items_total=Coalesce(
+                "total",
+                Subquery(per_order.annotate(s=Sum(F("unit_price") * F("quantity"), output_field=money)).values("s")),
+                Value(Decimal("0.00")), output_field=money,
+            ),
+            lines=Coalesce(
+                "items_count",
+                Subquery(per_order.annotate(c=Count("id")).values("c")),
+                Value(0),
+            ),
+        ).values("id", "lines", "items_total")
+
+    @staticmethod
+    def archived_summaries_query():
+        # archived rows always have their totals (see archive.py)
+        return ArchivedOrderModel.objects.values("id", lines=F("items_count"), items_total=F("total"))
+
+    @staticmethod
+    def _summary(r: dict) -> OrderSummaryDTO:
+        return OrderSummaryDTO(id=r["id"], items_count=r["lines"], total=r["items_total"].quantize(Decimal("0.01")))
+
+    def list_summaries(self, after_id: int | None, limit: int, before_id: int | None = None) -> list[OrderSummaryDTO]:
+        page = tiered_page(self.summaries_query(), self.archived_summaries_query(), after_id, limit, before_id)
+        return [self._summary(r) for r in page]
+
     def list(self) -> list[Order]:
-        q = OrderModel.objects.all().prefetch_related("items").order_by("id")
-        return [order_to_domain(om) for om in q]
+        return [
+            order_to_domain(om)
+            for model in (ArchivedOrderModel, OrderModel)
+            for om in model.objects.all().prefetch_related("items").order_by("id")
+        ]
+
+class DjangoIdempotencyRepository(IdempotencyRepository):
+    def get(self, key: str) -> IdempotencyRecordDTO | None:
+        row = IdempotencyKeyModel.objects.filter(key=key).values("request_hash", "response_body").first()
+        if not row:
+            return None
+        body = row["response_body"]
+        return IdempotencyRecordDTO(key=key, request_hash=row["request_hash"], response=json.loads(body) if body else None)
+
+    def claim(self, key: str, request_hash: str) -> bool:
+        # a concurrent holder of the key blocks this insert until it commits or rolls back;
+        # the savepoint keeps the outer transaction usable when we lose
+        try:
+            with transaction.atomic():
+                IdempotencyKeyModel.objects.create(key=key, request_hash=request_hash)
+        except IntegrityError:
+            return False
+        return True
+
+    def complete(self, key: str, response: dict) -> None:
+        IdempotencyKeyModel.objects.filter(key=key).update(response_body=json.dumps(response))
+
+def purge_idempotency_keys(older_than: timedelta) -> int:
+    """Delete keys claimed more than `older_than` ago; returns the number deleted."""
+    deleted, _ = IdempotencyKeyModel.objects.filter(created_at__lt=timezone.now() - older_than).delete()
+    return deleted
 
 # ----- Unit of Work -----
 class DjangoUnitOfWork(UnitOfWork):
     def __init__(self):
         self.products = DjangoProductRepository()
+        if settings.PRODUCT_CACHE_ALIAS:
+            self.products = CachedProductRepository(self.products, settings.PRODUCT_CACHE_ALIAS)
         self.orders = DjangoOrderRepository()
+        self.idempotency = DjangoIdempotencyRepository()
+        self.outbox = DjangoOutboxRepository()
+        self.reports = DjangoSalesReportRepository()
         self._atomic = None
         self._committed = False
 
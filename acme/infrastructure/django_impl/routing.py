@@ -0,0 +1,97 @@
+"""Read replicas for product and order reads, with read-your-writes pinning.
+
+`ReplicaRouter` sends a read of the product/order tables to one of
+`DATABASE_REPLICAS` when all of these hold:
+
+- it is not inside a transaction on the primary (a `DjangoUnitOfWork`
+  or any other `atomic()` block), so reads that lead to writes stay consistent;
+- the current request isn't pinned to the primary (`pinned_to_primary`);
+- at least one replica is configured.
+
+Every other read goes to "default", and so does every write. Writes mark
+the request state, so the web layer can pin the client for a while (see
+webapi.consistency). Outside a request nothing is pinned.
+
+The state is a mutable object held in a context variable. It follows the
+request into `sync_to_async` threads, and writes made there are seen by the
+middleware.
+"""
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+# models whose reads may be served by a replica (lower-case model names)
+REPLICATED = {"productmodel", "ordermodel", "orderitemmodel", "archivedordermodel", "archivedorderitemmodel"}
+
+
+class RoutingState:
+    __slots__ = ("pinned", "wrote", "replica")
+
+    def __init__(self, pinned: bool = False):
+        self.pinned = pinned
+        self.wrote = False
+        self.replica: str | None = None  # chosen on the first replica read
+
+_state: ContextVar[RoutingState | None] = ContextVar("db_routing", default=None)
+
+def begin_request(pinned: bool) -> tuple[RoutingState, object]:
+    """Start routing state for a request; returns it and the token to `end_request` with."""
+    state = RoutingState(pinned)
+    return state, _state.set(state)
+
+def end_request(token) -> None:
+    _state.reset(token)
+
+@contextmanager
+def pinned_to_primary():
+    """Send the reads in this block to the primary."""
+    state = _state.get()
+    if state is None:
+        state, token = begin_request(pinned=True)
+        try:
+            yield
+        finally:
+            end_request(token)
+        return
+    was, state.pinned = state.pinned, True
+    try:
+        yield
+    finally:
+        state.pinned = was
+
+
+class ReplicaRouter:
+    def __init__(self, replicas: list[str] | None = None):
+        self.replicas = list(settings.DATABASE_REPLICAS if replicas is None else replicas)
+
+    def db_for_read(self, model, **hints):
+        if not self.replicas or model._meta.model_name not in REPLICATED:
+            return DEFAULT_DB_ALIAS
+        instance = hints.get("instance")
+        if instance is not None and instance._state.db:
+            return instance._state.db  # related rows (prefetches) from where their parent came from
+        state = _state.get()
+        if (state is not None and state.pinned) or connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return DEFAULT_DB_ALIAS
+        if state is None:
+            return random.choice(self.replicas)
+        # one replica per request, so its reads agree with each other
+        if state.replica is None:
+            state.replica = random.choice(self.replicas)
+        return state.replica
+
+    def db_for_write(self, model, **hints):
+        state = _state.get()
+        if state is not None:
+            state.wrote = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True  # every alias holds the same data
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # replicas get their schema from the primary
+        return db == DEFAULT_DB_ALIAS
@@ -0,0 +1,150 @@
+"""Sales rollups: per-day and per-product-per-day totals, folded in from orders.
+
+`advance` walks the orders past the high-water mark in id order, one chunk
+(and one transaction) at a time. It adds each chunk to the rollup rows and
+moves the mark in that same transaction, so a crashed run neither loses nor
+double-counts orders. The walk stops at the first order younger than
+`settle_seconds`; it and every later order wait for the next run. Ids are
+handed out at INSERT time, so on PostgreSQL a lower id can still be
+uncommitted while a higher one is already visible, and timestamps are
+taken before the INSERT, so a lower id can carry the later timestamp.
+
+Archived orders (see archive.py) are folded in from the archive tables.
+They all have lower ids than the orders still in the order tables, so the
+walk reads the archive first and needs it only below the first hot id; in
+practice only after `reset`.
+
+`DjangoSalesReportRepository` reads the rollups only.
+"""
+from datetime import date, timedelta
+from decimal import Decimal
+from itertools import takewhile
+from typing import Iterator
+from django.db import connections, transaction
+from django.db.models import Count, DecimalField, F, Max, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+from acme.application.interfaces import SalesReportRepository
+from acme.application.dtos import DailySalesDTO, ProductSalesDTO
+from .models import (
+    ArchivedOrderItemModel, ArchivedOrderModel, DailySalesModel, OrderItemModel, OrderModel,
+    ProductDailySalesModel, RollupStateModel,
+)
+
+ROLLUP = "sales"
+CENTS = Decimal("0.01")
+
+def locked_state() -> RollupStateModel:
+    # one job at a time: the state row is locked for the whole chunk
+    RollupStateModel.objects.get_or_create(name=ROLLUP)
+    qs = RollupStateModel.objects.filter(name=ROLLUP)
+    if connections[qs.db].features.has_select_for_update:
+        qs = qs.select_for_update()
+    return qs.get()
+
+def fold(order_ids: list[int], archived: bool = False) -> None:
+    """Add these orders (archived ones with `archived`) to the rollups (call inside a transaction)."""
+    order_model, item_model = (ArchivedOrderModel, ArchivedOrderItemModel) if archived else (OrderModel, OrderItemModel)
+    money = DecimalField(max_digits=14, decimal_places=2)
+    lines = (
+        item_model.objects.filter(order_id__in=order_ids).order_by()
+        .values(day=TruncDate("order__created_at"), pid=F("product_id"))
+        .annotate(units=Sum("quantity"), revenue=Sum(F("unit_price") * F("quantity"), output_field=money), last_sku=Max("sku"))
+    )
+    orders = (
+        order_model.objects.filter(id__in=order_ids).order_by()
+        .values(day=TruncDate("created_at")).annotate(n=Count("id"))
+    )
+
+    daily: dict[date, list] = {r["day"]: [r["n"], 0, Decimal("0")] for r in orders}
+    per_product: dict[tuple[date, int], list] = {}
+    for r in lines:
+        daily[r["day"]][1] += r["units"]
+        daily[r["day"]][2] += r["revenue"]
+        per_product[(r["day"], r["pid"])] = [r["last_sku"], r["units"], r["revenue"]]
+
+    existing = {m.day: m for m in DailySalesModel.objects.filter(day__in=daily)}
+    new = []
+    for day, (n, units, revenue) in daily.items():
+        m = existing.get(day) or DailySalesModel(day=day)
+        m.orders += n
+        m.units += units
+        m.revenue = (Decimal(m.revenue) + revenue).quantize(CENTS)
+        if m.pk is None:
+            new.append(m)
+    DailySalesModel.objects.bulk_update(existing.values(), ["orders", "units", "revenue"])
+    DailySalesModel.objects.bulk_create(new)
+
+    existing = {
+        (m.day, m.product_id): m for m in ProductDailySalesModel.objects.filter(
+            day__in=daily, product_id__in={pid for _, pid in per_product}
+        )
+    }
+    new = []
+    for (day, pid), (sku, units, revenue) in per_product.items():
+        m = existing.get((day, pid)) or ProductDailySalesModel(day=day, product_id=pid)
+        m.sku = sku
+        m.units += units
+        m.revenue = (Decimal(m.revenue) + revenue).quantize(CENTS)
+        if m.pk is None:
+            new.append(m)
+    ProductDailySalesModel.objects.bulk_update(existing.values(), ["sku", "units", "revenue"])
+    ProductDailySalesModel.objects.bulk_create(new)
+
+def _ids_past(model, mark: int, cutoff, limit: int) -> tuple[list[int], bool]:
+    # the settled ids past the mark, and whether an unsettled one stopped the
+    # walk: the mark must never pass it
+    rows = list(model.objects.filter(id__gt=mark).order_by("id").values_list("id", "created_at")[:limit])
+    ids = [id for id, created_at in takewhile(lambda r: r[1] < cutoff, rows)]
+    return ids, len(ids) < len(rows)
+
+def advance(chunk_size: int = 1000, settle_seconds: float = 60.0) -> Iterator[int]:
+    """Fold in orders past the high-water mark; yields the number of orders per chunk."""
+    while True:
+        cutoff = timezone.now() - timedelta(seconds=settle_seconds)
+        with transaction.atomic():
+            state = locked_state()
+            # archived ids are all lower, so they come first
+            archived, blocked = _ids_past(ArchivedOrderModel, state.high_water_mark, cutoff, chunk_size)
+            ids = [] if blocked or len(archived) == chunk_size else _ids_past(OrderModel, state.high_water_mark, cutoff, chunk_size - len(archived))[0]
+            if not archived and not ids:
+                return
+            if archived:
+                fold(archived, archived=True)
+            if ids:
+                fold(ids)
+            state.high_water_mark = (ids or archived)[-1]
+            state.save(update_fields=["high_water_mark", "updated_at"])
+        yield len(archived) + len(ids)
+
+def reset() -> None:
+    """Empty the rollups and rewind the mark; `advance` then rebuilds them from every order."""
+    with transaction.atomic():
+        state = locked_state()
+        DailySalesModel.objects.all().delete()
+        ProductDailySalesModel.objects.all().delete()
+        state.high_water_mark = 0
+        state.save(update_fields=["high_water_mark", "updated_at"])
+
+# ----- reads -----
+class DjangoSalesReportRepository(SalesReportRepository):
+    def daily(self, first: date, last: date) -> list[DailySalesDTO]:
+        return [
+            DailySalesDTO(day=m.day, orders=m.orders, units=m.units, revenue=Decimal(m.revenue).quantize(CENTS))
+            for m in DailySalesModel.objects.filter(day__range=(first, last)).order_by("day")
+        ]
+
+    def top_products(self, first: date, last: date, by: str, limit: int) -> list[ProductSalesDTO]:
+        rows = (
+            ProductDailySalesModel.objects.filter(day__range=(first, last))
+            .values("product_id").annotate(total_units=Sum("units"), total_revenue=Sum("revenue"), last_sku=Max("sku"))
+            .order_by(f"-total_{by}", "product_id")[:limit]
+        )
+        return [
+            ProductSalesDTO(product_id=r["product_id"], sku=r["last_sku"], units=r["total_units"],
+                            revenue=Decimal(r["total_revenue"]).quantize(CENTS))
+            for r in rows
+        ]
+
+    def high_water_mark(self) -> int:
+        return RollupStateModel.objects.filter(name=ROLLUP).values_list("high_water_mark", flat=True).first() or 0
@@ -0,0 +1,71 @@
+from acme.application.interfaces import AsyncProductRepository, AsyncOrderRepository, AsyncOutboxRepository, AsyncUnitOfWork
+from acme.application.dtos import OrderSummaryDTO
+from acme.domain.events import DomainEvent
+from acme.domain.product import Product
+from acme.domain.order import Order
+from .repositories import MemoryStore, MemoryUnitOfWork, MemoryProductRepository, MemoryOrderRepository, MemoryOutboxRepository
+
+# Async facades over the in-memory repositories. Every call runs inline and
+# never suspends, so a unit of work's body only interleaves with other tasks
+# where the caller itself awaits something else.
+
+class MemoryAsyncProductRepository(AsyncProductRepository):
+    def __init__(self, inner: MemoryProductRepository):
+        self.inner = inner
+
+    async def get_by_id(self, id: int) -> Product | None:
+        return self.inner.get_by_id(id)
+
+    async def get_by_sku(self, sku: str) -> Product | None:
+        return self.inner.get_by_sku(sku)
+
+    async def get_many(self, ids: list[int]) -> dict[int, Product]:
+        return self.inner.get_many(ids)
+
+    async def lock_many(self, ids: list[int]) -> dict[int, Product]:
+        return self.inner.lock_many(ids)
+
+    async def reserve_stock(self, quantities: dict[int, int]) -> bool:
+        return self.inner.reserve_stock(quantities)
+
+    async def list_page(self, after_id: int | None, limit: int, before_id: int | None = None) -> list[Product]:
+        return self.inner.list_page(after_id, limit, before_id)
+
+class MemoryAsyncOrderRepository(AsyncOrderRepository):
+    def __init__(self, inner: MemoryOrderRepository):
+        self.inner = inner
+
+    async def add(self, o: Order) -> Order:
+        return self.inner.add(o)
+
+    async def get_by_id(self, id: int) -> Order | None:
+        return self.inner.get_by_id(id)
+
+    async def list_summaries(self, after_id: int | None, limit: int, before_id: int | None = None) -> list[OrderSummaryDTO]:
+        return self.inner.list_summaries(after_id, limit, before_id)
+
+class MemoryAsyncOutboxRepository(AsyncOutboxRepository):
+    def __init__(self, inner: MemoryOutboxRepository):
+        self.inner = inner
+
+    async def add(self, events: list[DomainEvent]) -> None:
+        self.inner.add(events)
+
+# ----- Unit of Work -----
+class MemoryAsyncUnitOfWork(AsyncUnitOfWork):
+    def __init__(self, store: MemoryStore | None = None):
+        self._uow = MemoryUnitOfWork(store)
+        self.store = self._uow.store
+        self.products = MemoryAsyncProductRepository(self._uow.products)
+        self.orders = MemoryAsyncOrderRepository(self._uow.orders)
+        self.outbox = MemoryAsyncOutboxRepository(self._uow.outbox)
+
+    async def __aenter__(self):
+        self._uow.__enter__()
+        return self
+
+    async def commit(self) -> None:
+        self._uow.commit()
+
+    async def __aexit__(self, exc_type, exc, tb):
+        return self._uow.__exit__(exc_type, exc, tb)
@@ -0,0 +1,426 @@
+"""In-memory implementation of every port, for tests, benchmarks and ephemeral runs.
+
+A `MemoryStore` plays the database. Its committed `Tables` are never changed
+in place. A unit of work forks them, and the fork copies a table (a dict or
+list of references, not the rows) the first time it writes to it. Commit
+swaps the fork in; rollback drops it. Readers outside a unit of work see the
+last committed state, like WAL readers, so only writers need the store's
+lock. It is held from `__enter__` to `__exit__`, which serializes write
+transactions the way SQLite's BEGIN IMMEDIATE does.
+
+The transaction stack is per store and per thread, like Django's connection.
+Nested units of work are savepoints, and repository writes outside any unit
+of work autocommit. Rows go in and come out as copies, so callers can't
+change stored state behind the store's back.
+"""
+import threading
+from bisect import bisect_left, bisect_right
+from contextlib import contextmanager
+from copy import copy, deepcopy
+from dataclasses import dataclass, replace
+from datetime import date, datetime, timedelta, timezone
+from decimal import Decimal
+from typing import Callable, Iterator
+from acme.application.interfaces import (
+    ProductRepository, OrderRepository, IdempotencyRepository, OutboxRepository, SalesReportRepository, UnitOfWork,
+)
+from acme.application.dtos import (
+    OrderSummaryDTO, ExportFilterDTO, IdempotencyRecordDTO, CatalogVersionDTO, ProductSearchDTO, ProductVersionDTO,
+    OutboxMessageDTO, OutboxStatsDTO, DailySalesDTO, ProductSalesDTO,
+)
+from acme.domain.events import DomainEvent
+from acme.domain.errors import ValidationError
+from acme.domain.order import Order
+from acme.domain.product import Product
+
+# ----- tables -----
+@dataclass
+class OutboxRow:
+    id: int
+    event: DomainEvent
+    created_at: datetime
+    available_at: datetime
+    attempts: int = 0
+    last_error: str = ""
+    delivered_at: datetime | None = None
+
+TABLES = {
+    "products": dict,  # id -> Product
+    "product_ids": list,  # ascending; ids are never reused
+    "skus": dict,  # sku -> id
+    "product_times": dict,  # id -> (created_at, updated_at, version)
+    "orders": dict,  # id -> Order
+    "order_ids": list,
+    "idempotency": dict,  # key -> IdempotencyRecordDTO
+    "outbox": dict,  # id -> OutboxRow, in id order
+    "seq": dict,  # table -> last id handed out
+}
+
+class Tables:
+    __slots__ = (*TABLES, "_own")
+
+    def __init__(self):
+        for name, empty in TABLES.items():
+            setattr(self, name, empty())
+        self._own = set(TABLES)
+
+    def fork(self) -> "Tables":
+        child = Tables.__new__(Tables)
+        for name in TABLES:
+            setattr(child, name, getattr(self, name))
+        child._own = set()
+        return child
+
+    def w(self, name: str):
+        """The table, writable: copied on the first write in this fork."""
+        if name not in self._own:
+            setattr(self, name, copy(getattr(self, name)))
+            self._own.add(name)
+        return getattr(self, name)
+
+    def next_id(self, table: str) -> int:
+        seq = self.w("seq")
+        seq[table] = seq.get(table, 0) + 1
+        return seq[table]
+
+def keyset(ids: list[int], rows: dict, after_id: int | None, limit: int, before_id: int | None = None,
+           match: Callable = lambda row: True) -> list:
+    # the same pages as repositories.keyset_page: ascending ids, `before_id` read backwards
+    out = []
+    if before_id is not None:
+        positions = range(bisect_left(ids, before_id) - 1, -1, -1)
+    else:
+        positions = range(bisect_right(ids, after_id) if after_id is not None else 0, len(ids))
+    for n in positions:
+        if len(out) == limit:
+            break
+        if match(rows[ids[n]]):
+            out.append(rows[ids[n]])
+    return out[::-1] if before_id is not None else out
+
+def copy_order(o: Order) -> Order:
+    return Order(id=o.id, items=list(o.items), created_at=o.created_at)
+
+def in_export(f: ExportFilterDTO, id: int, created_at: datetime) -> bool:
+    return ((f.created_from is None or created_at >= f.created_from)
+            and (f.created_to is None or created_at < f.created_to)
+            and (f.min_id is None or id >= f.min_id)
+            and (f.max_id is None or id <= f.max_id))
+
+def search_match(c: ProductSearchDTO) -> Callable[[Product], bool]:
+    name = c.name_contains.lower() if c.name_contains else None
+    return lambda p: (
+        (not c.sku_prefix or p.sku.startswith(c.sku_prefix))
+        and (name is None or name in p.name.lower())
+        and (c.min_price is None or p.price >= c.min_price)
+        and (c.max_price is None or p.price <= c.max_price)
+        and (c.in_stock is None or (p.stock > 0) == c.in_stock)
+    )
+
+# ----- store -----
+class MemoryStore:
+    """Committed tables, the writer lock and the clock used for timestamps."""
+
+    def __init__(self, clock: Callable[[], datetime] = lambda: datetime.now(timezone.utc)):
+        self.tables = Tables()
+        self.lock = threading.RLock()
+        self.clock = clock
+        self._local = threading.local()
+
+    @property
+    def stack(self) -> list[list]:
+        # [tables, committed] per open unit of work in this thread, innermost last
+        if not hasattr(self._local, "stack"):
+            self._local.stack = []
+        return self._local.stack
+
+    def read(self) -> Tables:
+        return self.stack[-1][0] if self.stack else self.tables
+
+    @contextmanager
+    def write(self) -> Iterator[Tables]:
+        if self.stack:
+            yield self.stack[-1][0]
+            return
+        with self.lock:  # autocommit: a transaction of its own, dropped if it raises
+            self.stack.append([self.tables.fork(), True])
+            try:
+                yield self.stack[-1][0]
+            except BaseException:
+                self.stack.pop()
+                raise
+            self.tables = self.stack.pop()[0]
+
+# ----- repositories -----
+class MemoryProductRepository(ProductRepository):
+    def __init__(self, store: MemoryStore):
+        self.store = store
+
+    def add(self, p: Product) -> Product:
+        with self.store.write() as t:
+            if p.sku in t.skus:
+                raise ValidationError("SKU already exists.")
+            p = replace(p, id=t.next_id("products"))
+            now = self.store.clock()
+            t.w("products")[p.id] = p
+            t.w("product_ids").append(p.id)
+            t.w("skus")[p.sku] = p.id
+            t.w("product_times")[p.id] = (now, now, 1)
+            t.next_id("product_writes")
+        return copy(p)
+
+    def _put(self, t: Tables, p: Product) -> None:
+        old = t.products[p.id]
+        if p.sku != old.sku:
+            if p.sku in t.skus:
+                raise ValidationError("SKU already exists.")
+            del t.w("skus")[old.sku]
+            t.w("skus")[p.sku] = p.id
+        t.w("products")[p.id] = copy(p)
+        created_at, _, version = t.product_times[p.id]
+        t.w("product_times")[p.id] = (created_at, self.store.clock(), version + 1)
+        t.next_id("product_writes")  # the catalog version
+
+    def update(self, p: Product) -> None:
+        with self.store.write() as t:
+            if p.id in t.products:
+                self._put(t, p)
+
+    def get_by_id(self, id: int) -> Product | None:
+        p = self.store.read().products.get(id)
+        return copy(p) if p else None
+
+    def get_by_sku(self, sku: str) -> Product | None:
+        t = self.store.read()
+        id = t.skus.get(sku)
+        return copy(t.products[id]) if id is not None else None
+
+    def get_many(self, ids: list[int]) -> dict[int, Product]:
+        products = self.store.read().products
+        return {i: copy(products[i]) for i in set(ids) if i in products}
+
+    def lock_many(self, ids: list[int]) -> dict[int, Product]:
+        return self.get_many(ids)  # the unit of work already holds the store's writer lock
+
+    def reserve_stock(self, quantities: dict[int, int]) -> bool:
+        with self.store.write() as t:
+            if any(i not in t.products or t.products[i].stock < q for i, q in quantities.items()):
+                return False
+            for i, q in quantities.items():
+                p = copy(t.products[i])
+                p.stock -= q
+                self._put(t, p)
+        return True
+
+    def upsert_many(self, products: list[Product]) -> list[int]:
+        with self.store.write() as t:
+            existing = [t.skus[p.sku] for p in products if p.sku in t.skus]
+            for p in products:
+                if p.sku in t.skus:
+                    p.id = t.skus[p.sku]
+                    self._put(t, p)
+                else:
+                    p.id = self.add(p).id
+        return existing
+
+    def stream(self, f: ExportFilterDTO) -> Iterator[Product]:
+        t = self.store.read()
+        for i in t.product_ids:
+            if in_export(f, i, t.product_times[i][0]):
+                yield copy(t.products[i])
+
+    def search(self, criteria: ProductSearchDTO, after_id: int | None, limit: int, before_id: int | None = None) -> list[Product]:
+        t = self.store.read()
+        return [copy(p) for p in keyset(t.product_ids, t.products, after_id, limit, before_id, search_match(criteria))]
+
+    def search_fields(self, criteria: ProductSearchDTO, fields: tuple[str, ...], after_id: int | None, limit: int, before_id: int | None = None) -> list[dict]:
+        t = self.store.read()
+        keys = tuple(dict.fromkeys(("id", *fields)))
+        return [
+            {k: getattr(p, k) for k in keys}
+            for p in keyset(t.product_ids, t.products, after_id, limit, before_id, search_match(criteria))
+        ]
+
+    def catalog_version(self) -> CatalogVersionDTO:
+        t = self.store.read()
+        return CatalogVersionDTO(
+            count=len(t.products), version=t.seq.get("product_writes", 0),
+            last_modified=max((u for _, u, _ in t.product_times.values()), default=None),
+        )
+
+    def product_version(self, id: int) -> ProductVersionDTO | None:
+        times = self.store.read().product_times.get(id)
+        return ProductVersionDTO(version=times[2], last_modified=times[1]) if times else None
+
+    def list_page(self, after_id: int | None, limit: int, before_id: int | None = None) -> list[Product]:
+        t = self.store.read()
+        return [copy(p) for p in keyset(t.product_ids, t.products, after_id, limit, before_id)]
+
+    def list(self) -> list[Product]:
+        t = self.store.read()
+        return [copy(t.products[i]) for i in t.product_ids]
+
+class MemoryOrderRepository(OrderRepository):
+    def __init__(self, store: MemoryStore):
+        self.store = store
+
+    def add(self, o: Order) -> Order:
+        return self.add_many([o])[0]
+
+    def add_many(self, orders: list[Order]) -> list[Order]:
+        with self.store.write() as t:
+            now = self.store.clock()
+            for o in orders:
+                o.id = t.next_id("orders")
+                o.created_at = now
+                t.w("orders")[o.id] = copy_order(o)
+                t.w("order_ids").append(o.id)
+        return orders
+
+    def get_by_id(self, id: int) -> Order | None:
+        o = self.store.read().orders.get(id)
+        return copy_order(o) if o else None
+
+    def get_summary(self, id: int) -> OrderSummaryDTO | None:
+        o = self.store.read().orders.get(id)
+        return OrderSummaryDTO(id=o.id, items_count=o.items_count, total=o.total) if o else None
+
+    def stream(self, f: ExportFilterDTO) -> Iterator[Order]:
+        t = self.store.read()
+        for i in t.order_ids:
+            if in_export(f, i, t.orders[i].created_at):
+                yield copy_order(t.orders[i])
+
+    def list_page(self, after_id: int | None, limit: int, before_id: int | None = None) -> list[Order]:
+        t = self.store.read()
+        return [copy_order(o) for o in keyset(t.order_ids, t.orders, after_id, limit, before_id)]
+
+    def list_summaries(self, after_id: int | None, limit: int, before_id: int | None = None) -> list[OrderSummaryDTO]:
+        t = self.store.read()
+        return [
+            OrderSummaryDTO(id=o.id, items_count=o.items_count, total=o.total)
+            for o in keyset(t.order_ids, t.orders, after_id, limit, before_id)
+        ]
+
+    def list(self) -> list[Order]:
+        t = self.store.read()
+        return [copy_order(t.orders[i]) for i in t.order_ids]
+
+class MemoryIdempotencyRepository(IdempotencyRepository):
+    def __init__(self, store: MemoryStore):
+        self.store = store
+
+    def get(self, key: str) -> IdempotencyRecordDTO | None:
+        record = self.store.read().idempotency.get(key)
+        return deepcopy(record) if record else None
+
+    def claim(self, key: str, request_hash: str) -> bool:
+        with self.store.write() as t:
+            if key in t.idempotency:
+                return False
+            t.w("idempotency")[key] = IdempotencyRecordDTO(key=key, request_hash=request_hash, response=None)
+        return True
+
+    def complete(self, key: str, response: dict) -> None:
+        with self.store.write() as t:
+            if key in t.idempotency:
+                t.w("idempotency")[key] = replace(t.idempotency[key], response=deepcopy(response))
+
+class MemoryOutboxRepository(OutboxRepository):
+    def __init__(self, store: MemoryStore):
+        self.store = store
+
+    def add(self, events: list[DomainEvent]) -> None:
+        with self.store.write() as t:
+            now = self.store.clock()
+            for e in events:
+                id = t.next_id("outbox")
+                t.w("outbox")[id] = OutboxRow(id=id, event=e, created_at=now, available_at=now)
+
+    def claim(self, limit: int, lease_seconds: float) -> list[OutboxMessageDTO]:
+        with self.store.write() as t:
+            now = self.store.clock()
+            rows = [r for r in t.outbox.values() if r.delivered_at is None and r.available_at <= now][:limit]
+            for r in rows:
+                t.w("outbox")[r.id] = replace(r, available_at=now + timedelta(seconds=lease_seconds), attempts=r.attempts + 1)
+        return [OutboxMessageDTO(id=r.id, event=r.event, created_at=r.created_at, attempts=r.attempts + 1) for r in rows]
+
+    def mark_delivered(self, ids: list[int]) -> None:
+        with self.store.write() as t:
+            now = self.store.clock()
+            for i in ids:
+                t.w("outbox")[i] = replace(t.outbox[i], delivered_at=now, last_error="")
+
+    def mark_failed(self, id: int, error: str, retry_in_seconds: float) -> None:
+        with self.store.write() as t:
+            t.w("outbox")[id] = replace(
+                t.outbox[id], available_at=self.store.clock() + timedelta(seconds=retry_in_seconds), last_error=error
+            )
+
+    def stats(self) -> OutboxStatsDTO:
+        pending = [r for r in self.store.read().outbox.values() if r.delivered_at is None]
+        return OutboxStatsDTO(pending=len(pending), oldest_pending=min((r.created_at for r in pending), default=None))
+
+class MemorySalesReportRepository(SalesReportRepository):
+    """Computed from the orders on every call: there are no rollups to lag behind."""
+
+    def __init__(self, store: MemoryStore):
+        self.store = store
+
+    def _orders(self, first: date, last: date) -> Iterator[Order]:
+        orders = self.store.read().orders
+        return (o for o in orders.values() if first <= o.created_at.date() <= last)
+
+    def daily(self, first: date, last: date) -> list[DailySalesDTO]:
+        days: dict[date, DailySalesDTO] = {}
+        for o in self._orders(first, last):
+            d = days.setdefault(o.created_at.date(), DailySalesDTO(o.created_at.date(), 0, 0, Decimal("0.00")))
+            d.orders += 1
+            d.units += sum(i.quantity for i in o.items)
+            d.revenue += o.total
+        return sorted(days.values(), key=lambda d: d.day)
+
+    def top_products(self, first: date, last: date, by: str, limit: int) -> list[ProductSalesDTO]:
+        products: dict[int, ProductSalesDTO] = {}
+        for o in self._orders(first, last):
+            for i in o.items:
+                p = products.setdefault(i.product_id, ProductSalesDTO(i.product_id, i.sku, 0, Decimal("0.00")))
+                p.sku = max(p.sku, i.sku)  # as the rollups do
+                p.units += i.quantity
+                p.revenue += i.line_total
+        return sorted(products.values(), key=lambda p: (-getattr(p, by), p.product_id))[:limit]
+
+    def high_water_mark(self) -> int:
+        ids = self.store.read().order_ids
+        return ids[-1] if ids else 0
+
+# ----- Unit of Work -----
+class MemoryUnitOfWork(UnitOfWork):
+    def __init__(self, store: MemoryStore | None = None):
+        self.store = store or MemoryStore()
+        self.products = MemoryProductRepository(self.store)
+        self.orders = MemoryOrderRepository(self.store)
+        self.idempotency = MemoryIdempotencyRepository(self.store)
+        self.outbox = MemoryOutboxRepository(self.store)
+        self.reports = MemorySalesReportRepository(self.store)
+
+    def __enter__(self):
+        self.store.lock.acquire()
+        self.store.stack.append([self.store.read().fork(), False])
+        return self
+
+    def commit(self) -> None:
+        self.store.stack[-1][1] = True  # applied at __exit__ if nothing raises
+
+    def __exit__(self, exc_type, exc, tb):
+        stack = self.store.stack
+        tables, committed = stack.pop()
+        try:
+            if committed and exc_type is None:
+                if stack:  # savepoint released into the enclosing unit of work
+                    tables._own |= {n for n in stack[-1][0]._own if getattr(tables, n) is getattr(stack[-1][0], n)}
+                    stack[-1][0] = tables
+                else:
+                    self.store.tables = tables
+        finally:
+            self.store.lock.release()
@@ -0,0 +1,103 @@
+"""Run the benchmark suite on a freshly seeded SQLite database.
+
+    python -m benchmarks --products 10000 --orders 50000 -o results.json
+    python -m benchmarks -o new.json --compare results.json --threshold 0.25
+
+With --compare the exit status is 1 when any p50/p99 grew past the threshold
+or any query count grew at all.
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+
+
+def _same_database(db: dict, name: str) -> bool:
+    if db["ENGINE"].endswith("sqlite3"):
+        return os.path.realpath(db["NAME"]) == os.path.realpath(name)
+    return str(db["NAME"]) == name
+
+
+def reset_database(settings) -> None:
+    """Start from an empty, migrated database: a new SQLite file, or a flushed PostgreSQL one."""
+    from django.core.management import call_command
+
+    db = settings.DATABASES["default"]
+    app_db = getattr(settings, "APP_DATABASE_NAME", None)
+    if app_db is not None and _same_database(db, app_db):
+        raise SystemExit(f"refusing to reset {db['NAME']}: it is the application's database")
+    if db["ENGINE"].endswith("sqlite3"):
+        for suffix in ("", "-wal", "-shm"):
+            if os.path.exists(f"{db['NAME']}{suffix}"):
+                os.remove(f"{db['NAME']}{suffix}")
+    call_command("migrate", verbosity=0)
+    if not db["ENGINE"].endswith("sqlite3"):
+        call_command("flush", interactive=False, verbosity=0)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description=__doc__.splitlines()[0])
+    parser.add_argument("--products", type=int, default=2000, help="catalog size to seed")
+    parser.add_argument("--orders", type=int, default=5000, help="order history size to seed")
+    parser.add_argument("--order-lines", type=int, default=5, help="lines per benchmarked order")
+    parser.add_argument("--repeat", type=int, default=200, help="timed runs per benchmark")
+    parser.add_argument("--suite", action="append", choices=["micro", "services", "endpoints", "search"],
+                        help="run only these suites (repeatable)")
+    parser.add_argument("--output", "-o", help="write results JSON here (default: stdout)")
+    parser.add_argument("--compare", metavar="BASELINE", help="results JSON to compare against")
+    parser.add_argument("--threshold", type=float, default=0.2, help="allowed p50/p99 growth (0.2 = 20%%)")
+    parser.add_argument("--db", help="SQLite file to (re)create; defaults to a temp file")
+    opts = parser.parse_args(argv)
+
+    if opts.db:
+        os.environ["ACME_BENCH_DB"] = opts.db
+    os.environ["DJANGO_SETTINGS_MODULE"] = "benchmarks.settings"
+    import django
+    from django.conf import settings
+    django.setup()
+    from .harness import compare, seed
+    from .suites import SUITES
+
+    reset_database(settings)
+    t0 = time.perf_counter()
+    seed(opts.products, opts.orders)
+    print(f"seeded {opts.products} products / {opts.orders} orders in {time.perf_counter() - t0:.1f}s", file=sys.stderr)
+
+    results = []
+    for name in opts.suite or list(SUITES):
+        results.extend(SUITES[name](opts))
+    report = {
+        "meta": {
+            "python": platform.python_version(),
+            "django": django.get_version(),
+            "products": opts.products,
+            "orders": opts.orders,
+            "order_lines": opts.order_lines,
+            "repeat": opts.repeat,
+        },
+        "results": results,
+    }
+
+    text = json.dumps(report, indent=2)
+    if opts.output:
+        with open(opts.output, "w", encoding="utf-8") as fh:
+            fh.write(text + "\n")
+    else:
+        print(text)
+    for r in results:
+        q = "" if r["queries"] is None else f"  {r['queries']} queries"
+        print(f"{r['name']:<45} p50 {r['p50_ms']:>9.3f}ms  p99 {r['p99_ms']:>9.3f}ms{q}", file=sys.stderr)
+
+    if opts.compare:
+        with open(opts.compare, encoding="utf-8") as fh:
+            problems = compare(json.load(fh), report, opts.threshold)
+        for p in problems:
+            print(f"REGRESSION {p}", file=sys.stderr)
+        return 1 if problems else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,90 @@
+import statistics
+import time
+from decimal import Decimal
+from typing import Callable
+
+# ----- measuring -----
+def percentile(samples: list[float], q: float) -> float:
+    s = sorted(samples)
+    return s[min(len(s) - 1, int(round(q * (len(s) - 1))))]
+
+def measure(name: str, fn: Callable[[], object], repeat: int, warmup: int = 3, count_queries: bool = False) -> dict:
+    """Time `fn` `repeat` times; optionally count SQL queries of the last call.
+
+    Timings are in milliseconds. `queries` is None when not counted.
+    """
+    for _ in range(warmup):
+        fn()
+    samples = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - t0) * 1000)
+
+    queries = None
+    if count_queries:
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        with CaptureQueriesContext(connection) as ctx:
+            fn()
+        queries = len(ctx.captured_queries)
+
+    total = sum(samples) / 1000
+    return {
+        "name": name,
+        "n": repeat,
+        "p50_ms": round(percentile(samples, 0.50), 4),
+        "p99_ms": round(percentile(samples, 0.99), 4),
+        "mean_ms": round(statistics.fmean(samples), 4),
+        "ops_per_s": round(repeat / total, 1) if total else None,
+        "queries": queries,
+    }
+
+
+# ----- seeding -----
+def seed(products: int, orders: int, items_per_order: int = 3, stock: int = 10**9) -> None:
+    """Fill the (migrated, empty) benchmark database with a catalog and an order history."""
+    from django.db import transaction
+    from acme.infrastructure.django_impl.models import ProductModel, OrderModel, OrderItemModel
+
+    with transaction.atomic():
+        ProductModel.objects.bulk_create(
+            [ProductModel(sku=f"SKU-{i:07d}", name=f"Product {i}", price=Decimal(i % 9000 + 99) / 100,
+                          stock=0 if i % 10 == 0 else stock)  # every tenth product is sold out
+             for i in range(1, products + 1)],
+            batch_size=1000,
+        )
+        catalog = list(ProductModel.objects.order_by("id").values_list("id", "sku", "name", "price"))
+        for start in range(0, orders, 1000):
+            lines = [
+                [(*catalog[(n * items_per_order + k) % len(catalog)], k + 1) for k in range(items_per_order)]
+                for n in range(start, min(start + 1000, orders))
+            ]
+            batch = OrderModel.objects.bulk_create([
+                OrderModel(items_count=len(ls), total=sum(price * qty for *_, price, qty in ls)) for ls in lines
+            ])
+            OrderItemModel.objects.bulk_create([
+                OrderItemModel(order_id=om.id, product_id=pid, sku=sku, name=name, unit_price=price, quantity=qty)
+                for om, ls in zip(batch, lines) for pid, sku, name, price, qty in ls
+            ], batch_size=2000)
+
+
+# ----- comparing -----
+def compare(baseline: dict, current: dict, threshold: float) -> list[str]:
+    """Return one message per benchmark that regressed against `baseline`.
+
+    p50/p99 regress when they grow by more than `threshold` (0.2 = 20%);
+    query counts regress when they grow at all.
+    """
+    base = {r["name"]: r for r in baseline["results"]}
+    problems = []
+    for r in current["results"]:
+        b = base.get(r["name"])
+        if b is None:
+            continue
+        for key in ("p50_ms", "p99_ms"):
+            if b[key] and r[key] > b[key] * (1 + threshold):
+                problems.append(f"{r['name']}: {key} {b[key]} -> {r[key]} (+{(r[key] / b[key] - 1) * 100:.0f}%)")
+        if b.get("queries") is not None and r.get("queries") is not None and r["queries"] > b["queries"]:
+            problems.append(f"{r['name']}: queries {b['queries']} -> {r['queries']}")
+    return problems
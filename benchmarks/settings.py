@@ -0,0 +1,35 @@
+# Django settings for the benchmark suite: the project's database profile
+# (ACME_DB, see config/settings.py) pointed at a throwaway SQLite file, or at
+# a dedicated database on the configured PostgreSQL server (ACME_BENCH_DB_NAME,
+# default test_<ACME_DB_NAME>), without request logging noise. Either one is
+# wiped on every run.
+import os
+import tempfile
+
+from config.settings import *  # noqa: F401,F403
+from config.settings import DATABASES, DB_PROFILE, LOGGING
+
+# the application's own database: reset_database() refuses to wipe it
+APP_DATABASE_NAME = str(DATABASES["default"]["NAME"])
+
+DEBUG = False
+ALLOWED_HOSTS = ["testserver"]
+
+if DB_PROFILE == "sqlite":
+    DATABASES = {"default": {
+        **DATABASES["default"],
+        "NAME": os.environ.get("ACME_BENCH_DB", os.path.join(tempfile.gettempdir(), "acme_bench.sqlite3")),
+    }}
+    if os.environ.get("ACME_BENCH_PLAIN_SQLITE"):
+        # the pre-profile setup: default journal and transactions, per-request connections
+        DATABASES["default"].update(OPTIONS={}, CONN_MAX_AGE=0)
+else:
+    DATABASES = {"default": {
+        **DATABASES["default"],
+        "NAME": os.environ.get("ACME_BENCH_DB_NAME", f"test_{APP_DATABASE_NAME}"),
+    }}
+# no replicas: they would serve the application's data
+DATABASE_REPLICAS = []
+DATABASE_ROUTERS = []
+
+LOGGING = {**LOGGING, "loggers": {"webapi": {"handlers": ["console"], "level": "WARNING", "propagate": False}}}
@@ -0,0 +1,78 @@
+"""Worker cold start, with and without the API docs (ACME_API_DOCS).
+
+    python -m benchmarks.startup --runs 10
+
+Each run is a fresh interpreter that does what a worker does before its
+first response: django.setup() and building the URLconf (which imports the
+views). It reports the wall time of that, peak RSS, whether drf_spectacular
+got imported, the first GET /schema/ (the prebuilt file) and, with docs on,
+what generating the schema per request would cost. Medians of the runs.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+CHILD = """
+import json, resource, sys, time
+t0 = time.perf_counter()
+import django
+django.setup()
+from django.test import Client
+from django.urls import get_resolver
+get_resolver().url_patterns
+ms = (time.perf_counter() - t0) * 1000
+t1 = time.perf_counter()
+status = Client().get("/schema/").status_code
+serve_ms = (time.perf_counter() - t1) * 1000
+generate_ms = None
+if "drf_spectacular" in sys.modules:
+    from drf_spectacular.generators import SchemaGenerator
+    t1 = time.perf_counter()
+    SchemaGenerator().get_schema(request=None, public=True)
+    generate_ms = (time.perf_counter() - t1) * 1000
+print(json.dumps({
+    "ms": ms,
+    "serve_ms": serve_ms,
+    "generate_ms": generate_ms,
+    "rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    "modules": len(sys.modules),
+    "spectacular": "drf_spectacular" in sys.modules,
+    "schema_status": status,
+}))
+"""
+
+
+def run_once(docs: bool) -> dict:
+    env = {**os.environ, "DJANGO_SETTINGS_MODULE": "benchmarks.settings", "ACME_API_DOCS": "1" if docs else "0"}
+    out = subprocess.run([sys.executable, "-c", CHILD], env=env, capture_output=True, text=True, check=True)
+    return json.loads(out.stdout.splitlines()[-1])
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.startup", description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=10, help="fresh interpreters per mode")
+    opts = parser.parse_args(argv)
+
+    print(f"{'mode':<10} {'p50 ms':>8} {'max ms':>8} {'rss MB':>7} {'modules':>8}  {'drf_spectacular':<15}  "
+          f"{'/schema/ ms':>11} {'generate ms':>11}")
+    for docs in (True, False):
+        runs = [run_once(docs) for _ in range(opts.runs)]
+        ms = [r["ms"] for r in runs]
+        last = runs[-1]
+        generate = f"{statistics.median(r['generate_ms'] for r in runs):.1f}" if docs else "-"
+        print(f"{'docs on' if docs else 'docs off':<10} {statistics.median(ms):>8.1f} {max(ms):>8.1f} "
+              f"{statistics.median(r['rss_mb'] for r in runs):>7.1f} {last['modules']:>8}  "
+              f"{'imported' if last['spectacular'] else 'not imported':<15}  "
+              f"{statistics.median(r['serve_ms'] for r in runs):>11.2f} "
+              f"{generate:>11}")
+        if any(r["schema_status"] != 200 for r in runs):
+            print("  /schema/ not served; run `python manage.py build_schema`", file=sys.stderr)
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
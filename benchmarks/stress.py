@@ -0,0 +1,135 @@
+"""Concurrent order writers against the configured database profile.
+
+    python -m benchmarks.stress --writers 8 --orders 200
+    python -m benchmarks.stress --plain-sqlite   # default journal, per-statement locking
+    python -m benchmarks.stress --writers 32 --admission   # shed instead of queueing on the lock
+
+Each writer thread places orders through OrderService/DjangoUnitOfWork on a
+small, contended catalog, with the lines in random product order. Out of
+stock rejections are expected; any other error (e.g. "database is locked",
+deadlocks) fails the run, and so does stock that no longer matches the
+placed order lines. Exit status 0 means the run was clean.
+
+With --admission every order goes through the order endpoints' admission
+controller (ORDER_ADMISSION_*): shed requests count as `shed`, and the
+latency percentiles cover placed orders only, to compare goodput with the
+same writer count without it.
+"""
+import argparse
+import os
+import random
+import sys
+import threading
+import time
+from collections import Counter
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.stress", description=__doc__.splitlines()[0])
+    parser.add_argument("--writers", type=int, default=8)
+    parser.add_argument("--orders", type=int, default=200, help="orders per writer")
+    parser.add_argument("--products", type=int, default=20, help="catalog size (small = more contention)")
+    parser.add_argument("--stock", type=int, default=500, help="initial stock per product")
+    parser.add_argument("--lines", type=int, default=4, help="lines per order")
+    parser.add_argument("--db", help="SQLite file to (re)create; defaults to a temp file")
+    parser.add_argument("--plain-sqlite", action="store_true",
+                        help="drop the WAL/busy_timeout/IMMEDIATE options, to compare")
+    parser.add_argument("--admission", action="store_true",
+                        help="place orders through webapi.admission.order_admission")
+    parser.add_argument("--seed", type=int, default=0)
+    opts = parser.parse_args(argv)
+
+    if opts.db:
+        os.environ["ACME_BENCH_DB"] = opts.db
+    if opts.plain_sqlite:
+        os.environ["ACME_BENCH_PLAIN_SQLITE"] = "1"
+    os.environ["DJANGO_SETTINGS_MODULE"] = "benchmarks.settings"
+    import django
+    from django.conf import settings
+    django.setup()
+    from django.db import connection
+    from django.db.models import Sum
+    from acme.application.dtos import OrderLineDTO
+    from acme.application.services.order_service import OrderService
+    from acme.domain.errors import OutOfStock
+    from acme.infrastructure.django_impl.models import OrderItemModel, ProductModel
+    from acme.infrastructure.django_impl.repositories import DjangoUnitOfWork
+    from webapi.admission import Overloaded, order_admission
+    from .__main__ import reset_database
+    from .harness import percentile
+
+    reset_database(settings)
+    ProductModel.objects.bulk_create([
+        ProductModel(sku=f"HOT-{i:03d}", name=f"Hot {i}", price="9.99", stock=opts.stock)
+        for i in range(opts.products)
+    ])
+    product_ids = list(ProductModel.objects.values_list("id", flat=True))
+    connection.close()
+
+    outcomes: Counter[str] = Counter()
+    placed_ms: list[float] = []
+    errors: list[str] = []
+    lock = threading.Lock()
+    start = threading.Barrier(opts.writers)
+
+    def writer(n: int) -> None:
+        rnd = random.Random(opts.seed * 1000 + n)
+        start.wait()
+        try:
+            for _ in range(opts.orders):
+                lines = [OrderLineDTO(product_id=pid, quantity=rnd.randint(1, 3))
+                         for pid in rnd.sample(product_ids, opts.lines)]
+                t0 = time.perf_counter()
+                try:
+                    if opts.admission:
+                        with order_admission.admit():
+                            OrderService(DjangoUnitOfWork()).place_order(lines)
+                    else:
+                        OrderService(DjangoUnitOfWork()).place_order(lines)
+                    outcome = "placed"
+                except Overloaded:
+                    outcome = "shed"
+                except OutOfStock:
+                    outcome = "out_of_stock"
+                except Exception as e:  # the failures this test is looking for
+                    outcome = "error"
+                    with lock:
+                        errors.append(f"{type(e).__name__}: {e}")
+                with lock:
+                    outcomes[outcome] += 1
+                    if outcome == "placed":
+                        placed_ms.append((time.perf_counter() - t0) * 1000)
+        finally:
+            connection.close()
+
+    threads = [threading.Thread(target=writer, args=(n,)) for n in range(opts.writers)]
+    t0 = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - t0
+
+    sold = dict(OrderItemModel.objects.values_list("product_id").annotate(q=Sum("quantity")))
+    broken = [
+        f"product {pid}: stock {stock}, sold {sold.get(pid, 0)}, started with {opts.stock}"
+        for pid, stock in ProductModel.objects.values_list("id", "stock")
+        if stock < 0 or stock + sold.get(pid, 0) != opts.stock
+    ]
+
+    total = sum(outcomes.values())
+    print(f"{settings.DATABASES['default']['ENGINE']} {opts.writers} writers: {total} attempts in {elapsed:.2f}s "
+          f"({total / elapsed:.0f}/s) placed={outcomes['placed']} out_of_stock={outcomes['out_of_stock']} "
+          f"shed={outcomes['shed']} errors={outcomes['error']}")
+    if placed_ms:
+        print(f"  goodput {outcomes['placed'] / elapsed:.0f} placed/s, placed latency "
+              f"p50={percentile(placed_ms, 0.5):.1f}ms p99={percentile(placed_ms, 0.99):.1f}ms")
+    for msg, n in Counter(errors).most_common(5):
+        print(f"  {n}x {msg}", file=sys.stderr)
+    for b in broken:
+        print(f"  INCONSISTENT {b}", file=sys.stderr)
+    return 1 if errors or broken else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,183 @@
+import itertools
+import json
+from dataclasses import asdict
+from decimal import Decimal
+
+from acme.application.dtos import CreateProductDTO, OrderLineDTO, ProductSearchDTO
+from acme.application.services.order_service import OrderService
+from acme.application.services.product_service import ProductService
+from acme.domain.order import Order, OrderItem
+from acme.domain.product import Product
+
+from acme.infrastructure.memory_impl.repositories import MemoryUnitOfWork
+
+from .harness import measure
+
+# Each suite takes the run options and returns a list of `measure` results.
+# Names are stable: `compare` matches results across runs by name.
+
+# ---------- micro ----------
+def micro(opts) -> list[dict]:
+    from acme.infrastructure.django_impl.models import OrderModel, ProductModel
+    from acme.infrastructure.django_impl.repositories import order_to_domain, product_to_domain
+    from webapi.encoders import order_out, product_out
+    from webapi.serializers import OrderOutSerializer, ProductOutSerializer
+
+    n = opts.repeat
+    products = list(ProductModel.objects.order_by("id")[:100])
+    orders = list(OrderModel.objects.prefetch_related("items").order_by("id")[:100])
+    domain_products = [product_to_domain(m) for m in products]
+    domain_orders = [order_to_domain(om) for om in orders]
+    big = Order(id=1)
+    for k in range(100):
+        big.add_item(product_id=k, sku=f"S{k}", name="x", unit_price=Decimal("19.99"), quantity=k % 5 + 1)
+
+    def order_payload(o):
+        return {"id": o.id, "items": [{
+            "product_id": i.product_id, "sku": i.sku, "name": i.name, "unit_price": i.unit_price,
+            "quantity": i.quantity, "line_total": i.line_total,
+        } for i in o.items], "total": o.total}
+
+    return [
+        measure("micro.product_to_domain[100]", lambda: [product_to_domain(m) for m in products], n),
+        measure("micro.order_to_domain[100]", lambda: [order_to_domain(om) for om in orders], n),
+        measure("micro.order_total[100 lines]", lambda: Order(id=1, items=[
+            OrderItem(i.product_id, i.sku, i.name, i.unit_price, i.quantity) for i in big.items
+        ]).total, n),
+        measure("micro.product_out[100]", lambda: [product_out(p) for p in domain_products], n),
+        measure("micro.ProductOutSerializer[100]",
+                lambda: [ProductOutSerializer(asdict(p)).data for p in domain_products], n),
+        measure("micro.order_out[100]", lambda: [order_out(o) for o in domain_orders], n),
+        measure("micro.OrderOutSerializer[100]",
+                lambda: [OrderOutSerializer(order_payload(o)).data for o in domain_orders], n),
+    ]
+
+
+# ---------- services ----------
+def _service_cases(prefix: str, uow, product_ids: list[int], opts, count_queries: bool) -> list[dict]:
+    seq = itertools.count()
+    lines = [OrderLineDTO(product_id=pid, quantity=1) for pid in product_ids[:opts.order_lines]]
+    target = product_ids[0]
+
+    def create():
+        ProductService(uow).create(CreateProductDTO(sku=f"{prefix}-{next(seq)}", name="Bench", price="9.90", stock=10))
+
+    def update():
+        ProductService(uow).update(target, CreateProductDTO(sku=f"SKU-{target:07d}", name="Bench", price="9.90", stock=10**9))
+
+    return [
+        measure(f"{prefix}.place_order[{len(lines)} lines]", lambda: OrderService(uow).place_order(lines),
+                opts.repeat, count_queries=count_queries),
+        measure(f"{prefix}.product_create", create, opts.repeat, count_queries=count_queries),
+        measure(f"{prefix}.product_update", update, opts.repeat, count_queries=count_queries),
+    ]
+
+def services(opts) -> list[dict]:
+    from acme.infrastructure.django_impl.models import ProductModel
+    from acme.infrastructure.django_impl.repositories import DjangoUnitOfWork
+
+    memory = MemoryUnitOfWork()
+    memory_ids = [
+        memory.products.add(Product(id=None, sku=f"SKU-{i:07d}", name=f"Product {i}", price=Decimal("9.90"), stock=10**9)).id
+        for i in range(1, opts.order_lines + 1)
+    ]
+    db_ids = list(ProductModel.objects.filter(stock__gt=0).order_by("id").values_list("id", flat=True)[:opts.order_lines])
+    return [
+        *_service_cases("service.memory", memory, memory_ids, opts, count_queries=False),
+        *_service_cases("service.django", DjangoUnitOfWork(), db_ids, opts, count_queries=True),
+    ]
+
+
+# ---------- endpoints ----------
+def endpoints(opts) -> list[dict]:
+    from django.test import Client
+    from acme.infrastructure.django_impl.models import OrderModel, ProductModel
+    from acme.infrastructure.django_impl.sales_rollups import advance
+
+    client = Client()
+    for _ in advance(settle_seconds=0):  # reports read the rollups
+        pass
+    product_id = ProductModel.objects.order_by("id").values_list("id", flat=True).first()
+    order_id = OrderModel.objects.order_by("-id").values_list("id", flat=True).first()
+    product_ids = list(ProductModel.objects.filter(stock__gt=0).order_by("id").values_list("id", flat=True)[:opts.order_lines])
+    body = json.dumps({"items": [{"product_id": pid, "quantity": 1} for pid in product_ids]})
+    batch = json.dumps({"orders": [{"items": [{"product_id": pid, "quantity": 1} for pid in product_ids]}] * 100})
+
+    def get(url):
+        def run():
+            resp = client.get(url)
+            assert resp.status_code == 200, (url, resp.status_code)
+        return run
+
+    def post_order():
+        resp = client.post("/api/orders/", body, content_type="application/json")
+        assert resp.status_code == 201, resp.content
+
+    def post_batch():
+        resp = client.post("/api/orders/batch/", batch, content_type="application/json")
+        assert resp.status_code == 201, resp.content
+
+    n = opts.repeat
+    return [
+        measure("http.GET /api/products/?limit=50", get("/api/products/?limit=50"), n, count_queries=True),
+        measure("http.GET /api/products/?limit=50&fields=id,sku,stock",
+                get("/api/products/?limit=50&fields=id,sku,stock"), n, count_queries=True),
+        measure("http.GET /api/products/<id>/", get(f"/api/products/{product_id}/"), n, count_queries=True),
+        measure("http.GET /api/orders/?limit=50", get("/api/orders/?limit=50"), n, count_queries=True),
+        measure("http.GET /api/orders/<id>/", get(f"/api/orders/{order_id}/"), n, count_queries=True),
+        measure("http.GET /api/orders/<id>/?fields=id,total", get(f"/api/orders/{order_id}/?fields=id,total"), n, count_queries=True),
+        measure("http.GET /api/reports/daily/", get("/api/reports/daily/"), n, count_queries=True),
+        measure("http.GET /api/reports/products/", get("/api/reports/products/"), n, count_queries=True),
+        measure(f"http.POST /api/orders/[{len(product_ids)} lines]", post_order, n, count_queries=True),
+        measure(f"http.POST /api/orders/batch/[100 x {len(product_ids)} lines]", post_batch, n, count_queries=True),
+    ]
+
+
+# ---------- search ----------
+SEARCHES = {
+    "sku prefix": ProductSearchDTO(sku_prefix="SKU-00012"),
+    "sku prefix wide": ProductSearchDTO(sku_prefix="SKU-"),
+    "name rare": ProductSearchDTO(name_contains="product 4242"),
+    "name common": ProductSearchDTO(name_contains="product 1"),
+    "price narrow": ProductSearchDTO(min_price=Decimal("10.00"), max_price=Decimal("10.05")),
+    "price wide": ProductSearchDTO(min_price=Decimal("10.00"), max_price=Decimal("80.00")),
+    "in stock": ProductSearchDTO(in_stock=True),
+    "sold out": ProductSearchDTO(in_stock=False),
+    "price narrow + in stock": ProductSearchDTO(min_price=Decimal("10.00"), max_price=Decimal("10.05"), in_stock=True),
+    "sku prefix + in stock": ProductSearchDTO(sku_prefix="SKU-0001", in_stock=True),
+}
+
+def search(opts) -> list[dict]:
+    """One page (50 + 1 rows) of `ProductRepository.search` per filter.
+
+    `[sql]` runs the same statement on a raw cursor and fetches the rows:
+    the database's share, without model and domain object construction.
+    """
+    from django.db import connection
+    from acme.infrastructure.django_impl.models import ProductModel
+    from acme.infrastructure.django_impl.repositories import DjangoProductRepository, search_filter
+
+    repo = DjangoProductRepository()
+
+    def raw(criteria, after_id):
+        qs = search_filter(ProductModel.objects.all(), criteria)  # runs the index probes once, untimed
+        qs = (qs.filter(id__gt=after_id) if after_id else qs).order_by("id")[:51]
+        sql, params = qs.query.sql_with_params()
+        def run():
+            with connection.cursor() as cur:
+                cur.execute(sql, params)
+                cur.fetchall()
+        return run
+
+    results = []
+    for label, criteria in SEARCHES.items():
+        first = repo.search(criteria, None, 51)
+        pages = [("", None)] + ([(" (page 2)", first[-2].id)] if len(first) > 50 else [])
+        for suffix, after in pages:
+            results.append(measure(f"search.{label}{suffix}", lambda c=criteria, a=after: repo.search(c, a, 51),
+                                   opts.repeat, count_queries=True))
+            results.append(measure(f"search.{label}{suffix} [sql]", raw(criteria, after), opts.repeat))
+    return results
+
+
+SUITES = {"micro": micro, "services": services, "endpoints": endpoints, "search": search}
@@ -1,5 +1,8 @@
+import os
 from pathlib import Path
 
+from django.core.exceptions import ImproperlyConfigured
+
 BASE_DIR = Path(__file__).resolve().parent.parent
 
 SECRET_KEY = "dev-only-secret"
@@ -10,12 +13,13 @@ INSTALLED_APPS = [
     "django.contrib.admin", "django.contrib.auth", "django.contrib.contenttypes",
     "django.contrib.sessions", "django.contrib.messages", "django.contrib.staticfiles",
     "rest_framework",
-    "drf_spectacular",
     "acme.infrastructure.django_impl.apps.InfrastructureConfig",
     "webapi",
 ]
 
 MIDDLEWARE = [
+    "webapi.instrumentation.RequestMetricsMiddleware",
+    "webapi.consistency.ReadYourWritesMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -45,12 +49,79 @@ TEMPLATES = [
 
 WSGI_APPLICATION = "config.wsgi.application"
 
-DATABASES = {
-    "default": {
-        "ENGINE": "django.db.backends.sqlite3",
-        "NAME": BASE_DIR / "db.sqlite3",
+# Database profile, from the environment:
+#   ACME_DB=sqlite (default) -> ACME_DB_NAME (file, default db.sqlite3)
+#   ACME_DB=postgres         -> ACME_DB_NAME/USER/PASSWORD/HOST/PORT (needs psycopg)
+#   ACME_DB_CONN_MAX_AGE     -> seconds to keep connections open (default 60; 0 = per request)
+DB_PROFILE = os.environ.get("ACME_DB", "sqlite")
+
+# SQLite: WAL lets readers run alongside the single writer; writers wait up to
+# busy_timeout for the lock, and BEGIN IMMEDIATE takes it up front instead of
+# failing with "database is locked" when a read transaction tries to write
+SQLITE_PRAGMAS = [
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA busy_timeout=5000",
+    "PRAGMA cache_size=-20000",  # KiB
+    "PRAGMA mmap_size=134217728",
+    "PRAGMA temp_store=MEMORY",
+]
+
+if DB_PROFILE == "postgres":
+    DATABASES = {
+        "default": {
+            "ENGINE": "django.db.backends.postgresql",
+            "NAME": os.environ.get("ACME_DB_NAME", "acme"),
+            "USER": os.environ.get("ACME_DB_USER", "acme"),
+            "PASSWORD": os.environ.get("ACME_DB_PASSWORD", ""),
+            "HOST": os.environ.get("ACME_DB_HOST", "localhost"),
+            "PORT": os.environ.get("ACME_DB_PORT", "5432"),
+        }
+    }
+elif DB_PROFILE == "sqlite":
+    DATABASES = {
+        "default": {
+            "ENGINE": "django.db.backends.sqlite3",
+            "NAME": os.environ.get("ACME_DB_NAME", BASE_DIR / "db.sqlite3"),
+            "OPTIONS": {
+                "init_command": "; ".join(SQLITE_PRAGMAS),
+                "transaction_mode": "IMMEDIATE",
+            },
+        }
     }
+else:
+    raise ImproperlyConfigured(f"ACME_DB must be 'sqlite' or 'postgres', not {DB_PROFILE!r}.")
+
+DATABASES["default"]["CONN_MAX_AGE"] = int(os.environ.get("ACME_DB_CONN_MAX_AGE", "60"))
+DATABASES["default"]["CONN_HEALTH_CHECKS"] = True
+
+# Read replicas (acme.infrastructure.django_impl.routing): ACME_DB_REPLICAS is
+# a comma-separated list of SQLite files (sqlite profile) or hosts (postgres),
+# each added as replica1, replica2, ... with the rest copied from "default".
+# Product and order reads outside a transaction go to a replica, except for
+# clients that wrote in the last READ_YOUR_WRITES_SECONDS (webapi.consistency)
+for n, location in enumerate(filter(None, os.environ.get("ACME_DB_REPLICAS", "").split(",")), 1):
+    DATABASES[f"replica{n}"] = {
+        **DATABASES["default"],
+        "NAME" if DB_PROFILE == "sqlite" else "HOST": location.strip(),
+        "TEST": {"MIRROR": "default"},
+    }
+DATABASE_REPLICAS = [alias for alias in DATABASES if alias != "default"]
+DATABASE_ROUTERS = ["acme.infrastructure.django_impl.routing.ReplicaRouter"] if DATABASE_REPLICAS else []
+READ_YOUR_WRITES_SECONDS = 5
+
+CACHES = {
+    "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"},
+    # read-through product cache (acme.infrastructure.django_impl.cache);
+    # locmem is per process, point this at a shared backend when running several workers
+    "products": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "acme-products",
+        "TIMEOUT": 300,
+        "OPTIONS": {"MAX_ENTRIES": 10000},
+    },
 }
+PRODUCT_CACHE_ALIAS = "products"  # None disables the cache
 
 LANGUAGE_CODE = "en-us"
 TIME_ZONE = "UTC"
@@ -62,12 +133,72 @@ STATIC_URL = "static/"
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
 REST_FRAMEWORK = {
-    "DEFAULT_SCHEMA_CLASS": "drf_spectacular.openapi.AutoSchema",
+    "DEFAULT_RENDERER_CLASSES": [
+        "webapi.renderers.FastJSONRenderer",  # orjson when installed
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ],
+}
+
+# cursor pagination for list endpoints (webapi.pagination)
+API_PAGE_SIZE = 50
+API_MAX_PAGE_SIZE = 200
+
+# request metrics (webapi.instrumentation): a query shape repeated this many
+# times in one request is logged as a probable N+1; strict budgets raise
+N_PLUS_ONE_THRESHOLD = 5
+QUERY_BUDGET_STRICT = False
+
+# Idempotency-Key on POST /api/orders/: a key replays its order for at least
+# this long; `manage.py purge_idempotency_keys` (run it from cron) deletes older ones
+IDEMPOTENCY_KEY_RETENTION_HOURS = 24
+
+# POST /api/orders/batch/: most orders accepted in one request
+ORDER_BATCH_MAX_SIZE = 500
+
+# admission control for placing orders (webapi.admission), per process: this
+# many run at once (SQLite has one writer), this many more may queue, for at
+# most this many seconds; the rest get 503 + Retry-After
+ORDER_ADMISSION_LIMIT = 2 if DB_PROFILE == "sqlite" else 8
+ORDER_ADMISSION_QUEUE = 32
+ORDER_ADMISSION_TIMEOUT = 2.0
+
+# POST /api/orders/batch/ has its own controller: one batch holds a slot for
+# as long as hundreds of orders would, which would inflate the service time
+# the order controller predicts waits from and make it shed single orders
+ORDER_BATCH_ADMISSION_LIMIT = 1
+ORDER_BATCH_ADMISSION_QUEUE = 4
+ORDER_BATCH_ADMISSION_TIMEOUT = 10.0
+
+# sales reports (/api/reports/...): longest date range per request, and how
+# old an order must be before `manage.py rollup_sales` folds it in
+REPORT_MAX_DAYS = 366
+ROLLUP_SETTLE_SECONDS = 60
+
+# `manage.py archive_orders` moves orders older than this many days from the
+# order tables to the archive tables (acme.infrastructure.django_impl.archive)
+ORDER_ARCHIVE_AFTER_DAYS = 180
+
+# transactional outbox (acme.infrastructure.django_impl.outbox): event name ->
+# dotted paths of handlers, called by `manage.py outbox_worker`
+OUTBOX_HANDLERS = {
+    "OrderPlaced": ["acme.infrastructure.django_impl.outbox.log_event"],
+    "ProductChanged": ["acme.infrastructure.django_impl.outbox.log_event"],
 }
 
+# OpenAPI (webapi.openapi): /schema/ serves API_SCHEMA_FILE, written by
+# `manage.py build_schema`, from memory. drf-spectacular and the Swagger UI at
+# /docs/ are only loaded with API_DOCS (ACME_API_DOCS=0 turns them off)
+API_VERSION = "0.1.0"
+API_DOCS = os.environ.get("ACME_API_DOCS", "1") == "1"
+API_SCHEMA_FILE = BASE_DIR / "openapi" / f"acme-merch-{API_VERSION}.json"
+
+if API_DOCS:
+    INSTALLED_APPS.insert(INSTALLED_APPS.index("rest_framework") + 1, "drf_spectacular")
+    REST_FRAMEWORK["DEFAULT_SCHEMA_CLASS"] = "drf_spectacular.openapi.AutoSchema"
+
 SPECTACULAR_SETTINGS = {
     "TITLE": "Acme Merch API",
-    "VERSION": "0.1.0",
+    "VERSION": API_VERSION,
 }
 
 LOGGING = {
@@ -77,5 +208,6 @@ LOGGING = {
     "loggers": {
         # garante que mensagens do seu módulo apareçam
         "webapi": {"handlers": ["console"], "level": "INFO", "propagate": False},
+        "acme": {"handlers": ["console"], "level": "INFO", "propagate": False},
     },
 }
\ No newline at end of file
@@ -1,12 +1,17 @@
+from django.conf import settings
 from django.contrib import admin
 from django.urls import path, include
 from django.views.generic import RedirectView
-from drf_spectacular.views import SpectacularAPIView, SpectacularSwaggerView
+from webapi.openapi import schema_view
 
 urlpatterns = [
-    path("", RedirectView.as_view(url="/docs/", permanent=False)),
+    path("", RedirectView.as_view(url="/docs/" if settings.API_DOCS else "/schema/", permanent=False)),
     path("admin/", admin.site.urls),
     path("api/", include("webapi.urls")),
-    path("schema/", SpectacularAPIView.as_view(), name="schema"),
-    path("docs/", SpectacularSwaggerView.as_view(url_name="schema"), name="swagger-ui"),
-]
\ No newline at end of file
+    path("schema/", schema_view, name="schema"),
+]
+
+if settings.API_DOCS:
+    from drf_spectacular.views import SpectacularSwaggerView
+
+    urlpatterns += [path("docs/", SpectacularSwaggerView.as_view(url_name="schema"), name="swagger-ui")]
@@ -0,0 +1,30 @@
+import os
+import pytest
+
+@pytest.fixture(scope="session")
+def django_test_db():
+    django = pytest.importorskip("django")
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings")
+    django.setup()
+    from django.db import connection
+    from django.test.utils import setup_test_environment, teardown_test_environment
+    setup_test_environment()
+    # SQLite: a shared in-memory database, never the configured file
+    old_name = connection.creation.create_test_db(verbosity=0)
+    yield
+    connection.creation.destroy_test_db(old_name, verbosity=0)
+    teardown_test_environment()
+
+@pytest.fixture
+def db(django_test_db):
+    """A migrated test database, emptied after the test.
+
+    Transactions commit for real (no wrapping transaction), so tests see
+    rollbacks and on_commit callbacks the way requests do.
+    """
+    from django.core.cache import caches
+    from django.core.management import call_command
+    yield
+    call_command("flush", interactive=False, verbosity=0)  # also resets the id sequences
+    for cache in caches.all():
+        cache.clear()
@@ -1,30 +1,175 @@
+from datetime import date, datetime, timedelta, timezone
 from decimal import Decimal
+import pytest
 from acme.domain.product import Product
+from acme.domain.errors import OutOfStock, IdempotencyConflict, ValidationError
+from acme.domain.events import OrderPlaced, ProductChanged
 from acme.application.services.order_service import OrderService
-from acme.application.dtos import OrderLineDTO
-
-class FakeProductRepo:
-    def __init__(self, data): self.data = {p.id: p for p in data}
-    def add(self, p): ...
-    def update(self, p): self.data[p.id] = p
-    def get_by_id(self, id): return self.data.get(id)
-    def get_by_sku(self, sku): ...
-    def list(self): return list(self.data.values())
-
-class FakeOrderRepo:
-    def __init__(self): self.data = {}; self._id = 0
-    def add(self, o): self._id += 1; o.id = self._id; self.data[o.id] = o; return o
-    def get_by_id(self, id): return self.data.get(id)
-
-class FakeUoW:
-    def __init__(self, products, orders): self.products=products; self.orders=orders
-    def __enter__(self): return self
-    def __exit__(self,*a): ...
-    def commit(self): ...
+from acme.application.services.product_service import ProductService
+from acme.application.services.product_import_service import ProductImportService, read_csv
+from acme.application.services.outbox_relay import OutboxRelay
+from acme.application.services.report_service import ReportService
+from acme.application.dtos import CreateProductDTO, OrderLineDTO, ProductSearchDTO
+from acme.infrastructure.memory_impl.repositories import MemoryStore, MemoryUnitOfWork
+
+T0 = datetime(2025, 1, 1, tzinfo=timezone.utc)
+
+class Clock:
+    def __init__(self, now=T0): self.now = now
+    def __call__(self): return self.now
+
+def uow_with(*products, clock=None):
+    # products get ids 1, 2, ... in order
+    uow = MemoryUnitOfWork(MemoryStore(clock) if clock else None)
+    for p in products:
+        uow.products.add(p)
+    return uow
+
+def item(sku="A", price="10.00", stock=5, name=None):
+    return Product(id=None, sku=sku, name=name or f"Item {sku}", price=Decimal(price), stock=stock)
 
 def test_place_order_decreases_stock_and_calculates_total():
-    p = Product(id=1, sku="A", name="Item A", price=Decimal("10.00"), stock=5)
-    svc = OrderService(FakeUoW(FakeProductRepo([p]), FakeOrderRepo()))
+    svc = OrderService(uow_with(item()))
     order = svc.place_order([OrderLineDTO(product_id=1, quantity=3)])
     assert order.total == Decimal("30.00")
-    assert svc.uow.products.get_by_id(1).stock == 2
\ No newline at end of file
+    assert svc.uow.products.get_by_id(1).stock == 2
+
+def test_place_order_aggregates_demand_per_product():
+    svc = OrderService(uow_with(item()))
+    order = svc.place_order([OrderLineDTO(1, 2), OrderLineDTO(1, 3)])
+    assert order.total == Decimal("50.00")
+    assert svc.uow.products.get_by_id(1).stock == 0
+    with pytest.raises(OutOfStock):
+        svc.place_order([OrderLineDTO(1, 1)])
+
+def test_import_upserts_by_sku_in_chunks_and_reports_bad_rows():
+    uow = uow_with(item(name="Old", price="1.00", stock=1))
+    svc = ProductImportService(uow, chunk_size=2)
+    lines = ["sku,name,price,stock", "A,New,2.50,5", "B,Item B,3,4", "C,,1,1", "D,Item D,abc,1"]
+    report = svc.run(read_csv(lines))
+    assert (report.created, report.updated, report.failed) == (1, 1, 2)
+    assert [e["row"] for e in report.errors] == [3, 4]
+    assert uow.products.get_by_id(1).name == "New" and uow.products.get_by_id(1).price == Decimal("2.50")
+    assert uow.products.get_by_sku("B").id == 2
+
+def test_import_stops_at_unreadable_csv_and_keeps_what_was_read():
+    uow = uow_with()
+    svc = ProductImportService(uow, chunk_size=2)
+    huge = "x" * 200_000  # past csv.field_size_limit()
+    lines = ["sku,name,price,stock", "A,Item A,1,1", "B,Item B,1,1", "C,Item C,1,1", f"D,{huge},1,1", "E,Item E,1,1"]
+    report = svc.run(read_csv(lines))
+    assert (report.created, report.updated, report.failed) == (3, 0, 1)
+    assert report.errors[0]["row"] == 4 and "import stopped" in report.errors[0]["error"]
+    assert uow.products.get_by_sku("C") is not None and uow.products.get_by_sku("E") is None
+
+def test_import_reports_rows_past_the_column_limits_and_chunks_the_store_rejects():
+    from unittest import mock
+    uow = uow_with()
+    svc = ProductImportService(uow, chunk_size=2)
+    lines = ["sku,name,price,stock", f"{'S' * 51},Long sku,1,1", f"L,{'n' * 201},1,1", "H,Huge,1,99999999999999999999",
+             "A,Item A,1,2147483647", "B,Item B,1,1", "C,Item C,1,1", "D,Item D,1,1"]
+    upsert, calls = uow.products.upsert_many, []
+
+    def reject_first_chunk(products):
+        calls.append(products)
+        if len(calls) == 1:
+            raise RuntimeError("value out of range")
+        return upsert(products)
+
+    with mock.patch.object(uow.products, "upsert_many", reject_first_chunk):
+        report = svc.run(read_csv(lines))
+    assert (report.created, report.updated, report.failed) == (2, 0, 5)
+    assert [(e["row"], e["sku"]) for e in report.errors] == [(1, "S" * 51), (2, "L"), (3, "H"), (4, "A"), (5, "B")]
+    assert "rejected" in report.errors[3]["error"]
+    assert uow.products.get_by_sku("A") is None and uow.products.get_by_sku("D").stock == 1
+
+def test_place_order_once_replays_response_for_same_key():
+    svc = OrderService(uow_with(item()))
+    render = lambda o: {"id": o.id, "total": str(o.total)}
+    first = svc.place_order_once("k", "h1", [OrderLineDTO(1, 2)], render)
+    again = svc.place_order_once("k", "h1", [OrderLineDTO(1, 2)], render)
+    assert first == ({"id": 1, "total": "20.00"}, False)
+    assert again == ({"id": 1, "total": "20.00"}, True)
+    assert svc.uow.products.get_by_id(1).stock == 3
+    with pytest.raises(IdempotencyConflict):
+        svc.place_order_once("k", "h2", [OrderLineDTO(1, 1)], render)
+
+def test_search_passes_criteria_and_rejects_inverted_price_range():
+    svc = ProductService(uow_with(*(item(sku=f"S{i}", price=str(i), stock=1) for i in range(1, 6))))
+    found = svc.search(ProductSearchDTO(min_price=Decimal("2"), max_price=Decimal("4")), after_id=2, limit=10)
+    assert [p.id for p in found] == [3, 4]
+    with pytest.raises(ValidationError):
+        svc.search(ProductSearchDTO(min_price=Decimal("5"), max_price=Decimal("1")), None, 10)
+
+def test_place_orders_all_or_nothing_and_best_effort():
+    batch = [[OrderLineDTO(1, 3)], [OrderLineDTO(1, 1), OrderLineDTO(1, 2)], [OrderLineDTO(1, 2)], [OrderLineDTO(9, 1)]]
+
+    strict = OrderService(uow_with(item()))
+    results = strict.place_orders(batch)
+    assert [r.order for r in results] == [None] * 4
+    assert "another order" in results[0].error and "Not enough stock" in results[1].error
+    assert strict.uow.products.get_by_id(1).stock == 5 and not strict.uow.orders.list()
+
+    lenient = OrderService(uow_with(item()))
+    results = lenient.place_orders(batch, all_or_nothing=False)
+    # order 1 fails part way; its first line must not eat into order 2's stock
+    assert [r.order is not None for r in results] == [True, False, True, False]
+    assert "not found" in results[3].error
+    assert lenient.uow.products.get_by_id(1).stock == 0
+    assert [o.total for o in lenient.uow.orders.list()] == [Decimal("30.00"), Decimal("20.00")]
+
+def test_writes_record_events_and_relay_delivers_them_at_least_once():
+    clock = Clock()
+    uow = uow_with(item(), clock=clock)
+    OrderService(uow).place_order([OrderLineDTO(1, 2)])
+    ProductService(uow).update(1, CreateProductDTO(sku="A", name="Renamed", price="10", stock=3))
+    assert uow.outbox.stats().pending == 2
+
+    seen = []
+    def flaky(e):
+        if isinstance(e, ProductChanged): raise RuntimeError("warehouse down")
+    relay = OutboxRelay(uow, {"OrderPlaced": [seen.append], "ProductChanged": [seen.append, flaky]}, clock=clock)
+    clock.now = T0 + timedelta(seconds=2)
+    report = relay.relay_batch()
+    assert (report.claimed, report.delivered, report.failed, report.max_lag_seconds) == (2, 1, 1, 2.0)
+    assert [type(e) for e in seen] == [OrderPlaced, ProductChanged]  # the failed event reached the first handler
+    assert seen[0].lines == ((1, 2, Decimal("20.00")),)
+    assert relay.relay_batch().claimed == 0  # backing off
+
+    clock.now += timedelta(seconds=1)
+    report = relay.relay_batch()
+    assert (report.claimed, report.failed) == (1, 1)  # redelivered to both handlers
+    assert [type(e) for e in seen] == [OrderPlaced, ProductChanged, ProductChanged]
+    assert uow.outbox.stats().pending == 1
+
+def test_daily_sales_fills_empty_days_and_bounds_the_range():
+    clock = Clock(T0 + timedelta(days=1))
+    uow = uow_with(item(stock=100), clock=clock)
+    for _ in range(3):
+        OrderService(uow).place_order([OrderLineDTO(1, 2)])
+    svc = ReportService(uow, max_days=31)
+    days = svc.daily_sales(date(2025, 1, 1), date(2025, 1, 3))
+    assert [(d.day.day, d.orders, d.units, d.revenue) for d in days] == [
+        (1, 0, 0, Decimal("0.00")), (2, 3, 6, Decimal("60.00")), (3, 0, 0, Decimal("0.00"))
+    ]
+    with pytest.raises(ValidationError):
+        svc.daily_sales(date(2025, 1, 3), date(2025, 1, 1))
+    with pytest.raises(ValidationError):
+        svc.daily_sales(date(2025, 1, 1), date(2025, 2, 1))
+    with pytest.raises(ValidationError):
+        svc.top_products(date(2025, 1, 1), date(2025, 1, 2), by="price")
+
+def test_sparse_reads_return_only_the_requested_fields():
+    uow = uow_with(*(item(sku=f"S{i}", price=str(i), stock=i) for i in range(1, 5)))
+    svc = ProductService(uow)
+    rows = svc.search_fields(ProductSearchDTO(min_price=Decimal("2")), ("sku", "stock"), after_id=None, limit=2)
+    assert rows == [{"id": 2, "sku": "S2", "stock": 2}, {"id": 3, "sku": "S3", "stock": 3}]
+    with pytest.raises(ValidationError):
+        svc.search_fields(ProductSearchDTO(min_price=Decimal("5"), max_price=Decimal("1")), ("sku",), None, 10)
+
+    orders = OrderService(uow)
+    placed = orders.place_order([OrderLineDTO(4, 2), OrderLineDTO(1, 1)])
+    summary = orders.get_order_summary(placed.id)
+    assert (summary.id, summary.items_count, summary.total) == (placed.id, 2, Decimal("9.00"))
+    with pytest.raises(ValidationError):
+        orders.get_order_summary(99)
@@ -0,0 +1,33 @@
+from benchmarks.harness import compare, percentile
+
+def result(name, p50, p99, queries=None):
+    return {"name": name, "p50_ms": p50, "p99_ms": p99, "queries": queries}
+
+def test_percentile():
+    samples = [float(i) for i in range(1, 101)]
+    assert percentile(samples, 0.5) == 51.0
+    assert percentile(samples, 0.99) == 99.0
+    assert percentile([3.0], 0.99) == 3.0
+
+def test_compare_flags_latency_and_query_regressions():
+    base = {"results": [result("a", 1.0, 2.0, 3), result("b", 1.0, 2.0), result("gone", 1.0, 1.0)]}
+    cur = {"results": [result("a", 1.1, 2.0, 4), result("b", 1.5, 3.0), result("new", 9.0, 9.0)]}
+    problems = compare(base, cur, threshold=0.2)
+    assert problems == [
+        "a: queries 3 -> 4",
+        "b: p50_ms 1.0 -> 1.5 (+50%)",
+        "b: p99_ms 2.0 -> 3.0 (+50%)",
+    ]
+    assert compare(base, base, threshold=0.0) == []
+
+def test_reset_database_refuses_the_application_database():
+    import pytest
+    from types import SimpleNamespace
+    from benchmarks.__main__ import reset_database
+
+    for db, app in [
+        ({"ENGINE": "django.db.backends.postgresql", "NAME": "acme"}, "acme"),
+        ({"ENGINE": "django.db.backends.sqlite3", "NAME": "./x/../db.sqlite3"}, "db.sqlite3"),
+    ]:
+        with pytest.raises(SystemExit, match="application's database"):
+            reset_database(SimpleNamespace(DATABASES={"default": db}, APP_DATABASE_NAME=app))
@@ -0,0 +1,346 @@
+import io
+from decimal import Decimal
+import pytest
+
+pytest.importorskip("django")
+pytestmark = pytest.mark.usefixtures("db")
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from acme.domain.product import Product
+from acme.domain.errors import OutOfStock
+from acme.application.services.order_service import OrderService
+from acme.application.dtos import OrderLineDTO
+
+def products(n, stock=5, prefix="P"):
+    from acme.infrastructure.django_impl.repositories import DjangoProductRepository
+    repo = DjangoProductRepository()
+    return [repo.add(Product(id=None, sku=f"{prefix}{i}", name=f"Item {i}", price=Decimal("2.50"), stock=stock)).id for i in range(n)]
+
+def uow():
+    from acme.infrastructure.django_impl.repositories import DjangoUnitOfWork
+    return DjangoUnitOfWork()
+
+def test_place_order_query_count_does_not_grow_with_lines_and_never_oversells():
+    one, twenty = products(1, prefix="A"), products(20, prefix="B")
+    counts = []
+    for ids in ([one[0]], twenty):
+        with CaptureQueriesContext(connection) as q:
+            OrderService(uow()).place_order([OrderLineDTO(pid, 2) for pid in ids])
+        counts.append(len(q))
+    assert counts[0] == counts[1]
+
+    # the guarded decrement refuses a short product and the unit of work rolls the rest back
+    with uow() as u:
+        assert not u.products.reserve_stock({one[0]: 3, twenty[0]: 4})
+    assert {p.stock for p in uow().products.get_many([one[0], twenty[0]]).values()} == {3}
+    with pytest.raises(OutOfStock):
+        OrderService(uow()).place_order([OrderLineDTO(one[0], 1), OrderLineDTO(twenty[0], 4)])
+    assert len(uow().orders.list()) == 2
+
+def test_orders_read_live_prices_and_a_rolled_back_write_keeps_the_cache():
+    from django.conf import settings
+    from django.core.cache import caches
+    from acme.infrastructure.django_impl.cache import product_key
+    from acme.infrastructure.django_impl.models import ProductModel
+
+    pid = products(1)[0]
+    cache = caches[settings.PRODUCT_CACHE_ALIAS]
+    assert uow().products.get_by_id(pid).price == Decimal("2.50")  # now cached
+    # another worker reprices it; this process' cache doesn't know
+    ProductModel.objects.filter(id=pid).update(price=Decimal("4.00"))
+    assert cache.get(product_key(pid)).price == Decimal("2.50")
+    assert OrderService(uow()).place_order([OrderLineDTO(pid, 1)]).total == Decimal("4.00")
+
+    cache.set(product_key(pid), uow().products.inner.get_by_id(pid))
+    with pytest.raises(RuntimeError):
+        with uow() as u:
+            p = u.products.get_by_id(pid)
+            p.price = Decimal("9.99")
+            u.products.update(p)
+            u.commit()
+            raise RuntimeError("after the write, before the commit")
+    assert cache.get(product_key(pid)).price == Decimal("4.00")
+    assert uow().products.get_by_id(pid).price == Decimal("4.00")
+
+    with uow() as u:
+        u.products.update(p)
+        u.commit()
+    assert cache.get(product_key(pid)) is None
+    assert uow().products.get_by_id(pid).price == Decimal("9.99")
+
+def test_idempotency_keys_are_purged_after_the_retention_period():
+    from datetime import timedelta
+    from django.core.management import call_command
+    from django.utils import timezone
+    from acme.infrastructure.django_impl.models import IdempotencyKeyModel
+
+    pid = products(1)[0]
+    svc = OrderService(uow())
+    render = lambda o: {"id": o.id}
+    first, _ = svc.place_order_once("old", "h", [OrderLineDTO(pid, 1)], render)
+    svc.place_order_once("new", "h", [OrderLineDTO(pid, 1)], render)
+    IdempotencyKeyModel.objects.filter(key="old").update(created_at=timezone.now() - timedelta(hours=25))
+
+    assert svc.place_order_once("old", "h", [OrderLineDTO(pid, 1)], render) == (first, True)
+    call_command("purge_idempotency_keys", stdout=io.StringIO())
+    assert list(IdempotencyKeyModel.objects.values_list("key", flat=True)) == ["new"]
+    # past retention, the same key places a new order
+    again, replayed = svc.place_order_once("old", "h", [OrderLineDTO(pid, 1)], render)
+    assert not replayed and again != first
+
+def test_async_unit_of_work_rolls_back_the_orm_calls_made_inside_it():
+    import asyncio
+    from acme.domain.order import Order
+    from acme.infrastructure.django_impl.async_repositories import DjangoAsyncUnitOfWork
+
+    pid = products(1)[0]
+
+    async def place(fail: bool):
+        async with DjangoAsyncUnitOfWork() as u:
+            assert await u.products.reserve_stock({pid: 2})
+            order = Order()
+            order.add_item(product_id=pid, sku="A0", name="Item 0", unit_price=Decimal("2.50"), quantity=2)
+            await u.orders.add(order)
+            # same connection as the transaction: sees its own writes
+            assert (await u.products.get_many([pid]))[pid].stock == 3
+            if fail:
+                raise RuntimeError("after reserve_stock, before the commit")
+            await u.commit()
+
+    with pytest.raises(RuntimeError):
+        asyncio.run(place(fail=True))
+    assert uow().products.inner.get_by_id(pid).stock == 5 and uow().orders.list() == []
+    asyncio.run(place(fail=False))
+    assert uow().products.inner.get_by_id(pid).stock == 3 and len(uow().orders.list()) == 1
+
+def test_async_place_order_reads_in_its_transaction_and_never_oversells():
+    import asyncio
+    from unittest import mock
+    from asgiref.sync import sync_to_async
+    from acme.application.services.order_service import AsyncOrderService
+    from acme.infrastructure.django_impl.async_repositories import DjangoAsyncProductRepository, DjangoAsyncUnitOfWork
+    from acme.infrastructure.django_impl.models import ProductModel
+
+    pid = products(1)[0]
+    lock_many, reserve_stock = DjangoAsyncProductRepository.lock_many, DjangoAsyncProductRepository.reserve_stock
+    in_transaction = []
+
+    async def locking(self, ids):
+        in_transaction.append(await sync_to_async(lambda: connection.in_atomic_block)())
+        return await lock_many(self, ids)
+
+    async def sold_out_meanwhile(self, quantities):
+        # another writer takes all but one unit after the rows were read
+        await ProductModel.objects.filter(id=pid).aupdate(stock=1)
+        return await reserve_stock(self, quantities)
+
+    def place(quantity):
+        return asyncio.run(AsyncOrderService(DjangoAsyncUnitOfWork()).place_order([OrderLineDTO(pid, quantity)]))
+
+    with mock.patch.object(DjangoAsyncProductRepository, "lock_many", locking):
+        assert place(3).total == Decimal("7.50")
+        with pytest.raises(OutOfStock):
+            place(3)
+    assert in_transaction == [True, True]
+    with mock.patch.object(DjangoAsyncProductRepository, "reserve_stock", sold_out_meanwhile), pytest.raises(OutOfStock):
+        place(2)  # the snapshot said 2 were left; the guarded UPDATE says no
+    assert uow().products.inner.get_by_id(pid).stock == 2 and len(uow().orders.list()) == 1
+
+def test_backfill_fills_missing_totals_and_the_check_catches_a_corrupted_line():
+    from django.core.management import call_command
+    from django.core.management.base import CommandError
+    from acme.infrastructure.django_impl.models import OrderModel, OrderItemModel
+
+    a, b = products(2, stock=50)
+    orders = [OrderService(uow()).place_order([OrderLineDTO(a, 1), OrderLineDTO(b, n)]).id for n in (1, 2, 3)]
+    OrderModel.objects.filter(id__in=orders[:2]).update(total=None, items_count=None)
+    with pytest.raises(CommandError, match="2 orders inconsistent"):
+        call_command("check_order_totals", stdout=io.StringIO(), stderr=io.StringIO())
+
+    out = io.StringIO()
+    call_command("backfill_order_totals", "--chunk-size", "1", stdout=out)
+    assert "backfilled=2" in out.getvalue()
+    assert list(OrderModel.objects.order_by("id").values_list("items_count", "total")) == [
+        (2, Decimal("5.00")), (2, Decimal("7.50")), (2, Decimal("10.00")),
+    ]
+    call_command("check_order_totals", stdout=io.StringIO())
+
+    OrderItemModel.objects.filter(order_id=orders[2], product_id=b).update(quantity=4)
+    with pytest.raises(CommandError, match="1 orders inconsistent"):
+        call_command("check_order_totals", stdout=io.StringIO(), stderr=io.StringIO())
+
+def test_sku_prefix_search_is_case_sensitive_for_narrow_and_wide_prefixes():
+    from acme.application.dtos import ProductSearchDTO
+    from acme.infrastructure.django_impl.models import ProductModel
+    from acme.infrastructure.django_impl.repositories import DjangoProductRepository, SEARCH_INDEX_MAX_ROWS
+
+    ProductModel.objects.bulk_create(
+        [ProductModel(sku=f"AB{i:05}", name="Wide", price=Decimal("1.00")) for i in range(SEARCH_INDEX_MAX_ROWS + 5)]
+        + [ProductModel(sku=s, name="Narrow", price=Decimal("9.00")) for s in ("abzzz", "CD1", "CD2", "cd3", "CE1")]
+    )
+    repo = DjangoProductRepository()
+
+    def skus(prefix, limit=SEARCH_INDEX_MAX_ROWS + 10, **criteria):
+        return [p.sku for p in repo.search(ProductSearchDTO(sku_prefix=prefix, **criteria), None, limit)]
+
+    # wide: past the probe, filtered by the unindexed range
+    wide = skus("AB")
+    assert len(wide) == SEARCH_INDEX_MAX_ROWS + 5 and "abzzz" not in wide
+    assert skus("AB", limit=3) == ["AB00000", "AB00001", "AB00002"]
+    # narrow: read through the sku index
+    assert skus("CD") == ["CD1", "CD2"]
+    assert skus("cd") == ["cd3"]
+    assert skus("abz") == ["abzzz"]
+    assert skus("aB") == []
+    assert skus("AB", min_price=Decimal("0.50"), max_price=Decimal("2")) == wide
+    assert [p["sku"] for p in repo.search_fields(ProductSearchDTO(sku_prefix="AB0000"), ("sku",), None, 20)] == [f"AB0000{i}" for i in range(10)]
+
+def test_sku_prefixes_ending_at_the_top_of_unicode_still_search():
+    from django.test import Client
+    from acme.application.dtos import ProductSearchDTO
+    from acme.infrastructure.django_impl.models import ProductModel
+    from acme.infrastructure.django_impl.repositories import DjangoProductRepository
+
+    top, below_surrogates = "\U0010ffff", "\ud7ff"
+    ProductModel.objects.bulk_create([
+        ProductModel(sku=sku, name="x", price=Decimal("1.00"))
+        for sku in ("A" + top + "1", "B", below_surrogates + "1", "\ue000", top + top, "Z")
+    ])
+    repo = DjangoProductRepository()
+
+    def skus(prefix):
+        return [p.sku for p in repo.search(ProductSearchDTO(sku_prefix=prefix), None, 10)]
+
+    assert skus("A" + top) == ["A" + top + "1"]  # upper bound "B": carried into the "A"
+    assert skus(below_surrogates) == [below_surrogates + "1"]  # upper bound U+E000, past the surrogates
+    assert skus(top) == [top + top] and skus(top + top) == [top + top]  # no upper bound at all
+    for query in ("%F4%8F%BF%BF", "%ED%9F%BF"):
+        resp = Client().get(f"/api/products/?sku={query}")
+        assert resp.status_code == 200 and len(resp.json()["results"]) == 1
+
+def test_outbox_claims_lease_their_rows_and_failures_back_off():
+    from datetime import timedelta
+    from unittest import mock
+    from django.utils import timezone
+    from acme.domain.events import ProductChanged
+    from acme.infrastructure.django_impl import outbox
+    from acme.infrastructure.django_impl.models import OutboxEventModel
+
+    repo = outbox.DjangoOutboxRepository()
+    repo.add([ProductChanged(product_id=i, sku=f"P{i}") for i in range(3)])
+    start = timezone.now()
+
+    def at(seconds):
+        return mock.patch.object(outbox.timezone, "now", return_value=start + timedelta(seconds=seconds))
+
+    with at(0):
+        first = repo.claim(2, lease_seconds=60)
+        assert [m.event.sku for m in first] == ["P0", "P1"] and [m.attempts for m in first] == [1, 1]
+        # leased rows are hidden from the next claim
+        assert [m.event.sku for m in repo.claim(10, lease_seconds=60)] == ["P2"]
+        assert repo.claim(10, lease_seconds=60) == []
+        repo.mark_delivered([first[0].id])
+        repo.mark_failed(first[1].id, "boom", retry_in_seconds=300)
+    assert repo.stats().pending == 2
+    # the lease of P2 (never acknowledged: a crashed worker) runs out after 60 s,
+    # the failed P1 comes back after its 300 s backoff, the delivered P0 never
+    with at(61):
+        again = repo.claim(10, lease_seconds=60)
+        assert [(m.event.sku, m.attempts) for m in again] == [("P2", 2)]
+        repo.mark_delivered([again[0].id])
+    with at(301):
+        assert [(m.event.sku, m.attempts) for m in repo.claim(10, lease_seconds=60)] == [("P1", 2)]
+    assert OutboxEventModel.objects.get(id=first[1].id).last_error == "boom"
+
+def test_outbox_worker_purges_delivered_events_while_a_backlog_remains():
+    from datetime import timedelta
+    from django.core.management import call_command
+    from django.utils import timezone
+    from acme.domain.events import ProductChanged
+    from acme.infrastructure.django_impl.outbox import DjangoOutboxRepository
+    from acme.infrastructure.django_impl.models import OutboxEventModel
+
+    repo = DjangoOutboxRepository()
+    repo.add([ProductChanged(product_id=i, sku=f"P{i}") for i in range(4)])
+    old = OutboxEventModel.objects.order_by("id").first()
+    OutboxEventModel.objects.filter(id=old.id).update(delivered_at=timezone.now() - timedelta(days=30))
+
+    # every batch is full, so the worker never sees an empty outbox
+    out = io.StringIO()
+    call_command("outbox_worker", "--once", "--batch-size", "1", stdout=out)
+    assert "delivered=3" in out.getvalue()
+    assert not OutboxEventModel.objects.filter(id=old.id).exists()
+    assert OutboxEventModel.objects.filter(delivered_at__isnull=True).count() == 0
+
+def test_sales_rollups_fold_settled_orders_once_survive_a_crash_and_rebuild_the_same():
+    from datetime import timedelta
+    from unittest import mock
+    from django.core.management import call_command
+    from django.utils import timezone
+    from acme.infrastructure.django_impl import sales_rollups
+    from acme.infrastructure.django_impl.archive import archive_before
+    from acme.infrastructure.django_impl.models import OrderModel
+
+    a, b = products(2, stock=50)
+    reports = sales_rollups.DjangoSalesReportRepository()
+    now = timezone.now()
+    day, today = timezone.localdate(now - timedelta(days=3)), timezone.localdate(now)
+
+    def place(*lines, age=None):
+        order_id = OrderService(uow()).place_order([OrderLineDTO(pid, q) for pid, q in lines]).id
+        if age is not None:
+            OrderModel.objects.filter(id=order_id).update(created_at=now - age)
+        return order_id
+
+    def rollup(*args, later=False):
+        # later: run past the settle window of the orders placed so far
+        with mock.patch.object(sales_rollups.timezone, "now", return_value=now + timedelta(minutes=5) if later else timezone.now()):
+            call_command("rollup_sales", "--chunk-size", "1", *args, stdout=io.StringIO())
+
+    def totals():
+        return (
+            [(d.day, d.orders, d.units, d.revenue) for d in reports.daily(day, today)],
+            [(p.product_id, p.units, p.revenue) for p in reports.top_products(day, today, "units", 10)],
+        )
+
+    place((a, 1), (b, 2), age=timedelta(days=3))
+    o2 = place((a, 3), age=timedelta(days=3))
+    o3 = place((b, 1))  # younger than the settle window
+    rollup()
+    assert reports.high_water_mark() == o2
+    assert totals() == ([(day, 2, 6, Decimal("15.00"))], [(a, 4, Decimal("10.00")), (b, 2, Decimal("5.00"))])
+    rollup()  # nothing settled past the mark: nothing counted twice
+    assert reports.high_water_mark() == o2
+
+    # a settled order behind an unsettled lower id waits for it
+    place((a, 1))
+    o5 = place((b, 4), age=timedelta(days=3))
+    rollup()
+    assert reports.high_water_mark() == o2
+
+    # a crash in the second chunk rolls back that chunk only, mark included
+    fold, chunks = sales_rollups.fold, iter([True, False])
+
+    def crash_on_second_chunk(*args, **kwargs):
+        if not next(chunks):
+            raise RuntimeError("crash")
+        fold(*args, **kwargs)
+
+    with mock.patch.object(sales_rollups, "fold", crash_on_second_chunk), pytest.raises(RuntimeError):
+        rollup(later=True)
+    assert reports.high_water_mark() == o3
+    assert totals()[0] == [(day, 2, 6, Decimal("15.00")), (today, 1, 1, Decimal("2.50"))]
+    rollup(later=True)  # resumes after o3
+    assert reports.high_water_mark() == o5
+    assert totals() == (
+        [(day, 3, 10, Decimal("25.00")), (today, 2, 2, Decimal("5.00"))],
+        [(b, 7, Decimal("17.50")), (a, 5, Decimal("12.50"))],
+    )
+
+    # --rebuild recomputes the same totals, reading archived orders too
+    expected = totals()
+    assert sum(archive_before(now - timedelta(days=1))) == 2
+    rollup("--rebuild", later=True)
+    assert totals() == expected
+    assert reports.high_water_mark() == o5
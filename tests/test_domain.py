@@ -3,6 +3,7 @@ import pytest
 from acme.domain.product import Product
 from acme.domain.order import Order, OrderItem
 from acme.domain.errors import OutOfStock, ValidationError
+from acme.domain.money import Money
 
 def test_product_reserve_and_validation():
     p = Product(id=1, sku="A", name="Item A", price=Decimal("10.00"), stock=5)
@@ -18,3 +19,15 @@ def test_reserve_out_of_stock():
 def test_order_total_rounding():
     o = Order(items=[OrderItem(1,"A","Item A",Decimal("5.555"),2)])
     assert o.total == Decimal("11.11")
+
+def test_order_keeps_running_total_in_cents():
+    o = Order()
+    o.add_item(product_id=1, sku="A", name="Item A", unit_price=Decimal("5.555"), quantity=2)
+    o.add_item(product_id=2, sku="B", name="Item B", unit_price=Decimal("0.10"), quantity=3)
+    assert o.total_money == Money(1141)
+    assert o.total == Decimal("11.41") and o.items_count == 2
+
+def test_money_round_trips_decimal():
+    assert Money.from_decimal(Decimal("0.005")).to_decimal() == Decimal("0.00")
+    assert Money.from_decimal(Decimal("19.999")) * 2 == Money(4000)
+    assert str(Money(0).to_decimal()) == "0.00"
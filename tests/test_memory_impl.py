@@ -0,0 +1,77 @@
+import asyncio
+import threading
+from decimal import Decimal
+import pytest
+from acme.domain.product import Product
+from acme.domain.errors import OutOfStock, ValidationError
+from acme.application.services.order_service import OrderService, AsyncOrderService
+from acme.application.dtos import OrderLineDTO
+from acme.infrastructure.memory_impl.repositories import MemoryStore, MemoryUnitOfWork
+from acme.infrastructure.memory_impl.async_repositories import MemoryAsyncUnitOfWork
+
+def product(sku, stock=10):
+    return Product(id=None, sku=sku, name=f"Item {sku}", price=Decimal("2.50"), stock=stock)
+
+def test_rollback_on_exception_or_missing_commit_like_django():
+    uow = MemoryUnitOfWork()
+    a = uow.products.add(product("A"))
+    with pytest.raises(RuntimeError):
+        with uow as u:
+            u.products.reserve_stock({a.id: 4})
+            u.commit()
+            raise RuntimeError("boom")
+    with uow as u:
+        u.products.add(product("B"))  # never committed
+    assert uow.products.get_by_id(a.id).stock == 10 and uow.products.get_by_sku("B") is None
+
+    with uow as u:
+        u.products.reserve_stock({a.id: 1})
+        with pytest.raises(ValidationError):
+            with u:  # savepoint
+                u.products.reserve_stock({a.id: 2})
+                u.products.add(product("A"))
+        u.commit()
+    assert uow.products.get_by_id(a.id).stock == 9
+
+def test_sku_index_follows_renames_and_readers_see_committed_state_only():
+    uow = MemoryUnitOfWork()
+    a = uow.products.add(product("A"))
+    outside = MemoryUnitOfWork(uow.store)
+    with uow as u:
+        a.sku = "A2"
+        u.products.update(a)
+        assert u.products.get_by_sku("A2").id == a.id and u.products.get_by_sku("A") is None
+        u.commit()
+        seen = []
+        reader = threading.Thread(target=lambda: seen.append(outside.products.get_by_sku("A")))
+        reader.start(); reader.join()
+        assert seen[0].sku == "A"  # not committed yet
+    assert uow.products.get_by_sku("A") is None and uow.products.get_by_sku("A2").id == a.id
+
+def test_concurrent_orders_never_oversell():
+    store = MemoryStore()
+    ids = [MemoryUnitOfWork(store).products.add(product(f"S{i}", stock=50)).id for i in range(3)]
+    placed, rejected = [], []
+
+    def writer(n):
+        for k in range(40):
+            try:
+                placed.append(OrderService(MemoryUnitOfWork(store)).place_order(
+                    [OrderLineDTO(ids[(n + k) % 3], 1), OrderLineDTO(ids[(n + k + 1) % 3], 2)]
+                ))
+            except OutOfStock:
+                rejected.append(n)
+
+    threads = [threading.Thread(target=writer, args=(n,)) for n in range(6)]
+    for t in threads: t.start()
+    for t in threads: t.join()
+    uow = MemoryUnitOfWork(store)
+    sold = {i: sum(line.quantity for o in uow.orders.list() for line in o.items if line.product_id == i) for i in ids}
+    assert all(uow.products.get_by_id(i).stock + sold[i] == 50 for i in ids)
+    assert len(placed) + len(rejected) == 240 and len(uow.orders.list()) == len(placed)
+
+def test_async_unit_of_work_shares_the_store():
+    uow = MemoryAsyncUnitOfWork()
+    a = MemoryUnitOfWork(uow.store).products.add(product("A", stock=3))
+    order = asyncio.run(AsyncOrderService(uow).place_order([OrderLineDTO(a.id, 3)]))
+    assert order.total == Decimal("7.50") and MemoryUnitOfWork(uow.store).products.get_by_id(a.id).stock == 0
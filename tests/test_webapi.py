@@ -0,0 +1,377 @@
+import os
+from dataclasses import asdict
+from decimal import Decimal
+import pytest
+
+django = pytest.importorskip("django")
+pytest.importorskip("rest_framework")
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings")
+django.setup()
+
+from rest_framework.renderers import JSONRenderer
+from acme.domain.product import Product
+from acme.domain.order import Order, OrderItem
+from webapi.encoders import product_out, order_out
+from webapi.renderers import FastJSONRenderer
+from webapi.serializers import ProductOutSerializer, OrderOutSerializer
+
+PRODUCTS = [
+    Product(id=1, sku="A", name="Item A", price=Decimal("10"), stock=5),
+    Product(id=2, sku="B-ü", name="Caneca \"azul\" ", price=Decimal("5.555"), stock=0),
+    Product(id=3, sku="C", name="line\u2028sep", price=Decimal("99999999.99"), stock=10**6),
+]
+
+def serializer_order(o: Order):
+    payload = {
+        "id": o.id,
+        "items": [{
+            "product_id": i.product_id, "sku": i.sku, "name": i.name, "unit_price": i.unit_price,
+            "quantity": i.quantity, "line_total": i.line_total,
+        } for i in o.items],
+        "total": o.total,
+    }
+    return OrderOutSerializer(payload).data
+
+def test_fast_encoders_match_serializers_byte_for_byte():
+    order = Order(id=7, items=[
+        OrderItem(1, "A", "Item A", Decimal("10.00"), 3),
+        OrderItem(2, "B-ü", "Caneca", Decimal("5.555"), 2),
+        OrderItem(3, "C", "Item C", Decimal("0.005"), 1),
+    ])
+    slow, fast = JSONRenderer(), FastJSONRenderer()
+    expected = slow.render([ProductOutSerializer(asdict(p)).data for p in PRODUCTS])
+    assert fast.render([product_out(p) for p in PRODUCTS]) == expected
+    assert slow.render([product_out(p) for p in PRODUCTS]) == expected
+    assert fast.render(order_out(order)) == slow.render(serializer_order(order))
+
+def test_request_metrics_flag_repeated_queries_and_enforce_budget():
+    from django.http import HttpResponse
+    from django.test import RequestFactory, override_settings
+    from webapi.instrumentation import (
+        RequestMetricsMiddleware, QueryBudgetExceeded, current_metrics, query_budget, query_shape
+    )
+
+    assert query_shape('SELECT * FROM t WHERE id IN (%s, %s, %s) LIMIT 21') == "SELECT * FROM t WHERE id IN (...) LIMIT ?"
+
+    @query_budget({"GET": 3})
+    def view(request):
+        for i in range(int(request.GET["n"])):
+            current_metrics().add_query(f"SELECT * FROM t WHERE id IN ({', '.join(['%s'] * (i + 1))})", 0.1)
+        return HttpResponse("ok")
+
+    mw = RequestMetricsMiddleware(lambda r: mw.process_view(r, view, (), {}) or view(r))
+    req = RequestFactory().get("/x", {"n": 3})
+    resp = mw(req)
+    assert req.metrics.queries == 3
+    assert req.metrics.repeated_shapes(3) == {"SELECT * FROM t WHERE id IN (...)": 3}
+    assert resp["Server-Timing"].startswith('db;dur=0.30;desc="3 queries", service;dur=0.00')
+
+    with override_settings(QUERY_BUDGET_STRICT=True):
+        with pytest.raises(QueryBudgetExceeded):
+            mw(RequestFactory().get("/x", {"n": 4}))
+        mw(RequestFactory().post("/x?n=4"))  # no budget for POST
+
+def test_schema_artifact_is_current_and_served_with_etag():
+    from django.core.management import call_command
+    from django.test import RequestFactory
+    from webapi.openapi import schema_view
+
+    call_command("build_schema", "--check")  # fails when the views changed without a rebuild
+    resp = schema_view(RequestFactory().get("/schema/"))
+    assert resp.status_code == 200 and resp["Content-Type"] == "application/vnd.oai.openapi+json"
+    assert resp.content.startswith(b'{\n  "openapi"')
+    again = schema_view(RequestFactory().get("/schema/", HTTP_IF_NONE_MATCH=resp["ETag"]))
+    assert again.status_code == 304
+
+def test_admission_queues_hands_over_and_sheds():
+    import asyncio
+    import threading
+    from webapi.admission import AdmissionController, Overloaded
+
+    now = [0.0]
+    gate = AdmissionController("t", limit=1, max_queue=1, timeout=0.5, clock=lambda: now[0])
+    # events, not spinning: every wait has a deadline, so a bug fails the test instead of hanging it
+    holding, queued, release, admitted = threading.Event(), threading.Event(), threading.Event(), []
+
+    def enter(wake, enter=gate._enter):  # tells the test when a caller joined the queue
+        waiter = enter(wake)
+        if waiter is not None:
+            queued.set()
+        return waiter
+
+    gate._enter = enter
+
+    def hold():
+        with gate.admit():
+            admitted.append(threading.current_thread().name)
+            holding.set()
+            assert release.wait(5)
+            now[0] += 0.1
+
+    first = threading.Thread(target=hold, name="first"); first.start()
+    assert holding.wait(5)
+    second = threading.Thread(target=hold, name="second"); second.start()
+    assert queued.wait(5)
+    del gate._enter
+    with pytest.raises(Overloaded, match="queue full"):
+        with gate.admit(): pass
+    release.set(); first.join(5); second.join(5)
+    assert admitted == ["first", "second"]
+    assert gate.snapshot() | {"service_ms": 0} == {
+        "limit": 1, "max_queue": 1, "timeout_s": 0.5, "in_flight": 0, "queued": 0,
+        "admitted": 2, "shed": 1, "timed_out": 0, "service_ms": 0,
+    }
+
+    gate.timeout = 0.15  # above the 0.1s service time, so it queues
+    with gate.admit():
+        with pytest.raises(Overloaded, match="queue timeout"):
+            with gate.admit(): pass
+        now[0] += 10.0  # a slow call: the next waiter could not make the deadline
+    with gate.admit():
+        with pytest.raises(Overloaded, match="expected wait") as shed:
+            with gate.admit(): pass
+    assert shed.value.retry_after >= 2 and gate.snapshot()["timed_out"] == 1
+
+    async def concurrent():
+        gate.timeout, gate._service_s = 1.0, 0.0
+        order = []
+        async def call(n):
+            async with gate.admit_async():
+                order.append(n)
+                await asyncio.sleep(0.01)
+        await asyncio.gather(call(1), call(2))
+        return order
+    assert asyncio.run(concurrent()) == [1, 2] and gate.snapshot()["in_flight"] == 0
+
+def test_sparse_fields_are_validated_against_the_output_serializer():
+    from rest_framework.serializers import ValidationError
+    from webapi.encoders import product_fields_out
+    from webapi.serializers import sparse_fields
+
+    assert sparse_fields({}, OrderOutSerializer) == (None, {"items"})
+    assert sparse_fields({"fields": "total, id"}, OrderOutSerializer) == (("id", "total"), set())
+    assert sparse_fields({"fields": "id", "include": "items"}, OrderOutSerializer) == (("id",), {"items"})
+    for bad in ({"fields": "items"}, {"fields": ""}, {"include": "lines"}):
+        with pytest.raises(ValidationError):
+            sparse_fields(bad, OrderOutSerializer)
+    with pytest.raises(ValidationError):
+        sparse_fields({"include": "items"}, ProductOutSerializer)
+
+    fields, _ = sparse_fields({"fields": "stock,price,sku"}, ProductOutSerializer)
+    p = PRODUCTS[1]
+    row = {"id": p.id, "sku": p.sku, "price": p.price, "stock": p.stock}
+    full = product_out(p)
+    assert product_fields_out(row, fields) == {k: full[k] for k in ("sku", "price", "stock")}
+
+def test_reads_go_to_a_replica_unless_pinned_by_a_recent_write():
+    from django.http import HttpResponse
+    from django.test import RequestFactory
+    from acme.infrastructure.django_impl.models import IdempotencyKeyModel, ProductModel
+    from acme.infrastructure.django_impl.routing import ReplicaRouter, pinned_to_primary
+    from webapi.consistency import COOKIE, HEADER, ReadYourWritesMiddleware
+
+    router = ReplicaRouter(["replica1"])
+    assert router.db_for_read(ProductModel) == "replica1"
+    assert router.db_for_read(IdempotencyKeyModel) == "default"
+    with pinned_to_primary():
+        assert router.db_for_read(ProductModel) == "default"
+    assert ReplicaRouter([]).db_for_read(ProductModel) == "default"
+
+    seen = []
+    def view(request):
+        seen.append(router.db_for_read(ProductModel))
+        if request.method == "POST":
+            router.db_for_write(ProductModel)
+        return HttpResponse("ok")
+
+    mw = ReadYourWritesMiddleware(view)
+    assert HEADER not in mw(RequestFactory().get("/x"))
+    wrote = mw(RequestFactory().post("/x"))
+    token = wrote[HEADER]
+    assert wrote.cookies[COOKIE].value == token
+    mw(RequestFactory().get("/x", HTTP_X_READ_YOUR_WRITES=token))
+    factory = RequestFactory()
+    factory.cookies[COOKIE] = token
+    mw(factory.get("/x"))
+    mw(RequestFactory().get("/x", HTTP_X_READ_YOUR_WRITES=token + "x"))
+    assert seen == ["replica1", "replica1", "default", "default", "replica1"]
+
+def test_order_pages_read_the_archive_only_below_the_first_hot_row():
+    from acme.infrastructure.django_impl.repositories import tiered_page
+
+    class Rows:
+        # the queryset calls keyset_page makes, over a list of ids; slicing logs a read
+        def __init__(self, tier, ids, reads):
+            self.tier, self.ids, self.reads = tier, ids, reads
+
+        def filter(self, id__lt=None, id__gt=None):
+            return Rows(self.tier, [i for i in self.ids if (id__lt is None or i < id__lt) and (id__gt is None or i > id__gt)], self.reads)
+
+        def order_by(self, key):
+            return Rows(self.tier, sorted(self.ids, reverse=key == "-id"), self.reads)
+
+        def __getitem__(self, s):
+            self.reads.append(self.tier)
+            return [{"id": i} for i in self.ids[s]]
+
+    def page(after_id, limit, before_id=None):
+        reads = []
+        rows = tiered_page(Rows("hot", [12, 13, 15, 16], reads), Rows("archive", [1, 2, 3, 5], reads), after_id, limit, before_id)
+        return [r["id"] for r in rows], reads
+
+    assert page(None, 3) == ([1, 2, 3], ["hot", "archive"])
+    assert page(3, 3) == ([5, 12, 13], ["hot", "archive"])
+    assert page(12, 3) == ([13, 15, 16], ["hot"])  # cursor right before the first hot row
+    assert page(None, 3, before_id=16) == ([12, 13, 15], ["hot"])
+    assert page(None, 3, before_id=13) == ([3, 5, 12], ["hot", "archive"])
+    assert page(None, 3, before_id=2) == ([1], ["hot", "archive"])
+
+@pytest.mark.usefixtures("db")
+def test_cursors_round_trip_reject_garbage_and_cap_the_page_size():
+    from django.test import Client, override_settings
+    from acme.infrastructure.django_impl.repositories import DjangoProductRepository
+    from webapi.pagination import KeysetPagination
+
+    repo = DjangoProductRepository()
+    ids = [repo.add(Product(id=None, sku=f"S{i}", name="x", price=Decimal("1"), stock=1)).id for i in range(7)]
+    client = Client()
+
+    def walk(url, key):
+        seen = []
+        while url:
+            page = client.get(url).json()
+            seen = seen + [p["id"] for p in page["results"]] if key == "next" else [p["id"] for p in page["results"]] + seen
+            url = page[key]
+        return seen
+
+    assert walk("/api/products/?limit=3", "next") == ids
+    newest = f"/api/products/?limit=3&cursor={KeysetPagination.last_page_cursor()}"
+    assert client.get(newest).json()["results"][-1]["id"] == ids[-1]
+    assert walk(newest, "previous") == ids
+
+    for bad in ("not-a-cursor", KeysetPagination.encode("x", 1), "YTpub3Q"):
+        assert client.get(f"/api/products/?cursor={bad}").status_code == 400
+        assert client.get(f"/api/orders/?cursor={bad}").status_code == 400
+    with override_settings(API_MAX_PAGE_SIZE=5):
+        assert len(client.get("/api/products/?limit=1000").json()["results"]) == 5
+    assert b"/api/orders/?cursor=" + KeysetPagination.last_page_cursor().encode() in client.get("/api/order-form/").content
+
+@pytest.mark.usefixtures("db")
+def test_every_endpoint_stays_within_its_query_budget():
+    import io
+    import json
+    from datetime import timedelta
+    from django.core.management import call_command
+    from django.test import Client, override_settings
+    from django.utils import timezone
+    from acme.infrastructure.django_impl.models import OrderModel
+    from webapi.admission import batch_admission, order_admission
+
+    client = Client()
+
+    def ok(resp, status=200):
+        assert resp.status_code == status, resp.content
+        return resp
+
+    def post(url, payload, **headers):
+        return client.post(url, json.dumps(payload), content_type="application/json", **headers)
+
+    with override_settings(QUERY_BUDGET_STRICT=True):  # a view over budget raises QueryBudgetExceeded
+        ids = [ok(post("/api/products/", {"sku": f"SKU-{i}", "name": f"Mug {i}", "price": f"{i}.50", "stock": 100}), 201).json()["id"]
+               for i in range(1, 8)]
+        ok(client.put(f"/api/products/{ids[0]}/", json.dumps({"sku": "SKU-1", "name": "Cup", "price": "1.50", "stock": 90}),
+                      content_type="application/json"))
+        ok(client.post("/api/products/import/", "sku,name,price,stock\nSKU-9,Bowl,3,5\n", content_type="text/csv"))
+        for query in ("", "?limit=2", "?sku=SKU-1", "?q=mug&in_stock=true", "?min_price=2&max_price=5", "?fields=id,sku"):
+            page = ok(client.get(f"/api/products/{query}"))
+        ok(client.get(page.json()["next"] or "/api/products/?limit=2"))
+        etag = ok(client.get(f"/api/products/{ids[1]}/"))["ETag"]
+        ok(client.get(f"/api/products/{ids[1]}/", HTTP_IF_NONE_MATCH=etag), 304)
+        ok(client.get("/api/products/", HTTP_IF_NONE_MATCH=ok(client.get("/api/products/"))["ETag"]), 304)
+
+        lines = {"items": [{"product_id": ids[1], "quantity": 1}, {"product_id": ids[2], "quantity": 2}]}
+        orders = [ok(post("/api/orders/", lines), 201).json()["id"] for _ in range(3)]
+        ok(post("/api/orders/", lines, HTTP_IDEMPOTENCY_KEY="k1"), 201)
+        ok(post("/api/orders/", lines, HTTP_IDEMPOTENCY_KEY="k1"), 201)  # replay
+        admitted = order_admission.admitted, batch_admission.admitted
+        ok(post("/api/orders/batch/", {"orders": [lines] * 5}), 201)
+        # batches queue apart: their service time stays out of the single orders' average
+        assert (order_admission.admitted, batch_admission.admitted) == (admitted[0], admitted[1] + 1)
+        ok(post("/api/async/orders/", lines), 201)
+        # the oldest two go to the archive
+        OrderModel.objects.filter(id__in=orders[:2]).update(created_at=timezone.now() - timedelta(days=400))
+        call_command("archive_orders", stdout=io.StringIO())
+        call_command("rollup_sales", "--settle", "0", stdout=io.StringIO())
+
+        for prefix in ("/api/orders/", "/api/async/orders/"):
+            ok(client.get(ok(client.get(f"{prefix}?limit=2")).json()["next"]))
+            for order_id in (orders[0], orders[2]):  # archived, hot
+                ok(client.get(f"{prefix}{order_id}/"))
+        for query in ("?fields=id,total", "?include=items", "?fields=id&include=items"):
+            ok(client.get(f"/api/orders/{orders[0]}/{query}"))
+            ok(client.get(f"/api/orders/{orders[2]}/{query}"))
+        ok(client.get("/api/orders/999999/"), 404)
+
+        ok(client.get("/api/async/products/"))
+        ok(client.get(f"/api/async/products/{ids[1]}/"))
+        ok(client.get("/api/reports/daily/"))
+        ok(client.get("/api/reports/products/?sort=units"))
+        ok(client.get("/api/metrics/"))
+
+@pytest.mark.usefixtures("db")
+def test_conditional_gets_answer_304_from_the_version_read_and_writes_move_the_etag():
+    import json
+    from datetime import timedelta
+    from unittest import mock
+    from django.db import connection
+    from django.test import Client
+    from django.test.utils import CaptureQueriesContext
+    from django.utils import timezone
+    from acme.infrastructure.django_impl import repositories
+    from acme.infrastructure.django_impl.repositories import DjangoProductRepository
+
+    repo = DjangoProductRepository()
+    ids = [repo.add(Product(id=None, sku=f"S{i}", name="x", price=Decimal("1"), stock=9)).id for i in range(3)]
+    client = Client()
+    for url in ("/api/products/", f"/api/products/{ids[0]}/"):
+        first = client.get(url)
+        for validators in ({"HTTP_IF_NONE_MATCH": first["ETag"]}, {"HTTP_IF_MODIFIED_SINCE": first["Last-Modified"]}):
+            with CaptureQueriesContext(connection) as q:
+                assert client.get(url, **validators).status_code == 304
+            assert len(q) == 1 and "infrastructure_productmodel" in q[0]["sql"]  # the version read only
+
+    listed = client.get("/api/products/")["ETag"]
+    client.post("/api/orders/", json.dumps({"items": [{"product_id": ids[1], "quantity": 1}]}), content_type="application/json")
+    after_order = client.get("/api/products/", HTTP_IF_NONE_MATCH=listed)
+    assert after_order.status_code == 200 and after_order["ETag"] != listed
+
+    # a write that commits carrying an older timestamp (a slower concurrent
+    # transaction on PostgreSQL) doesn't move MAX(updated_at), but moves the ETag
+    p = repo.get_by_id(ids[2])
+    p.name = "renamed"
+    with mock.patch.object(repositories.timezone, "now", return_value=timezone.now() - timedelta(days=1)):
+        repo.update(p)
+    assert client.get("/api/products/", HTTP_IF_NONE_MATCH=after_order["ETag"]).status_code == 200
+
+    # the detail ETag too: two writes with the same timestamp still differ
+    frozen = timezone.now()
+    with mock.patch.object(repositories.timezone, "now", return_value=frozen):
+        p.stock = 1
+        repo.update(p)
+        detail = client.get(f"/api/products/{ids[2]}/")["ETag"]
+        p.stock = 2
+        repo.update(p)
+        assert client.get(f"/api/products/{ids[2]}/", HTTP_IF_NONE_MATCH=detail).status_code == 200
+
+@pytest.mark.usefixtures("db")
+def test_order_lines_out_of_the_column_ranges_are_rejected_as_validation_errors():
+    import json
+    from django.test import Client
+
+    client = Client()
+    for line in ({"product_id": 99999999999999999999, "quantity": 1}, {"product_id": 0, "quantity": 1},
+                 {"product_id": 1, "quantity": 99999999999999999999}):
+        order = {"items": [line]}
+        for url, body in (("/api/orders/", order), ("/api/async/orders/", order), ("/api/orders/batch/", {"orders": [order]})):
+            resp = client.post(url, json.dumps(body), content_type="application/json")
+            assert resp.status_code == 400, (url, line, resp.content)
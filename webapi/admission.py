@@ -0,0 +1,178 @@
+"""Admission control: a concurrency limit with a bounded, deadline-limited queue.
+
+A request calls `admit()` (or `admit_async()` in async views) before starting
+the work. At most `limit` requests hold a slot at once. Up to `max_queue`
+more wait in FIFO order, each for at most `timeout` seconds; a finished
+request hands its slot straight to the oldest waiter. Everything else is
+shed with `Overloaded` before it touches the database:
+
+- the queue is full;
+- the wait predicted from the recent service time is longer than `timeout`
+  (so nothing queues only to time out);
+- the request waited `timeout` seconds without getting a slot.
+
+`Overloaded.retry_after` is the predicted time for the current queue to
+drain, in whole seconds (at least 1), for a `Retry-After` header.
+
+The counters are per process: run one controller per worker and size
+`limit` for that worker's share of the database's write capacity.
+"""
+import asyncio
+import logging
+import math
+import threading
+import time
+from collections import deque
+from contextlib import asynccontextmanager, contextmanager
+
+from django.conf import settings
+
+logger = logging.getLogger("webapi")
+
+
+class Overloaded(Exception):
+    def __init__(self, reason: str, retry_after: int):
+        super().__init__(f"Server busy ({reason}); retry in {retry_after}s.")
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class _Waiter:
+    __slots__ = ("granted", "wake")
+
+    def __init__(self, wake):
+        self.granted = False
+        self.wake = wake
+
+
+class AdmissionController:
+    # weight of the latest call in the moving average of service time
+    ALPHA = 0.2
+
+    def __init__(self, name: str, limit: int, max_queue: int, timeout: float, clock=time.monotonic):
+        self.name = name
+        self.limit = limit
+        self.max_queue = max_queue
+        self.timeout = timeout
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._waiters: deque[_Waiter] = deque()
+        self._service_s = 0.0
+        self.in_flight = 0
+        self.admitted = 0
+        self.shed = 0
+        self.timed_out = 0
+
+    # ----- gates -----
+    @contextmanager
+    def admit(self):
+        event = threading.Event()
+        waiter = self._enter(event.set)
+        if waiter is not None and not event.wait(self.timeout) and not self._withdraw(waiter):
+            self._time_out()
+        started = self.clock()
+        try:
+            yield
+        finally:
+            self._release(self.clock() - started)
+
+    @asynccontextmanager
+    async def admit_async(self):
+        loop = asyncio.get_running_loop()
+        granted = loop.create_future()
+
+        def wake():  # called with the lock held, possibly from another thread
+            loop.call_soon_threadsafe(lambda: granted.done() or granted.set_result(None))
+
+        waiter = self._enter(wake)
+        if waiter is not None:
+            try:
+                await asyncio.wait_for(asyncio.shield(granted), self.timeout)
+            except TimeoutError:
+                if not self._withdraw(waiter):
+                    self._time_out()
+            except asyncio.CancelledError:
+                if self._withdraw(waiter):
+                    self._release(None)
+                raise
+        started = self.clock()
+        try:
+            yield
+        finally:
+            self._release(self.clock() - started)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "limit": self.limit, "max_queue": self.max_queue, "timeout_s": self.timeout,
+                "in_flight": self.in_flight, "queued": len(self._waiters),
+                "admitted": self.admitted, "shed": self.shed, "timed_out": self.timed_out,
+                "service_ms": round(self._service_s * 1000, 2),
+            }
+
+    # ----- bookkeeping -----
+    def _expected_wait(self, position: int) -> float:
+        # slots free up about every service_time / limit seconds
+        return position * self._service_s / self.limit
+
+    def _shed(self, reason: str) -> Overloaded:
+        self.shed += 1
+        retry_after = max(1, math.ceil(self._expected_wait(len(self._waiters) + 1)))
+        # info, not warning: under overload this fires for every shed request
+        logger.info(
+            "admission shed name=%s reason=%s in_flight=%s queued=%s shed=%s",
+            self.name, reason, self.in_flight, len(self._waiters), self.shed,
+        )
+        return Overloaded(reason, retry_after)
+
+    def _enter(self, wake) -> _Waiter | None:
+        """Take a free slot (None) or a place in the queue (the waiter); raises Overloaded."""
+        with self._lock:
+            if self.in_flight < self.limit and not self._waiters:
+                self.in_flight += 1
+                self.admitted += 1
+                return None
+            if len(self._waiters) >= self.max_queue:
+                raise self._shed("queue full")
+            if self._expected_wait(len(self._waiters) + 1) > self.timeout:
+                raise self._shed("expected wait too long")
+            waiter = _Waiter(wake)
+            self._waiters.append(waiter)
+            return waiter
+
+    def _withdraw(self, waiter: _Waiter) -> bool:
+        """Leave the queue; True if the slot was handed over in the meantime."""
+        with self._lock:
+            if waiter.granted:
+                return True
+            self._waiters.remove(waiter)
+            return False
+
+    def _time_out(self):
+        with self._lock:
+            self.timed_out += 1
+            raise self._shed("queue timeout")
+
+    def _release(self, elapsed: float | None) -> None:
+        with self._lock:
+            if elapsed is not None:
+                self._service_s += self.ALPHA * (elapsed - self._service_s) if self._service_s else elapsed
+            if self._waiters:
+                # hand the slot over; in_flight stays the same
+                waiter = self._waiters.popleft()
+                waiter.granted = True
+                self.admitted += 1
+                waiter.wake()
+            else:
+                self.in_flight -= 1
+
+
+# process-wide, shared by the sync and async single-order endpoints
+order_admission = AdmissionController(
+    "orders", settings.ORDER_ADMISSION_LIMIT, settings.ORDER_ADMISSION_QUEUE, settings.ORDER_ADMISSION_TIMEOUT,
+)
+# batches: a batch call takes far longer than an order, so it is not averaged in with them
+batch_admission = AdmissionController(
+    "order_batches", settings.ORDER_BATCH_ADMISSION_LIMIT, settings.ORDER_BATCH_ADMISSION_QUEUE,
+    settings.ORDER_BATCH_ADMISSION_TIMEOUT,
+)
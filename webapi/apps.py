@@ -2,4 +2,13 @@ from django.apps import AppConfig
 
 class WebapiConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
-    name = "webapi"
\ No newline at end of file
+    name = "webapi"
+
+    def ready(self):
+        from django.db import connections
+        from django.db.backends.signals import connection_created
+        from .instrumentation import install_query_recorder
+
+        connection_created.connect(install_query_recorder)
+        for conn in connections.all(initialized_only=True):
+            install_query_recorder(connection=conn)
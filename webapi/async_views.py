@@ -0,0 +1,144 @@
+# Async (ASGI) versions of the product and order endpoints.
+# Reads go through the async repositories. Order placement uses
+# DjangoAsyncUnitOfWork; other transactional writes run the sync service
+# in `sync_to_async`, as Django recommends.
+import json
+import logging
+
+from asgiref.sync import sync_to_async
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_http_methods
+
+from acme.infrastructure.django_impl.repositories import DjangoUnitOfWork
+from acme.infrastructure.django_impl.async_repositories import DjangoAsyncUnitOfWork
+from acme.application.services.product_service import ProductService, AsyncProductService
+from acme.application.services.order_service import OrderService, AsyncOrderService
+from acme.application.dtos import CreateProductDTO, OrderLineDTO
+from acme.domain.errors import DomainError, IdempotencyConflict
+
+from .admission import Overloaded, order_admission
+from .pagination import KeysetPagination, InvalidCursor
+from .instrumentation import JsonResponse, query_budget, timed
+from .encoders import product_out, order_out, order_summary_out
+from .serializers import ProductCreateUpdateSerializer, OrderLineInSerializer
+from .views import request_fingerprint
+
+logger = logging.getLogger("webapi")
+
+
+def _json_body(request):
+    try:
+        return json.loads(request.body or b"null")
+    except ValueError:
+        return None
+
+def _detail(message: str, status: int) -> JsonResponse:
+    return JsonResponse({"detail": message}, status=status)
+
+
+# ---------- Products ----------
+@csrf_exempt
+@require_http_methods(["GET", "POST"])
+@query_budget({"GET": 1})
+async def products_view(request):
+    if request.method == "GET":
+        try:
+            pager = KeysetPagination(request)
+        except InvalidCursor as e:
+            return _detail(str(e), 400)
+        svc = timed(AsyncProductService(DjangoAsyncUnitOfWork()))
+        products = pager.paginate(await svc.list_page(pager.after_id, pager.fetch_size, pager.before_id))
+        return JsonResponse(pager.page_data([product_out(p) for p in products]))
+
+    ser = ProductCreateUpdateSerializer(data=_json_body(request))
+    if not ser.is_valid():
+        return JsonResponse(ser.errors, status=400)
+    try:
+        p = await sync_to_async(timed(ProductService(DjangoUnitOfWork())).create)(CreateProductDTO(**ser.validated_data))
+    except DomainError as e:
+        return _detail(str(e), 400)
+    return JsonResponse(product_out(p), status=201)
+
+@csrf_exempt
+@require_http_methods(["GET", "PUT"])
+@query_budget({"GET": 1})
+async def product_detail_view(request, pk: int):
+    if request.method == "GET":
+        p = await timed(AsyncProductService(DjangoAsyncUnitOfWork())).get(pk)
+        if not p:
+            return _detail("Not found.", 404)
+        return JsonResponse(product_out(p))
+
+    ser = ProductCreateUpdateSerializer(data=_json_body(request))
+    if not ser.is_valid():
+        return JsonResponse(ser.errors, status=400)
+    try:
+        p = await sync_to_async(timed(ProductService(DjangoUnitOfWork())).update)(pk, CreateProductDTO(**ser.validated_data))
+    except DomainError as e:
+        return _detail(str(e), 400)
+    return JsonResponse(product_out(p))
+
+
+# ---------- Orders ----------
+@csrf_exempt
+@require_http_methods(["GET", "POST"])
+@query_budget({"GET": 2, "POST": 11})
+async def orders_view(request):
+    if request.method == "GET":
+        try:
+            pager = KeysetPagination(request)
+        except InvalidCursor as e:
+            return _detail(str(e), 400)
+        svc = timed(AsyncOrderService(DjangoAsyncUnitOfWork()))
+        orders = pager.paginate(await svc.list_summaries(pager.after_id, pager.fetch_size, pager.before_id))
+        data = [order_summary_out(o) for o in orders]
+        resp = JsonResponse(pager.page_data(data))
+        resp["Cache-Control"] = "no-store"
+        return resp
+
+    body = _json_body(request)
+    items = body.get("items") if isinstance(body, dict) else None
+    if not isinstance(items, list) or len(items) == 0:
+        return _detail("Body must be {'items': [{'product_id': int, 'quantity': int}, ...]}", 400)
+    lines_ser = OrderLineInSerializer(data=items, many=True)
+    if not lines_ser.is_valid():
+        return JsonResponse({"detail": "Invalid items", "errors": lines_ser.errors}, status=400)
+
+    lines = [OrderLineDTO(**d) for d in lines_ser.validated_data]
+    key = request.headers.get("Idempotency-Key")
+    if key is not None and not 0 < len(key) <= 255:
+        return _detail("Idempotency-Key must be 1-255 characters.", 400)
+    try:
+        async with order_admission.admit_async():
+            if key:
+                svc = timed(OrderService(DjangoUnitOfWork()))
+                data, replayed = await sync_to_async(svc.place_order_once)(
+                    key, request_fingerprint(lines_ser.validated_data), lines, order_out
+                )
+            else:
+                order = await timed(AsyncOrderService(DjangoAsyncUnitOfWork())).place_order(lines)
+                data, replayed = order_out(order), False
+    except Overloaded as e:
+        resp = _detail(str(e), 503)
+        resp["Retry-After"] = str(e.retry_after)
+        return resp
+    except IdempotencyConflict as e:
+        return _detail(str(e), 409)
+    except DomainError as e:
+        return _detail(str(e), 400)
+
+    logger.info("order_%s id=%s", "replayed" if replayed else "created", data["id"])
+    resp = JsonResponse(data, status=201)
+    resp["Cache-Control"] = "no-store"
+    if replayed:
+        resp["Idempotent-Replayed"] = "true"
+    return resp
+
+@require_http_methods(["GET"])
+@query_budget(3)  # order, archived order on a miss, lines
+async def order_detail_view(request, order_id: int):
+    try:
+        order = await timed(AsyncOrderService(DjangoAsyncUnitOfWork())).get_order(order_id)
+    except DomainError as e:
+        return _detail(str(e), 404)
+    return JsonResponse(order_out(order))
@@ -0,0 +1,69 @@
+"""ETag / Last-Modified for the product catalog, for Django's `condition` decorator.
+
+Validators come from version reads (`ProductService.catalog_version`,
+`product_version`), so a request whose `If-None-Match`/`If-Modified-Since`
+still matches gets a 304 before any product is loaded or serialized.
+
+Every product write, stock reservations included, bumps the row's
+`version` in its own transaction, so the list ETag (count and version sum)
+changes whenever any page could, in commit order, and a detail ETag
+whenever its product does. ETags are per URL, like
+the caches that send them back; the renderer format is mixed in because
+`?format=api` and JSON are different representations of the same URL.
+
+Last-Modified (`updated_at`) is only sent on SQLite. There BEGIN IMMEDIATE
+takes the write lock before the timestamp is read, so timestamps follow
+commit order. With concurrent writers (PostgreSQL) a transaction can commit
+after one with a later timestamp, and `If-Modified-Since` would then get a
+stale 304. Clients there revalidate with the ETag.
+"""
+import hashlib
+
+from django.db import DEFAULT_DB_ALIAS, connections
+
+from acme.infrastructure.django_impl.repositories import DjangoUnitOfWork
+from acme.application.services.product_service import ProductService
+
+from .instrumentation import timed
+
+
+def _format(request) -> str:
+    renderer = getattr(request, "accepted_renderer", None)
+    return renderer.format if renderer else "json"
+
+def _tag(*parts) -> str:
+    return hashlib.sha1(":".join(str(p) for p in parts).encode()).hexdigest()
+
+def _catalog_version(request):
+    # condition() asks for the ETag and Last-Modified separately; one query for both
+    if not hasattr(request, "_catalog_version"):
+        request._catalog_version = timed(ProductService(DjangoUnitOfWork())).catalog_version()
+    return request._catalog_version
+
+def _timestamps_follow_commits() -> bool:
+    return connections[DEFAULT_DB_ALIAS].vendor == "sqlite"
+
+def _product_version(request, pk):
+    cached = getattr(request, "_product_version", None)
+    if cached is None or cached[0] != pk:
+        cached = (pk, timed(ProductService(DjangoUnitOfWork())).product_version(int(pk)))
+        request._product_version = cached
+    return cached[1]
+
+
+def catalog_etag(request, *args, **kwargs) -> str:
+    v = _catalog_version(request)
+    return _tag("catalog", v.count, v.version, _format(request))
+
+def catalog_last_modified(request, *args, **kwargs):
+    return _catalog_version(request).last_modified if _timestamps_follow_commits() else None
+
+def product_etag(request, pk=None, *args, **kwargs) -> str | None:
+    v = _product_version(request, pk)
+    if v is None:
+        return None  # missing product: no validator, the view answers 404
+    return _tag("product", pk, v.version, _format(request))
+
+def product_last_modified(request, pk=None, *args, **kwargs):
+    v = _product_version(request, pk)
+    return v.last_modified if v is not None and _timestamps_follow_commits() else None
@@ -0,0 +1,66 @@
+"""Read-your-writes for clients of a replicated database.
+
+A request that wrote to the primary gets a pin token back, both as the
+`acme_rw` cookie and as the `X-Read-Your-Writes` response header. The token
+is signed and valid for READ_YOUR_WRITES_SECONDS. A request that carries a
+valid token, as the cookie or as that header (for clients without a cookie
+jar), reads from the primary. Everything else may be served by a replica
+(acme.infrastructure.django_impl.routing), so it can trail the primary by
+the replication lag.
+"""
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core import signing
+
+from acme.infrastructure.django_impl.routing import begin_request, end_request
+
+COOKIE = "acme_rw"
+HEADER = "X-Read-Your-Writes"
+_signer = signing.TimestampSigner(salt="acme.read-your-writes")
+
+def wants_primary(request) -> bool:
+    token = request.headers.get(HEADER) or request.COOKIES.get(COOKIE)
+    if not token:
+        return False
+    try:
+        _signer.unsign(token, max_age=settings.READ_YOUR_WRITES_SECONDS)
+    except signing.BadSignature:  # also expired
+        return False
+    return True
+
+
+class ReadYourWritesMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        state, token = begin_request(pinned=wants_primary(request))
+        try:
+            response = self.get_response(request)
+        finally:
+            end_request(token)
+        return self.finish(response, state)
+
+    async def __acall__(self, request):
+        state, token = begin_request(pinned=wants_primary(request))
+        try:
+            response = await self.get_response(request)
+        finally:
+            end_request(token)
+        return self.finish(response, state)
+
+    def finish(self, response, state):
+        if state.wrote:
+            pin = _signer.sign("primary")
+            response[HEADER] = pin
+            response.set_cookie(
+                COOKIE, pin, max_age=settings.READ_YOUR_WRITES_SECONDS, httponly=True, samesite="Lax",
+            )
+        return response
@@ -0,0 +1,52 @@
+from decimal import Decimal
+
+from acme.application.dtos import OrderSummaryDTO, DailySalesDTO, ProductSalesDTO
+from acme.domain.order import Order
+from acme.domain.product import Product
+
+# Hand-written equivalents of ProductOutSerializer / OrderOutSerializer output:
+# same keys, same order, Decimals quantized to cents and rendered as strings
+# (DRF's DecimalField with COERCE_DECIMAL_TO_STRING). Keep in sync with
+# webapi/serializers.py; tests/test_webapi.py compares them byte for byte.
+CENT = Decimal("0.01")
+
+def money(d: Decimal) -> str:
+    return f"{d.quantize(CENT):f}"
+
+def product_out(p: Product) -> dict:
+    return {"id": p.id, "sku": p.sku, "name": p.name, "price": money(p.price), "stock": p.stock}
+
+def order_out(o: Order) -> dict:
+    # line_total and total are already quantized by the domain
+    return {
+        "id": o.id,
+        "items": [{
+            "product_id": i.product_id,
+            "sku": i.sku,
+            "name": i.name,
+            "unit_price": money(i.unit_price),
+            "quantity": i.quantity,
+            "line_total": f"{i.line_total:f}",
+        } for i in o.items],
+        "total": f"{o.total:f}",
+    }
+
+def product_fields_out(row: dict, fields: tuple[str, ...]) -> dict:
+    # sparse product_out, from a ProductRepository.search_fields row
+    return {f: money(row[f]) if f == "price" else row[f] for f in fields}
+
+def order_header_out(s: OrderSummaryDTO) -> dict:
+    # order_out without the items
+    return {"id": s.id, "total": money(s.total)}
+
+def pick(data: dict, keys) -> dict:
+    return {k: v for k, v in data.items() if k in keys}
+
+def order_summary_out(s: OrderSummaryDTO) -> dict:
+    return {"id": s.id, "items_count": s.items_count, "total": money(s.total)}
+
+def daily_sales_out(d: DailySalesDTO) -> dict:
+    return {"day": d.day.isoformat(), "orders": d.orders, "units": d.units, "revenue": money(d.revenue)}
+
+def product_sales_out(p: ProductSalesDTO) -> dict:
+    return {"product_id": p.product_id, "sku": p.sku, "units": p.units, "revenue": money(p.revenue)}
@@ -0,0 +1,89 @@
+import csv
+import json
+from datetime import datetime, time, timezone as dt_timezone
+from typing import Iterable, Iterator
+
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+
+from acme.application.dtos import ExportFilterDTO
+from acme.domain.order import Order
+from acme.domain.product import Product
+
+from .encoders import money, order_out, product_out
+
+PRODUCT_FIELDS = ["id", "sku", "name", "price", "stock"]
+ORDER_LINE_FIELDS = ["order_id", "created_at", "product_id", "sku", "name", "unit_price", "quantity", "line_total"]
+
+
+# ---------- rows ----------
+def order_doc(o: Order) -> dict:
+    doc = order_out(o)
+    doc["created_at"] = o.created_at.isoformat() if o.created_at else None
+    return doc
+
+def order_line_rows(orders: Iterable[Order]) -> Iterator[dict]:
+    # CSV is flat: one row per order line
+    for o in orders:
+        created_at = o.created_at.isoformat() if o.created_at else ""
+        for i in o.items:
+            yield {
+                "order_id": o.id, "created_at": created_at, "product_id": i.product_id,
+                "sku": i.sku, "name": i.name, "unit_price": money(i.unit_price),
+                "quantity": i.quantity, "line_total": money(i.line_total),
+            }
+
+
+# ---------- encoders (one chunk of text per row) ----------
+def ndjson_lines(docs: Iterable[dict]) -> Iterator[str]:
+    for d in docs:
+        yield json.dumps(d, ensure_ascii=False) + "\n"
+
+class _Echo:
+    def write(self, value: str) -> str:
+        return value
+
+def csv_lines(rows: Iterable[dict], fields: list[str]) -> Iterator[str]:
+    writer = csv.DictWriter(_Echo(), fieldnames=fields)
+    yield writer.writeheader()
+    for r in rows:
+        yield writer.writerow(r)
+
+def export_products(products: Iterable[Product], fmt: str) -> Iterator[str]:
+    rows = (product_out(p) for p in products)
+    return csv_lines(rows, PRODUCT_FIELDS) if fmt == "csv" else ndjson_lines(rows)
+
+def export_orders(orders: Iterable[Order], fmt: str) -> Iterator[str]:
+    if fmt == "csv":
+        return csv_lines(order_line_rows(orders), ORDER_LINE_FIELDS)
+    return ndjson_lines(order_doc(o) for o in orders)
+
+
+# ---------- filters ----------
+def _parse_when(value: str | None) -> datetime | None:
+    if not value:
+        return None
+    dt = parse_datetime(value)
+    if dt is None:
+        d = parse_date(value)
+        if d is None:
+            raise ValueError(f"Invalid date: {value!r}.")
+        dt = datetime.combine(d, time.min)
+    return timezone.make_aware(dt, dt_timezone.utc) if timezone.is_naive(dt) else dt
+
+def _parse_int(value: str | None) -> int | None:
+    if value in (None, ""):
+        return None
+    try:
+        return int(value)
+    except ValueError:
+        raise ValueError(f"Invalid id: {value!r}.")
+
+def parse_export_filter(params) -> ExportFilterDTO:
+    """`created_from`/`created_to` (ISO date or datetime, UTC if naive) and `min_id`/`max_id`."""
+    return ExportFilterDTO(
+        created_from=_parse_when(params.get("created_from")),
+        created_to=_parse_when(params.get("created_to")),
+        min_id=_parse_int(params.get("min_id")),
+        max_id=_parse_int(params.get("max_id")),
+    )
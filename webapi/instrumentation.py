@@ -0,0 +1,225 @@
+"""Per-request query and timing metrics.
+
+`RequestMetricsMiddleware` opens a `RequestMetrics` for each request and puts
+it in a context variable, so it follows the request into `sync_to_async`
+threads. Everything below reports into it while it is active:
+
+- every SQL statement, through a connection execute wrapper (`db`);
+- service calls made through `timed()` (`service`);
+- JSON encoding in the renderer and `JsonResponse` (`serialize`).
+
+The totals go out as a `Server-Timing` header and as one `webapi` log record.
+A query shape that repeats `N_PLUS_ONE_THRESHOLD` times or more in one
+request is logged as a probable N+1. A view can set a query budget with
+`query_budget`; going over it is logged, and with `QUERY_BUDGET_STRICT` it
+raises `QueryBudgetExceeded` (tests turn that on).
+"""
+import logging
+import re
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.http import JsonResponse as DjangoJsonResponse
+
+logger = logging.getLogger("webapi")
+
+PHASES = ("db", "service", "serialize")
+
+
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+
+class RequestMetrics:
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.total_ms = 0.0
+        self.ms = dict.fromkeys(PHASES, 0.0)
+        self.shapes: Counter[str] = Counter()
+        self.queries = 0
+        self.budget: int | None = None
+
+    def add_query(self, sql: str, ms: float) -> None:
+        self.queries += 1
+        self.ms["db"] += ms
+        self.shapes[query_shape(sql)] += 1
+
+    def repeated_shapes(self, threshold: int) -> dict[str, int]:
+        return {s: n for s, n in self.shapes.items() if n >= threshold}
+
+    def server_timing(self) -> str:
+        return ", ".join([
+            f'db;dur={self.ms["db"]:.2f};desc="{self.queries} queries"',
+            f'service;dur={self.ms["service"]:.2f}',
+            f'serialize;dur={self.ms["serialize"]:.2f}',
+            f"total;dur={self.total_ms:.2f}",
+        ])
+
+_current: ContextVar[RequestMetrics | None] = ContextVar("request_metrics", default=None)
+
+def current_metrics() -> RequestMetrics | None:
+    return _current.get()
+
+
+# ---------- collectors ----------
+_IN_LIST = re.compile(r"IN \((?:%s, )*%s\)")
+_NUMBER = re.compile(r"\b\d+\b")
+_STRING = re.compile(r"'(?:[^']|'')*'")
+
+def query_shape(sql: str) -> str:
+    # Django passes parameters separately, but IN lists grow with them and
+    # some SQL (LIMIT, CASE ... THEN 3) has literals inlined
+    sql = _IN_LIST.sub("IN (...)", sql)
+    return _NUMBER.sub("?", _STRING.sub("?", sql))
+
+def record_query(execute, sql, params, many, context):
+    m = _current.get()
+    if m is None:
+        return execute(sql, params, many, context)
+    t0 = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        m.add_query(sql, (time.perf_counter() - t0) * 1000)
+
+def install_query_recorder(sender=None, connection=None, **kwargs) -> None:
+    """`connection_created` receiver; also called at startup for open connections."""
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_query)
+
+@contextmanager
+def phase(name: str):
+    m = _current.get()
+    if m is None:
+        yield
+        return
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        m.ms[name] += (time.perf_counter() - t0) * 1000
+
+
+class _Timed:
+    """Proxy that counts the time of every method call as `service` time."""
+
+    def __init__(self, target):
+        self._target = target
+
+    def __getattr__(self, name):
+        attr = getattr(self._target, name)
+        if not callable(attr):
+            return attr
+        if iscoroutinefunction(attr):
+            @wraps(attr)
+            async def timed_async(*args, **kwargs):
+                with phase("service"):
+                    return await attr(*args, **kwargs)
+            return timed_async
+
+        @wraps(attr)
+        def timed_call(*args, **kwargs):
+            with phase("service"):
+                return attr(*args, **kwargs)
+        return timed_call
+
+def timed(service):
+    """Wrap a service so its calls are reported as `service` time."""
+    return _Timed(service)
+
+
+class JsonResponse(DjangoJsonResponse):
+    """`JsonResponse` whose encoding is reported as `serialize` time."""
+
+    def __init__(self, data, *args, **kwargs):
+        with phase("serialize"):
+            super().__init__(data, *args, **kwargs)
+
+
+# ---------- budgets ----------
+def query_budget(limit: int | dict[str, int]):
+    """Cap the queries a view may run: a number, or one per HTTP method."""
+    def decorate(view):
+        view.query_budget = limit
+        return view
+    return decorate
+
+def _view_budget(view_func, method: str) -> int | None:
+    # function views carry it directly; class-based views on the class
+    # (`view_class` for Django, `cls` for DRF)
+    budget = getattr(view_func, "query_budget", None)
+    if budget is None:
+        cls = getattr(view_func, "view_class", None) or getattr(view_func, "cls", None)
+        budget = getattr(cls, "query_budget", None)
+    if isinstance(budget, dict):
+        return budget.get(method)
+    return budget
+
+
+# ---------- middleware ----------
+class RequestMetricsMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        m = RequestMetrics()
+        token = _current.set(m)
+        try:
+            response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        return self.finish(request, response, m)
+
+    async def __acall__(self, request):
+        m = RequestMetrics()
+        token = _current.set(m)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _current.reset(token)
+        return self.finish(request, response, m)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        m = _current.get()
+        if m is not None:
+            m.budget = _view_budget(view_func, request.method)
+        return None
+
+    def finish(self, request, response, m: RequestMetrics):
+        m.total_ms = (time.perf_counter() - m.started) * 1000
+        request.metrics = m
+        response["Server-Timing"] = m.server_timing()
+
+        repeated = m.repeated_shapes(settings.N_PLUS_ONE_THRESHOLD)
+        fields = {
+            "method": request.method, "path": request.path, "status": response.status_code,
+            "queries": m.queries, "db_ms": round(m.ms["db"], 2), "service_ms": round(m.ms["service"], 2),
+            "serialize_ms": round(m.ms["serialize"], 2), "total_ms": round(m.total_ms, 2),
+            "query_budget": m.budget, "n_plus_one": repeated,
+        }
+        logger.info(
+            "request method=%s path=%s status=%s queries=%s db_ms=%.2f service_ms=%.2f serialize_ms=%.2f total_ms=%.2f",
+            request.method, request.path, response.status_code, m.queries,
+            m.ms["db"], m.ms["service"], m.ms["serialize"], m.total_ms, extra=fields,
+        )
+        for shape, n in repeated.items():
+            logger.warning("probable N+1 path=%s count=%s query=%s", request.path, n, shape, extra=fields)
+
+        if m.budget is not None and m.queries > m.budget:
+            message = f"{request.method} {request.path} ran {m.queries} queries (budget {m.budget})."
+            logger.error("query budget exceeded: %s", message, extra=fields)
+            if settings.QUERY_BUDGET_STRICT:
+                raise QueryBudgetExceeded(message)
+        return response
@@ -0,0 +1,33 @@
+from datetime import datetime, timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from acme.infrastructure.django_impl.archive import archive_before
+
+
+class Command(BaseCommand):
+    help = "Move old orders to the archive tables, one chunk per transaction."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--days", type=int, default=None,
+                            help="Archive orders older than this many days (default ORDER_ARCHIVE_AFTER_DAYS).")
+        parser.add_argument("--before", default=None, help="Archive orders placed before this ISO date/time instead.")
+        parser.add_argument("--chunk-size", type=int, default=1000)
+
+    def handle(self, days=None, before=None, chunk_size=1000, **options):
+        if before is not None:
+            try:
+                cutoff = datetime.fromisoformat(before)
+            except ValueError:
+                raise CommandError(f"--before: not an ISO date/time: {before!r}")
+            if timezone.is_naive(cutoff):
+                cutoff = timezone.make_aware(cutoff)
+        else:
+            cutoff = timezone.now() - timedelta(days=settings.ORDER_ARCHIVE_AFTER_DAYS if days is None else days)
+        done = 0
+        for n in archive_before(cutoff, chunk_size):
+            done += n
+            self.stdout.write(f"{done} orders archived")
+        self.stdout.write(self.style.SUCCESS(f"archived={done}"))
@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+
+from acme.infrastructure.django_impl.order_totals import backfill
+
+
+class Command(BaseCommand):
+    help = "Fill OrderModel.total/items_count from the order lines, one chunk per transaction."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--chunk-size", type=int, default=1000)
+        parser.add_argument("--all", action="store_true", help="Recompute every order, not only those still NULL.")
+
+    def handle(self, chunk_size=1000, all=False, **options):
+        done = 0
+        for n in backfill(chunk_size, only_missing=not all):
+            done += n
+            self.stdout.write(f"{done} orders written")
+        self.stdout.write(self.style.SUCCESS(f"backfilled={done}"))
@@ -0,0 +1,31 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+
+class Command(BaseCommand):
+    help = "Write the OpenAPI schema to API_SCHEMA_FILE, which /schema/ serves; --check fails if it is out of date."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--check", action="store_true", help="Compare only; don't write.")
+
+    def handle(self, check=False, **options):
+        if not settings.API_DOCS:
+            raise CommandError("The schema is generated by drf-spectacular; run with ACME_API_DOCS=1.")
+        from drf_spectacular.generators import SchemaGenerator
+        from drf_spectacular.renderers import OpenApiJsonRenderer
+
+        schema = SchemaGenerator().get_schema(request=None, public=True)
+        body = OpenApiJsonRenderer().render(schema, renderer_context={"indent": 2}) + b"\n"
+        path = settings.API_SCHEMA_FILE
+        current = path.read_bytes() if path.exists() else None
+        if check:
+            if current != body:
+                raise CommandError(f"{path} is out of date; run manage.py build_schema.")
+            self.stdout.write(self.style.SUCCESS(f"{path} is up to date"))
+            return
+        if current == body:
+            self.stdout.write(f"{path} unchanged")
+            return
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(body)
+        self.stdout.write(self.style.SUCCESS(f"wrote {path} ({len(body)} bytes)"))
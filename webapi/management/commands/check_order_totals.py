@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from acme.infrastructure.django_impl.order_totals import mismatches
+
+
+class Command(BaseCommand):
+    help = "Compare OrderModel.total/items_count with the order lines; fails if any order disagrees."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--chunk-size", type=int, default=1000)
+        parser.add_argument("--limit", type=int, default=50, help="Mismatches to print.")
+
+    def handle(self, chunk_size=1000, limit=50, **options):
+        bad = 0
+        for order_id, stored, expected in mismatches(chunk_size):
+            bad += 1
+            if bad <= limit:
+                self.stderr.write(
+                    f"order {order_id}: stored items_count={stored[0]} total={stored[1]}, "
+                    f"lines say items_count={expected[0]} total={expected[1]}"
+                )
+        if bad:
+            raise CommandError(f"{bad} orders inconsistent; run backfill_order_totals --all to repair.")
+        self.stdout.write(self.style.SUCCESS("all order totals consistent"))
@@ -0,0 +1,36 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from acme.infrastructure.django_impl.repositories import DjangoUnitOfWork
+from acme.application.services.order_service import OrderService
+from acme.application.services.product_service import ProductService
+from webapi.exports import export_orders, export_products, parse_export_filter
+
+
+class Command(BaseCommand):
+    help = "Stream orders (with their lines) or products as NDJSON or CSV, one row at a time."
+
+    def add_arguments(self, parser):
+        parser.add_argument("what", choices=["orders", "products"])
+        parser.add_argument("--format", choices=["ndjson", "csv"], default="ndjson")
+        parser.add_argument("--output", "-o", help="File to write; defaults to stdout.")
+        parser.add_argument("--created-from")
+        parser.add_argument("--created-to")
+        parser.add_argument("--min-id")
+        parser.add_argument("--max-id")
+
+    def handle(self, what, format, output=None, **options):
+        try:
+            f = parse_export_filter(options)
+        except ValueError as e:
+            raise CommandError(str(e))
+        uow = DjangoUnitOfWork()
+        if what == "orders":
+            chunks = export_orders(OrderService(uow).export_orders(f), format)
+        else:
+            chunks = export_products(ProductService(uow).export(f), format)
+        if output:
+            with open(output, "w", encoding="utf-8", newline="") as fh:
+                fh.writelines(chunks)
+        else:
+            for chunk in chunks:
+                self.stdout.write(chunk, ending="")
@@ -0,0 +1,31 @@
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from acme.infrastructure.django_impl.repositories import DjangoUnitOfWork
+from acme.application.services.product_import_service import ProductImportService, READERS
+
+
+class Command(BaseCommand):
+    help = "Stream a CSV or NDJSON file of products and upsert them by sku in chunks."
+
+    def add_arguments(self, parser):
+        parser.add_argument("path")
+        parser.add_argument("--format", choices=sorted(READERS), help="Defaults to the file extension.")
+        parser.add_argument("--chunk-size", type=int, default=1000)
+
+    def handle(self, path, format=None, chunk_size=1000, **options):
+        fmt = format or {".csv": "csv", ".ndjson": "ndjson", ".jsonl": "ndjson"}.get(Path(path).suffix.lower())
+        if fmt is None:
+            raise CommandError("Cannot guess the format from the extension; pass --format.")
+        svc = ProductImportService(DjangoUnitOfWork(), chunk_size=chunk_size)
+        try:
+            with open(path, encoding="utf-8-sig", newline="") as f:
+                report = svc.run(READERS[fmt](f))
+        except OSError as e:
+            raise CommandError(str(e))
+        for err in report.errors:
+            self.stderr.write(f"row {err['row']} ({err['sku']}): {err['error']}")
+        self.stdout.write(self.style.SUCCESS(
+            f"created={report.created} updated={report.updated} failed={report.failed}"
+        ))
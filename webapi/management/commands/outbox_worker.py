@@ -0,0 +1,68 @@
+import logging
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from acme.application.services.outbox_relay import OutboxRelay
+from acme.infrastructure.django_impl.outbox import purge_delivered
+from acme.infrastructure.django_impl.repositories import DjangoUnitOfWork
+
+logger = logging.getLogger("acme.outbox")
+
+PURGE_EVERY = timedelta(minutes=10)
+
+
+class Command(BaseCommand):
+    help = "Deliver outbox events to the OUTBOX_HANDLERS, in batches, at least once."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=100)
+        parser.add_argument("--lease", type=float, default=60.0,
+                            help="Seconds a claimed batch is hidden from other workers.")
+        parser.add_argument("--poll", type=float, default=1.0, help="Seconds to sleep when the outbox is empty.")
+        parser.add_argument("--once", action="store_true", help="Exit once nothing is left to deliver.")
+        parser.add_argument("--stats", action="store_true", help="Print the backlog and exit.")
+        parser.add_argument("--keep-days", type=float, default=7.0, help="Delete delivered events older than this.")
+
+    def handle(self, batch_size=100, lease=60.0, poll=1.0, once=False, stats=False, keep_days=7.0, **options):
+        handlers = {name: [import_string(path) for path in paths] for name, paths in settings.OUTBOX_HANDLERS.items()}
+        relay = OutboxRelay(DjangoUnitOfWork(), handlers, batch_size=batch_size, lease_seconds=lease)
+        if stats:
+            s = relay.stats()
+            lag = (timezone.now() - s.oldest_pending).total_seconds() if s.oldest_pending else 0.0
+            self.stdout.write(f"pending={s.pending} oldest_pending_s={lag:.1f}")
+            return
+
+        delivered = failed = 0
+        last_purge = None
+        while True:
+            close_old_connections()
+            r = relay.relay_batch()
+            delivered += r.delivered
+            failed += r.failed
+            if r.claimed:
+                s = relay.stats()
+                backlog_s = (timezone.now() - s.oldest_pending).total_seconds() if s.oldest_pending else 0.0
+                logger.info(
+                    "outbox batch delivered=%s failed=%s lag_s=%.3f pending=%s backlog_s=%.1f",
+                    r.delivered, r.failed, r.max_lag_seconds, s.pending, backlog_s,
+                    extra={"delivered": r.delivered, "failed": r.failed, "lag_s": r.max_lag_seconds,
+                           "pending": s.pending, "backlog_s": backlog_s},
+                )
+            # before the backlog check: a worker that never catches up still purges
+            if last_purge is None or timezone.now() - last_purge > PURGE_EVERY:
+                purged = purge_delivered(timedelta(days=keep_days))
+                if purged:
+                    logger.info("outbox purged=%s", purged)
+                last_purge = timezone.now()
+            if r.claimed == batch_size:
+                continue  # probably more waiting
+            if once:
+                break
+            time.sleep(poll)
+        self.stdout.write(self.style.SUCCESS(f"delivered={delivered} failed={failed}"))
@@ -0,0 +1,19 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from acme.infrastructure.django_impl.repositories import purge_idempotency_keys
+
+
+class Command(BaseCommand):
+    help = "Delete Idempotency-Keys older than the retention period; a retry after that places a new order."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--hours", type=float, default=None,
+                            help="Keep keys this many hours (default IDEMPOTENCY_KEY_RETENTION_HOURS).")
+
+    def handle(self, hours=None, **options):
+        hours = settings.IDEMPOTENCY_KEY_RETENTION_HOURS if hours is None else hours
+        purged = purge_idempotency_keys(timedelta(hours=hours))
+        self.stdout.write(self.style.SUCCESS(f"purged={purged}"))
@@ -0,0 +1,68 @@
+import sqlite3
+import time
+from collections import deque
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+
+def snapshot(path) -> sqlite3.Connection:
+    """The database at `path` as of now, copied into memory."""
+    src, copy = sqlite3.connect(path), sqlite3.connect(":memory:")
+    try:
+        src.backup(copy)
+    finally:
+        src.close()
+    return copy
+
+def restore(copy: sqlite3.Connection, path) -> None:
+    dst = sqlite3.connect(path, timeout=5)
+    try:
+        copy.backup(dst)
+    finally:
+        dst.close()
+
+
+class Command(BaseCommand):
+    help = (
+        "Local stand-in for replication (sqlite profile): keep each DATABASE_REPLICAS file a copy of "
+        "the primary as it was --lag seconds ago. Snapshots are held in memory until due."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--lag", type=float, default=1.0, help="Seconds the replicas trail the primary.")
+        parser.add_argument("--interval", type=float, default=0.2, help="Seconds between snapshots.")
+        parser.add_argument("--once", action="store_true", help="Copy the primary now and exit.")
+
+    def handle(self, lag=1.0, interval=0.2, once=False, **options):
+        primary = settings.DATABASES["default"]
+        if not primary["ENGINE"].endswith("sqlite3") or not settings.DATABASE_REPLICAS:
+            raise CommandError("Needs the sqlite profile and ACME_DB_REPLICAS (replica files).")
+        replicas = [settings.DATABASES[alias]["NAME"] for alias in settings.DATABASE_REPLICAS]
+
+        def apply(copy):
+            for path in replicas:
+                restore(copy, path)
+            copy.close()
+
+        if once:
+            apply(snapshot(primary["NAME"]))
+            self.stdout.write(self.style.SUCCESS(f"copied {primary['NAME']} to {', '.join(map(str, replicas))}"))
+            return
+
+        self.stdout.write(f"replicating to {', '.join(map(str, replicas))} with {lag}s lag; Ctrl-C to stop")
+        pending: deque[tuple[float, sqlite3.Connection]] = deque()
+        try:
+            while True:
+                now = time.monotonic()
+                pending.append((now, snapshot(primary["NAME"])))
+                due = None
+                while pending and pending[0][0] <= now - lag:
+                    if due is not None:
+                        due.close()
+                    due = pending.popleft()[1]
+                if due is not None:
+                    apply(due)
+                time.sleep(interval)
+        except KeyboardInterrupt:
+            pass
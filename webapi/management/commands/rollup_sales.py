@@ -0,0 +1,35 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from acme.infrastructure.django_impl.sales_rollups import advance, reset
+
+
+class Command(BaseCommand):
+    help = "Fold new orders into the sales rollups, one chunk per transaction (--rebuild: recompute from scratch)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--chunk-size", type=int, default=1000)
+        parser.add_argument("--settle", type=float, default=None,
+                            help="Skip orders younger than this many seconds (default ROLLUP_SETTLE_SECONDS).")
+        parser.add_argument("--rebuild", action="store_true",
+                            help="Empty the rollups and fold in every order; reports are partial until it ends.")
+        parser.add_argument("--follow", action="store_true", help="Keep running, polling every --poll seconds.")
+        parser.add_argument("--poll", type=float, default=30.0)
+
+    def handle(self, chunk_size=1000, settle=None, rebuild=False, follow=False, poll=30.0, **options):
+        settle = settings.ROLLUP_SETTLE_SECONDS if settle is None else settle
+        if rebuild:
+            reset()
+        done = 0
+        while True:
+            close_old_connections()
+            for n in advance(chunk_size, settle):
+                done += n
+                self.stdout.write(f"{done} orders folded in")
+            if not follow:
+                break
+            time.sleep(poll)
+        self.stdout.write(self.style.SUCCESS(f"rolled_up={done}"))
@@ -0,0 +1,63 @@
+"""OpenAPI: schema annotations for the views, and the prebuilt schema.
+
+With `API_DOCS` on, the annotations are drf-spectacular's. With it off
+(production), they are inert stand-ins, so drf-spectacular is never
+imported by a worker that only serves the API.
+
+`manage.py build_schema` writes the schema to `API_SCHEMA_FILE` (named after
+`API_VERSION`). `schema_view` serves that file from memory with a strong
+ETag, so `/schema/` doesn't introspect the views on every hit.
+"""
+import hashlib
+
+from django.conf import settings
+from django.http import HttpResponse, JsonResponse
+from django.views.decorators.http import condition
+
+if settings.API_DOCS:
+    from drf_spectacular.types import OpenApiTypes
+    from drf_spectacular.utils import extend_schema, extend_schema_view, OpenApiParameter, inline_serializer
+else:
+    class OpenApiTypes:
+        STR = str
+
+    class OpenApiParameter:
+        QUERY, PATH, HEADER, COOKIE = "query", "path", "header", "cookie"
+
+        def __init__(self, *args, **kwargs):
+            pass
+
+    def extend_schema(*args, **kwargs):
+        return lambda view: view
+
+    extend_schema_view = extend_schema
+
+    def inline_serializer(*args, **kwargs):
+        return None
+
+
+# ---------- prebuilt schema ----------
+_schema: dict = {}
+
+def load_schema() -> tuple[bytes, str] | None:
+    """(body, etag) of API_SCHEMA_FILE, read once per process; None if it hasn't been built."""
+    if "body" not in _schema:
+        try:
+            body = settings.API_SCHEMA_FILE.read_bytes()
+        except FileNotFoundError:
+            return None
+        _schema.update(body=body, etag=hashlib.sha256(body).hexdigest())
+    return _schema["body"], _schema["etag"]
+
+def _schema_etag(request, *args, **kwargs) -> str | None:
+    loaded = load_schema()
+    return loaded[1] if loaded else None
+
+@condition(etag_func=_schema_etag)
+def schema_view(request):
+    loaded = load_schema()
+    if loaded is None:
+        return JsonResponse({"detail": "Schema not built; run `python manage.py build_schema`."}, status=404)
+    resp = HttpResponse(loaded[0], content_type="application/vnd.oai.openapi+json")
+    resp["Cache-Control"] = "public, max-age=300"
+    return resp
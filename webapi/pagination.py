@@ -0,0 +1,97 @@
+import base64
+import binascii
+
+from django.conf import settings
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+from acme.infrastructure.django_impl.repositories import row_id
+
+
+class InvalidCursor(Exception): ...
+
+
+# above any BigAutoField id: a "before" cursor at it reads the last page
+MAX_ID = 2 ** 63 - 1
+
+
+class KeysetPagination:
+    """Cursor pagination keyed on `id`, for views that page through repositories.
+
+    Works with DRF and plain Django requests (the async views use the latter).
+
+    Cursors are opaque to clients: `a:<id>` reads the page after `id`,
+    `b:<id>` the page before it. One extra row is fetched to know if more exist.
+    """
+    cursor_query_param = "cursor"
+    limit_query_param = "limit"
+
+    def __init__(self, request):
+        self.request = request
+        self.limit = self._limit()
+        self.after_id, self.before_id = self._decode(request.GET.get(self.cursor_query_param))
+
+    @property
+    def fetch_size(self) -> int:
+        return self.limit + 1
+
+    def _limit(self) -> int:
+        default = settings.API_PAGE_SIZE
+        try:
+            limit = int(self.request.GET.get(self.limit_query_param, default))
+        except (TypeError, ValueError):
+            return default
+        return max(1, min(limit, settings.API_MAX_PAGE_SIZE))
+
+    @staticmethod
+    def encode(direction: str, id: int) -> str:
+        return base64.urlsafe_b64encode(f"{direction}:{id}".encode()).decode().rstrip("=")
+
+    @classmethod
+    def last_page_cursor(cls) -> str:
+        """Cursor for the newest rows; its `previous` pages further back."""
+        return cls.encode("b", MAX_ID)
+
+    @staticmethod
+    def _decode(cursor: str | None) -> tuple[int | None, int | None]:
+        if not cursor:
+            return None, None
+        try:
+            raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+            direction, _, value = raw.partition(":")
+            id = int(value)
+        except (binascii.Error, UnicodeDecodeError, ValueError):
+            raise InvalidCursor("Invalid cursor.")
+        if direction == "a":
+            return id, None
+        if direction == "b":
+            return None, id
+        raise InvalidCursor("Invalid cursor.")
+
+    def _url(self, cursor: str | None) -> str | None:
+        if cursor is None:
+            return None
+        return replace_query_param(self.request.build_absolute_uri(), self.cursor_query_param, cursor)
+
+    def paginate(self, rows: list) -> list:
+        """Trim the over-fetched row and work out the neighbouring cursors."""
+        has_more = len(rows) > self.limit
+        if self.before_id is not None:
+            page = rows[1:] if has_more else rows
+            has_next, has_prev = True, has_more
+        else:
+            page = rows[:self.limit]
+            has_next, has_prev = has_more, self.after_id is not None
+        self.next = self.encode("a", row_id(page[-1])) if page and has_next else None
+        self.previous = self.encode("b", row_id(page[0])) if page and has_prev else None
+        return page
+
+    def page_data(self, data: list) -> dict:
+        return {
+            "next": self._url(self.next),
+            "previous": self._url(self.previous),
+            "results": data,
+        }
+
+    def get_paginated_response(self, data: list) -> Response:
+        return Response(self.page_data(data))
@@ -0,0 +1,36 @@
+from rest_framework.renderers import JSONRenderer
+
+from .instrumentation import phase
+
+try:
+    import orjson
+except ImportError:  # optional speed-up; JSONRenderer's json.dumps is used instead
+    orjson = None
+
+
+class FastJSONRenderer(JSONRenderer):
+    """JSONRenderer that encodes with orjson when it is installed.
+
+    Output is byte-identical to JSONRenderer for compact, unicode, strict JSON
+    (DRF's defaults). Indented output, other settings and types orjson
+    rejects fall back to the stock renderer.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        with phase("serialize"):
+            return self._render(data, accepted_media_type, renderer_context)
+
+    def _render(self, data, accepted_media_type, renderer_context):
+        if (orjson is None or data is None or self.ensure_ascii or not self.compact or not self.strict
+                or self.get_indent(accepted_media_type, renderer_context or {}) is not None):
+            return super().render(data, accepted_media_type, renderer_context)
+        try:
+            ret = orjson.dumps(
+                data,
+                default=self.encoder_class().default,
+                option=orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS,
+            )
+        except TypeError:  # orjson.JSONEncodeError, e.g. integers beyond 64 bits
+            return super().render(data, accepted_media_type, renderer_context)
+        # same \u2028/\u2029 escaping as JSONRenderer
+        return ret.replace(b"\xe2\x80\xa8", b"\\u2028").replace(b"\xe2\x80\xa9", b"\\u2029")
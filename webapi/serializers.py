@@ -1,5 +1,10 @@
+from functools import cache
+
+from django.conf import settings
 from rest_framework import serializers
 
+from .pagination import MAX_ID
+
 class ProductCreateUpdateSerializer(serializers.Serializer):
     sku = serializers.CharField(max_length=50)
     name = serializers.CharField(max_length=200)
@@ -13,9 +18,45 @@ class ProductOutSerializer(serializers.Serializer):
     price = serializers.DecimalField(max_digits=10, decimal_places=2)
     stock = serializers.IntegerField()
 
+class ProductSearchSerializer(serializers.Serializer):
+    # query parameters of GET /api/products/
+    sku = serializers.CharField(max_length=50, required=False, help_text="SKU prefix.")
+    q = serializers.CharField(max_length=200, required=False, help_text="Case-insensitive name search.")
+    min_price = serializers.DecimalField(max_digits=10, decimal_places=2, required=False)
+    max_price = serializers.DecimalField(max_digits=10, decimal_places=2, required=False)
+    in_stock = serializers.BooleanField(required=False, allow_null=True, default=None)
+
+class ReportRangeSerializer(serializers.Serializer):
+    # query parameters of GET /api/reports/...; without them, the last 30 days
+    date_from = serializers.DateField(required=False, help_text="First day, inclusive.")
+    date_to = serializers.DateField(required=False, help_text="Last day, inclusive.")
+
+class TopProductsQuerySerializer(ReportRangeSerializer):
+    sort = serializers.ChoiceField(choices=["revenue", "units"], default="revenue")
+    limit = serializers.IntegerField(min_value=1, max_value=1000, default=20)
+
+class ProductImportErrorSerializer(serializers.Serializer):
+    row = serializers.IntegerField()
+    sku = serializers.CharField(allow_null=True)
+    error = serializers.CharField()
+
+class ProductImportReportSerializer(serializers.Serializer):
+    created = serializers.IntegerField()
+    updated = serializers.IntegerField()
+    failed = serializers.IntegerField()
+    errors = ProductImportErrorSerializer(many=True)
+
 class OrderLineInSerializer(serializers.Serializer):
-    product_id = serializers.IntegerField()
-    quantity = serializers.IntegerField(min_value=1)
+    # bounded by the id and quantity columns, so out-of-range input is a 400, not a driver error
+    product_id = serializers.IntegerField(min_value=1, max_value=MAX_ID)
+    quantity = serializers.IntegerField(min_value=1, max_value=2 ** 31 - 1)
+
+class OrderInSerializer(serializers.Serializer):
+    items = OrderLineInSerializer(many=True, allow_empty=False)
+
+class OrderBatchInSerializer(serializers.Serializer):
+    mode = serializers.ChoiceField(choices=["all_or_nothing", "best_effort"], default="all_or_nothing")
+    orders = OrderInSerializer(many=True, allow_empty=False, max_length=settings.ORDER_BATCH_MAX_SIZE)
 
 class OrderOutItemSerializer(serializers.Serializer):
     product_id = serializers.IntegerField()
@@ -29,3 +70,40 @@ class OrderOutSerializer(serializers.Serializer):
     id = serializers.IntegerField()
     items = OrderOutItemSerializer(many=True)
     total = serializers.DecimalField(max_digits=12, decimal_places=2)
+
+
+# ---------- sparse fieldsets (?fields=, ?include=) ----------
+@cache
+def output_fields(output: type[serializers.Serializer]) -> tuple[tuple[str, ...], tuple[str, ...]]:
+    """(plain fields, nested serializer fields) of an output serializer, in declaration order."""
+    fields = output().fields
+    nested = tuple(name for name, f in fields.items() if isinstance(f, serializers.BaseSerializer))
+    return tuple(name for name in fields if name not in nested), nested
+
+def sparse_fields(params, output: type[serializers.Serializer]) -> tuple[tuple[str, ...] | None, frozenset[str]]:
+    """Parse `?fields=a,b` (plain fields of `output`) and `?include=x` (its nested ones).
+
+    Returns the requested fields in `output`'s order and the nested fields to
+    include. Without `fields` it is (None, every nested field): the full
+    representation. Unknown names raise ValidationError.
+    """
+    plain, nested = output_fields(output)
+    errors = {}
+    fields = None
+    if "fields" in params:
+        asked = {f.strip() for f in params["fields"].split(",") if f.strip()}
+        if not asked or asked - set(plain):
+            errors["fields"] = [f"Unknown or no fields; use a comma-separated subset of: {', '.join(plain)}."]
+        fields = tuple(f for f in plain if f in asked)
+    include = frozenset(nested) if fields is None else frozenset()
+    if "include" in params:
+        asked = {f.strip() for f in params["include"].split(",") if f.strip()}
+        if not nested:
+            errors["include"] = ["Nothing to include here."]
+        elif not asked or asked - set(nested):
+            errors["include"] = [f"Unknown or nothing to include; choose from: {', '.join(nested)}."]
+        include |= asked
+    if errors:
+        raise serializers.ValidationError(errors)
+    return fields, include
+
@@ -1,10 +1,12 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
 
+from . import async_views
 from .views import (
     ProductViewSet,
-    OrderListView, OrderDetailView,
-    product_form_view, order_form_view
+    OrderListView, OrderDetailView, OrderExportView, OrderBatchView,
+    DailySalesReportView, ProductSalesReportView,
+    metrics_view, product_form_view, order_form_view
 )
 
 router = DefaultRouter()
@@ -15,6 +17,19 @@ urlpatterns = [
 
     path("orders/", OrderListView.as_view()),
     path("orders/<int:order_id>/", OrderDetailView.as_view()),
+    path("orders/export/", OrderExportView.as_view()),
+    path("orders/batch/", OrderBatchView.as_view()),
+
+    path("reports/daily/", DailySalesReportView.as_view()),
+    path("reports/products/", ProductSalesReportView.as_view()),
+
+    path("metrics/", metrics_view),
+
+    # async (ASGI) variants
+    path("async/products/", async_views.products_view),
+    path("async/products/<int:pk>/", async_views.product_detail_view),
+    path("async/orders/", async_views.orders_view),
+    path("async/orders/<int:order_id>/", async_views.order_detail_view),
 
     # Mini forms (demo)
     path("product-form/", product_form_view, name="product-form"),
@@ -1,43 +1,139 @@
+import hashlib
+import json
 import logging
+from datetime import timedelta
 
+from django.conf import settings
+from django.http import StreamingHttpResponse
 from django.shortcuts import render
+from django.utils import timezone
 from django.utils.decorators import method_decorator
 from django.views.decorators.cache import never_cache
+from django.views.decorators.http import condition, require_GET
 
 from rest_framework import viewsets, serializers as drf_serializers
+from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
-from drf_spectacular.utils import (
-    extend_schema, extend_schema_view, OpenApiParameter, inline_serializer
-)
 
+from acme.infrastructure.django_impl.cache import product_cache_stats
 from acme.infrastructure.django_impl.repositories import DjangoUnitOfWork
 from acme.application.services.product_service import ProductService
 from acme.application.services.order_service import OrderService
-from acme.application.dtos import CreateProductDTO, OrderLineDTO
-from acme.domain.errors import DomainError
+from acme.application.services.report_service import ReportService
+from acme.application.services.product_import_service import ProductImportService, READERS
+from acme.application.dtos import CreateProductDTO, OrderLineDTO, ProductSearchDTO
+from acme.domain.errors import DomainError, IdempotencyConflict
 
+from .admission import Overloaded, batch_admission, order_admission
+from .conditional import catalog_etag, catalog_last_modified, product_etag, product_last_modified
+from .encoders import (
+    product_out, product_fields_out, order_out, order_header_out, order_summary_out, daily_sales_out,
+    product_sales_out, pick,
+)
+from .exports import export_products, export_orders, parse_export_filter
+from .instrumentation import JsonResponse, query_budget, timed
+from .openapi import OpenApiTypes, OpenApiParameter, extend_schema, extend_schema_view, inline_serializer
+from .pagination import KeysetPagination, InvalidCursor
 from .serializers import (
-    ProductCreateUpdateSerializer, ProductOutSerializer,
-    OrderLineInSerializer, OrderOutSerializer
+    ProductCreateUpdateSerializer, ProductOutSerializer, ProductImportReportSerializer, ProductSearchSerializer,
+    OrderLineInSerializer, OrderOutSerializer, OrderBatchInSerializer,
+    ReportRangeSerializer, TopProductsQuerySerializer, output_fields, sparse_fields,
 )
 
 logger = logging.getLogger("webapi")
 
+# content type -> product import reader
+IMPORT_FORMATS = {
+    "text/csv": "csv",
+    "application/x-ndjson": "ndjson",
+    "application/jsonl": "ndjson",
+}
+
+# ?as= -> streamed export content type (`format` is taken by DRF's URL override)
+EXPORT_FORMATS = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+
+EXPORT_PARAMETERS = [
+    OpenApiParameter(name="as", type=str, enum=sorted(EXPORT_FORMATS), location=OpenApiParameter.QUERY),
+    OpenApiParameter(name="created_from", type=str, location=OpenApiParameter.QUERY,
+                     description="ISO date/datetime, inclusive."),
+    OpenApiParameter(name="created_to", type=str, location=OpenApiParameter.QUERY,
+                     description="ISO date/datetime, exclusive."),
+    OpenApiParameter(name="min_id", type=int, location=OpenApiParameter.QUERY),
+    OpenApiParameter(name="max_id", type=int, location=OpenApiParameter.QUERY),
+]
+
+def streamed_export(request, name, export):
+    """Stream `export(filter, fmt)` row by row; errors in the query params are 400s."""
+    fmt = request.query_params.get("as", "ndjson")
+    if fmt not in EXPORT_FORMATS:
+        return Response({"detail": f"'as' must be one of {sorted(EXPORT_FORMATS)}."}, status=400)
+    try:
+        f = parse_export_filter(request.query_params)
+    except ValueError as e:
+        return Response({"detail": str(e)}, status=400)
+    resp = StreamingHttpResponse(export(f, fmt), content_type=EXPORT_FORMATS[fmt])
+    resp["Content-Disposition"] = f'attachment; filename="{name}.{fmt}"'
+    resp["Cache-Control"] = "no-store"
+    return resp
+
+def iter_text_lines(stream):
+    # the request body is read line by line, never buffered whole
+    for line in stream:
+        yield line.decode("utf-8-sig")
+
 # ---------- Mini HTML Forms (para demo) ----------
 def product_form_view(request):
     return render(request, "webapi/product_form.html")
 
 def order_form_view(request):
-    return render(request, "webapi/order_form.html")
+    return render(request, "webapi/order_form.html", {
+        "page_size": settings.API_MAX_PAGE_SIZE,
+        "latest_orders_cursor": KeysetPagination.last_page_cursor(),
+    })
+
+
+# ---------- Pagination (cursor + limit) ----------
+PAGINATION_PARAMETERS = [
+    OpenApiParameter(name="cursor", type=str, location=OpenApiParameter.QUERY,
+                     description="Opaque cursor taken from `next`/`previous`."),
+    OpenApiParameter(name="limit", type=int, location=OpenApiParameter.QUERY,
+                     description="Page size (capped by API_MAX_PAGE_SIZE)."),
+]
+
+# ---------- Sparse fieldsets (?fields=, ?include=) ----------
+def sparse_parameters(output) -> list:
+    plain, nested = output_fields(output)
+    params = [OpenApiParameter(
+        name="fields", type=str, location=OpenApiParameter.QUERY,
+        description=f"Comma-separated subset of {', '.join(plain)}; default all"
+                    + (f" (and {', '.join(nested)})." if nested else "."),
+    )]
+    if nested:
+        params.append(OpenApiParameter(
+            name="include", type=str, location=OpenApiParameter.QUERY,
+            description=f"With `fields`: also return {', '.join(nested)}.",
+        ))
+    return params
+
+def paginated(name, results):
+    return inline_serializer(
+        name=name,
+        fields={
+            "next": drf_serializers.URLField(allow_null=True),
+            "previous": drf_serializers.URLField(allow_null=True),
+            "results": results,
+        }
+    )
 
 
 # ---------- Products API ----------
 @extend_schema_view(
     list=extend_schema(
         operation_id="products_list",
-        responses=ProductOutSerializer(many=True)
+        parameters=PAGINATION_PARAMETERS + sparse_parameters(ProductOutSerializer) + [ProductSearchSerializer],
+        responses=paginated("ProductPage", ProductOutSerializer(many=True))
     ),
     retrieve=extend_schema(
         operation_id="products_retrieve",
@@ -58,28 +154,55 @@ def order_form_view(request):
 )
 class ProductViewSet(viewsets.ViewSet):
     serializer_class = ProductOutSerializer  # dica para gerador
+    query_budget = {"GET": 4}  # version, sku/price index probes, page
 
+    @method_decorator(condition(etag_func=catalog_etag, last_modified_func=catalog_last_modified))
     def list(self, request):
-        svc = ProductService(DjangoUnitOfWork())
-        products = svc.list()
-        data = [ProductOutSerializer(p.__dict__).data for p in products]
-        return Response(data)
+        try:
+            pager = KeysetPagination(request)
+        except InvalidCursor as e:
+            return Response({"detail": str(e)}, status=400)
+        params = ProductSearchSerializer(data=request.query_params)
+        if not params.is_valid():
+            return Response(params.errors, status=400)
+        try:
+            fields, _ = sparse_fields(request.query_params, ProductOutSerializer)
+        except drf_serializers.ValidationError as e:
+            return Response(e.detail, status=400)
+        f = params.validated_data
+        criteria = ProductSearchDTO(
+            sku_prefix=f.get("sku"), name_contains=f.get("q"),
+            min_price=f.get("min_price"), max_price=f.get("max_price"), in_stock=f.get("in_stock"),
+        )
+        svc = timed(ProductService(DjangoUnitOfWork()))
+        try:
+            if fields is None:
+                products = pager.paginate(svc.search(criteria, pager.after_id, pager.fetch_size, pager.before_id))
+                data = [product_out(p) for p in products]
+            else:
+                # only the requested columns are read
+                rows = pager.paginate(svc.search_fields(criteria, fields, pager.after_id, pager.fetch_size, pager.before_id))
+                data = [product_fields_out(r, fields) for r in rows]
+        except DomainError as e:
+            return Response({"detail": str(e)}, status=400)
+        return pager.get_paginated_response(data)
 
+    @method_decorator(condition(etag_func=product_etag, last_modified_func=product_last_modified))
     def retrieve(self, request, pk=None):
-        svc = ProductService(DjangoUnitOfWork())
+        svc = timed(ProductService(DjangoUnitOfWork()))
         p = svc.uow.products.get_by_id(int(pk))
         if not p:
             return Response({"detail": "Not found."}, status=404)
-        return Response(ProductOutSerializer(p.__dict__).data)
+        return Response(product_out(p))
 
     def create(self, request):
         ser = ProductCreateUpdateSerializer(data=request.data)
         if not ser.is_valid():
             return Response(ser.errors, status=400)
-        svc = ProductService(DjangoUnitOfWork())
+        svc = timed(ProductService(DjangoUnitOfWork()))
         try:
             p = svc.create(CreateProductDTO(**ser.validated_data))
-            return Response(ProductOutSerializer(p.__dict__).data, status=201)
+            return Response(product_out(p), status=201)
         except DomainError as e:
             return Response({"detail": str(e)}, status=400)
 
@@ -87,13 +210,45 @@ class ProductViewSet(viewsets.ViewSet):
         ser = ProductCreateUpdateSerializer(data=request.data)
         if not ser.is_valid():
             return Response(ser.errors, status=400)
-        svc = ProductService(DjangoUnitOfWork())
+        svc = timed(ProductService(DjangoUnitOfWork()))
         try:
             p = svc.update(int(pk), CreateProductDTO(**ser.validated_data))
-            return Response(ProductOutSerializer(p.__dict__).data)
+            return Response(product_out(p))
         except DomainError as e:
             return Response({"detail": str(e)}, status=400)
 
+    @extend_schema(
+        operation_id="products_import",
+        request={"text/csv": OpenApiTypes.STR, "application/x-ndjson": OpenApiTypes.STR},
+        responses={200: ProductImportReportSerializer, 400: dict, 415: dict}
+    )
+    @action(detail=False, methods=["post"], url_path="import")
+    def import_products(self, request):
+        content_type = request.content_type.split(";")[0].strip()
+        fmt = IMPORT_FORMATS.get(content_type)
+        if fmt is None:
+            return Response({"detail": f"Unsupported content type; use one of {sorted(IMPORT_FORMATS)}."}, status=415)
+        if request.stream is None:
+            return Response({"detail": "Empty body."}, status=400)
+        try:
+            svc = timed(ProductImportService(DjangoUnitOfWork()))
+            report = svc.run(READERS[fmt](iter_text_lines(request.stream)))
+        except UnicodeDecodeError:
+            return Response({"detail": "Body must be UTF-8."}, status=400)
+        logger.info("products_imported created=%s updated=%s failed=%s",
+                    report.created, report.updated, report.failed)
+        return Response(ProductImportReportSerializer(report).data)
+
+    @extend_schema(
+        operation_id="products_export",
+        parameters=EXPORT_PARAMETERS,
+        responses={(200, "application/x-ndjson"): OpenApiTypes.STR, (200, "text/csv"): OpenApiTypes.STR, 400: dict}
+    )
+    @action(detail=False, methods=["get"], url_path="export")
+    def export(self, request):
+        svc = timed(ProductService(DjangoUnitOfWork()))
+        return streamed_export(request, "products", lambda f, fmt: export_products(svc.export(f), fmt))
+
 
 # ---------- Orders API (dividida em duas views) ----------
 
@@ -103,19 +258,9 @@ OrderCreateSerializer = inline_serializer(
     fields={"items": OrderLineInSerializer(many=True)}
 )
 
-# item de listagem (cada linha da lista)
+# itens de listagem (cada linha da lista) — já com many=True
 OrderListItemSerializer = inline_serializer(
     name="OrderListItem",
-    fields={
-        "id": drf_serializers.IntegerField(),
-        "items_count": drf_serializers.IntegerField(),
-        "total": drf_serializers.DecimalField(max_digits=12, decimal_places=2),
-    }
-)
-
-# resposta de listagem (lista de itens) — já com many=True
-OrderListSerializer = inline_serializer(
-    name="OrderList",
     fields={
         "id": drf_serializers.IntegerField(),
         "items_count": drf_serializers.IntegerField(),
@@ -124,24 +269,46 @@ OrderListSerializer = inline_serializer(
     many=True
 )
 
+# resposta de listagem (página de itens)
+OrderListSerializer = paginated("OrderList", OrderListItemSerializer)
+
+def overloaded_response(e: Overloaded) -> Response:
+    resp = Response({"detail": str(e)}, status=503)
+    resp["Retry-After"] = str(e.retry_after)
+    resp["Cache-Control"] = "no-store"
+    return resp
+
+def request_fingerprint(validated_lines) -> str:
+    return hashlib.sha256(json.dumps(validated_lines, sort_keys=True).encode()).hexdigest()
+
 @method_decorator(never_cache, name="dispatch")
 class OrderListView(APIView):
+    query_budget = {"GET": 2, "POST": 11}  # GET: orders, archived orders when the page reaches them
     @extend_schema(
         operation_id="orders_list",
+        parameters=PAGINATION_PARAMETERS,
         responses=OrderListSerializer
     )
     def get(self, request):
-        svc = OrderService(DjangoUnitOfWork())
-        orders = svc.list_orders()
-        data = [{"id": o.id, "items_count": len(o.items), "total": o.total} for o in orders]
-        resp = Response(data)
+        try:
+            pager = KeysetPagination(request)
+        except InvalidCursor as e:
+            return Response({"detail": str(e)}, status=400)
+        svc = timed(OrderService(DjangoUnitOfWork()))
+        orders = pager.paginate(svc.list_summaries(pager.after_id, pager.fetch_size, pager.before_id))
+        data = [order_summary_out(o) for o in orders]
+        resp = pager.get_paginated_response(data)
         resp["Cache-Control"] = "no-store"
         return resp
 
     @extend_schema(
         operation_id="orders_create",
+        parameters=[OpenApiParameter(
+            name="Idempotency-Key", type=str, location=OpenApiParameter.HEADER, required=False,
+            description="Retries with the same key and body replay the first 201 response.",
+        )],
         request=OrderCreateSerializer,
-        responses={201: OrderOutSerializer, 400: dict}
+        responses={201: OrderOutSerializer, 400: dict, 409: dict, 503: dict}
     )
     def post(self, request):
         items = request.data.get("items", None)
@@ -157,27 +324,35 @@ class OrderListView(APIView):
             return Response({"detail": "Invalid items", "errors": lines_ser.errors}, status=400)
 
         lines = [OrderLineDTO(**d) for d in lines_ser.validated_data]
-        svc = OrderService(DjangoUnitOfWork())
+        key = request.headers.get("Idempotency-Key")
+        if key is not None and not 0 < len(key) <= 255:
+            return Response({"detail": "Idempotency-Key must be 1-255 characters."}, status=400)
+        svc = timed(OrderService(DjangoUnitOfWork()))
         try:
-            order = svc.place_order(lines)
-            payload = {
-                "id": order.id,
-                "items": [{
-                    "product_id": i.product_id,
-                    "sku": i.sku,
-                    "name": i.name,
-                    "unit_price": i.unit_price,
-                    "quantity": i.quantity,
-                    "line_total": i.line_total,
-                } for i in order.items],
-                "total": order.total
-            }
-            logger.info("order_created id=%s total=%s items=%s",
-                        order.id, order.total, len(order.items))
-            resp = Response(OrderOutSerializer(payload).data, status=201)
+            with order_admission.admit():
+                if key:
+                    data, replayed = svc.place_order_once(
+                        key, request_fingerprint(lines_ser.validated_data), lines, order_out
+                    )
+                else:
+                    data, replayed = order_out(svc.place_order(lines)), False
+            if replayed:
+                logger.info("order_replayed id=%s key=%s", data["id"], key)
+            else:
+                logger.info("order_created id=%s total=%s items=%s",
+                            data["id"], data["total"], len(data["items"]))
+            resp = Response(data, status=201)
             resp["Cache-Control"] = "no-store"
+            if replayed:
+                resp["Idempotent-Replayed"] = "true"
             return resp
 
+        except Overloaded as e:
+            return overloaded_response(e)
+
+        except IdempotencyConflict as e:
+            return Response({"detail": str(e)}, status=409)
+
         except DomainError as e:
             return Response({"detail": str(e)}, status=400)
 
@@ -187,33 +362,211 @@ class OrderListView(APIView):
             return Response({"detail": "unexpected_error", "error": str(e)}, status=500)
 
 
+OrderBatchResultSerializer = inline_serializer(
+    name="OrderBatchResult",
+    fields={
+        "mode": drf_serializers.CharField(),
+        "placed": drf_serializers.IntegerField(),
+        "failed": drf_serializers.IntegerField(),
+        "results": inline_serializer(
+            name="OrderBatchItemResult",
+            fields={
+                "index": drf_serializers.IntegerField(),
+                "status": drf_serializers.ChoiceField(choices=["created", "failed"]),
+                "order": OrderOutSerializer(required=False),
+                "detail": drf_serializers.CharField(required=False),
+            },
+            many=True,
+        ),
+    },
+)
+
+class OrderBatchView(APIView):
+    # product read, stock UPDATE, bulk INSERTs (orders, items, outbox): SQLite's
+    # 999-parameter limit splits the items INSERT every ~160 lines, so this
+    # covers ~1000 lines
+    query_budget = {"POST": 13}
+
+    @extend_schema(
+        operation_id="orders_batch_create",
+        request=OrderBatchInSerializer,
+        responses={201: OrderBatchResultSerializer, 207: OrderBatchResultSerializer, 400: OrderBatchResultSerializer,
+                   503: dict},
+        description="Places many orders in one transaction. `all_or_nothing` (default) places every order "
+                    "or none; `best_effort` places the ones that can be filled and reports the rest (207).",
+    )
+    def post(self, request):
+        ser = OrderBatchInSerializer(data=request.data)
+        if not ser.is_valid():
+            logger.warning("order_batch_validation_errors: %s", ser.errors)
+            return Response({"detail": "Invalid batch", "errors": ser.errors}, status=400)
+
+        mode = ser.validated_data["mode"]
+        batch = [[OrderLineDTO(**d) for d in o["items"]] for o in ser.validated_data["orders"]]
+        svc = timed(OrderService(DjangoUnitOfWork()))
+        try:
+            with batch_admission.admit():
+                results = svc.place_orders(batch, all_or_nothing=mode == "all_or_nothing")
+        except Overloaded as e:
+            return overloaded_response(e)
+        except DomainError as e:
+            return Response({"detail": str(e)}, status=400)
+
+        placed = sum(1 for r in results if r.order is not None)
+        failed = len(results) - placed
+        logger.info("order_batch mode=%s placed=%s failed=%s", mode, placed, failed)
+        data = {
+            "mode": mode,
+            "placed": placed,
+            "failed": failed,
+            "results": [
+                {"index": r.index, "status": "created", "order": order_out(r.order)} if r.order is not None
+                else {"index": r.index, "status": "failed", "detail": r.error}
+                for r in results
+            ],
+        }
+        resp = Response(data, status=201 if not failed else 400 if mode == "all_or_nothing" else 207)
+        resp["Cache-Control"] = "no-store"
+        return resp
+
+
 class OrderDetailView(APIView):
+    query_budget = 3  # order, archived order on a miss, lines
     @extend_schema(
         operation_id="orders_retrieve",
-        parameters=[OpenApiParameter(name="order_id", type=int, location=OpenApiParameter.PATH)],
-        responses={200: OrderOutSerializer, 404: dict}
+        parameters=[OpenApiParameter(name="order_id", type=int, location=OpenApiParameter.PATH)]
+                   + sparse_parameters(OrderOutSerializer),
+        responses={200: OrderOutSerializer, 400: dict, 404: dict}
     )
     def get(self, request, order_id: int):
-        svc = OrderService(DjangoUnitOfWork())
         try:
-            order = svc.get_order(order_id)
-            payload = {
-                "id": order.id,
-                "items": [{
-                    "product_id": i.product_id,
-                    "sku": i.sku,
-                    "name": i.name,
-                    "unit_price": i.unit_price,
-                    "quantity": i.quantity,
-                    "line_total": i.line_total,
-                } for i in order.items],
-                "total": order.total
-            }
-            return Response(OrderOutSerializer(payload).data)
+            fields, include = sparse_fields(request.query_params, OrderOutSerializer)
+        except drf_serializers.ValidationError as e:
+            return Response(e.detail, status=400)
+        svc = timed(OrderService(DjangoUnitOfWork()))
+        try:
+            if "items" not in include:
+                # the order row only: stored total, no lines
+                return Response(pick(order_header_out(svc.get_order_summary(order_id)), fields))
+            data = order_out(svc.get_order(order_id))
+            return Response(data if fields is None else pick(data, {*fields, "items"}))
 
         except DomainError as e:
             return Response({"detail": str(e)}, status=404)
 
         except Exception as e:
             logger.exception("order_detail_unexpected")
-            return Response({"detail": "unexpected_error", "error": str(e)}, status=500)
\ No newline at end of file
+            return Response({"detail": "unexpected_error", "error": str(e)}, status=500)
+
+
+class OrderExportView(APIView):
+    @extend_schema(
+        operation_id="orders_export",
+        parameters=EXPORT_PARAMETERS,
+        responses={(200, "application/x-ndjson"): OpenApiTypes.STR, (200, "text/csv"): OpenApiTypes.STR, 400: dict}
+    )
+    def get(self, request):
+        svc = timed(OrderService(DjangoUnitOfWork()))
+        return streamed_export(request, "orders", lambda f, fmt: export_orders(svc.export_orders(f), fmt))
+
+
+# ---------- reports (sales rollups) ----------
+def report_range(data) -> tuple:
+    last = data.get("date_to") or timezone.localdate()
+    return data.get("date_from") or last - timedelta(days=29), last
+
+def report_response(first, last, svc, results) -> Response:
+    # through_order_id: newest order the rollups include (`manage.py rollup_sales`)
+    return Response({
+        "date_from": first.isoformat(), "date_to": last.isoformat(),
+        "through_order_id": svc.high_water_mark(), "results": results,
+    })
+
+DailySalesReportSerializer = inline_serializer(
+    name="DailySalesReport",
+    fields={
+        "date_from": drf_serializers.DateField(),
+        "date_to": drf_serializers.DateField(),
+        "through_order_id": drf_serializers.IntegerField(),
+        "results": inline_serializer(name="DailySales", many=True, fields={
+            "day": drf_serializers.DateField(),
+            "orders": drf_serializers.IntegerField(),
+            "units": drf_serializers.IntegerField(),
+            "revenue": drf_serializers.DecimalField(max_digits=14, decimal_places=2),
+        }),
+    },
+)
+
+ProductSalesReportSerializer = inline_serializer(
+    name="ProductSalesReport",
+    fields={
+        "date_from": drf_serializers.DateField(),
+        "date_to": drf_serializers.DateField(),
+        "through_order_id": drf_serializers.IntegerField(),
+        "results": inline_serializer(name="ProductSales", many=True, fields={
+            "product_id": drf_serializers.IntegerField(),
+            "sku": drf_serializers.CharField(),
+            "units": drf_serializers.IntegerField(),
+            "revenue": drf_serializers.DecimalField(max_digits=14, decimal_places=2),
+        }),
+    },
+)
+
+
+class DailySalesReportView(APIView):
+    query_budget = 2  # rollup rows, high-water mark
+
+    @extend_schema(
+        operation_id="reports_daily_sales",
+        parameters=[ReportRangeSerializer],
+        responses={200: DailySalesReportSerializer, 400: dict},
+        description="Orders, units and revenue per day, zeros included.",
+    )
+    def get(self, request):
+        params = ReportRangeSerializer(data=request.query_params)
+        if not params.is_valid():
+            return Response({"detail": "Invalid query", "errors": params.errors}, status=400)
+        first, last = report_range(params.validated_data)
+        svc = timed(ReportService(DjangoUnitOfWork(), max_days=settings.REPORT_MAX_DAYS))
+        try:
+            days = svc.daily_sales(first, last)
+        except DomainError as e:
+            return Response({"detail": str(e)}, status=400)
+        return report_response(first, last, svc, [daily_sales_out(d) for d in days])
+
+
+class ProductSalesReportView(APIView):
+    query_budget = 2  # rollup aggregate, high-water mark
+
+    @extend_schema(
+        operation_id="reports_product_sales",
+        parameters=[TopProductsQuerySerializer],
+        responses={200: ProductSalesReportSerializer, 400: dict},
+        description="Units and revenue per product over the range, best sellers first (by `sort`).",
+    )
+    def get(self, request):
+        params = TopProductsQuerySerializer(data=request.query_params)
+        if not params.is_valid():
+            return Response({"detail": "Invalid query", "errors": params.errors}, status=400)
+        first, last = report_range(params.validated_data)
+        svc = timed(ReportService(DjangoUnitOfWork(), max_days=settings.REPORT_MAX_DAYS))
+        try:
+            products = svc.top_products(first, last, params.validated_data["sort"], params.validated_data["limit"])
+        except DomainError as e:
+            return Response({"detail": str(e)}, status=400)
+        return report_response(first, last, svc, [product_sales_out(p) for p in products])
+
+
+# ---------- Metrics (this process only) ----------
+@require_GET
+@never_cache
+@query_budget(0)
+def metrics_view(request):
+    return JsonResponse({
+        "order_admission": order_admission.snapshot(),
+        "batch_admission": batch_admission.snapshot(),
+        "product_cache": {
+            "hits": product_cache_stats.hits, "misses": product_cache_stats.misses,
+            "hit_ratio": round(product_cache_stats.hit_ratio, 4),
+        },
+    })